@@ -1,13 +1,32 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
+from plotly.subplots import make_subplots
 import numpy as np
-from scipy.interpolate import griddata
 from datetime import datetime
+import importlib.util
 import io
 import json
 import tempfile
-from interpolasi import generate_property_heatmap
+from scipy.spatial import QhullError
+from interpolasi import (GRID_WORKERS, INTERPOLATION_METHODS, MAX_GRID_NODES, GridSpec,
+                        estimate_grid_cost, generate_property_heatmap, grid_surface,
+                        grid_surfaces, points_hash, preprocess_points, seed_grid_cache)
+from kontur import (contact_outline, contour_area_table, contour_lines, line_trace_xy, polylines_csv,
+                    polylines_geojson)
+from laporan import RAW_DATA_MODES, default_raw_mode, lazy_report, report_key, write_excel_report
+from penampang import (MAX_SECTION_STATIONS, azimuth_line, fence_sections, sample_grid, section_profile,
+                       station_spacing)
+from perbandingan import contact_volume_change, difference_maps, difference_stats, resample_surveys
+from penyimpanan import (GRID_EXPORT_FORMATS, PointStore, grid_export_bytes, ingest_points, load_session,
+                         load_session_json, pa_csv, read_preview, scan_surface_names, session_bytes)
+from validasi import CV_AUTO_MAX_POINTS, CV_EXACT_CUBIC_POINTS, compare_methods, cross_validate, cv_table
+from visualisasi import (RENDER_MAX_NODES, WELL_LOD_LIMIT, build_residual_map, build_surface_trace,
+                          build_well_traces, contact_plane, decimate_grid)
+from volumetrik import (AREA_DEPTH_RULES, AREA_DEPTH_STEPS, area_depth_grv, area_depth_table,
+                        compute_volumetrics, compute_volumetrics_mapped, contact_sweep, contact_volumes,
+                        get_grv_table, monte_carlo_volumetrics, percentile_summary, resolution_convergence,
+                        thickness_map)
 
 # ReportLab untuk PDF ringkasan volumetrik
 from reportlab.lib.pagesizes import A4
@@ -131,41 +150,79 @@ def create_volumetric_report_pdf(vol_gas_cap, vol_oil_zone, vol_total_res,
 
 def create_volumetric_report_excel(vol_gas_cap, vol_oil_zone, vol_total_res,
                                    goc_input, woc_input,
-                                   num_points, x_range, y_range, z_range, df):
-    """Membuat laporan volumetrik dalam format Excel"""
+                                   num_points, x_range, y_range, z_range, df, raw_mode='sheets'):
+    """Membuat laporan volumetrik dalam format Excel (raw_mode selain 'sheets' -> ZIP + lampiran)"""
     buffer = io.BytesIO()
-    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-        # Sheet 1: Summary
-        summary_df = pd.DataFrame({
-            'Parameter': ['Total Data Points', 'GOC (m)', 'WOC (m)',
-                          'X Min', 'X Max', 'Y Min', 'Y Max', 'Z Min (m)', 'Z Max (m)'],
-            'Nilai': [num_points, goc_input, woc_input,
-                      x_range[0], x_range[1], y_range[0], y_range[1], z_range[0], z_range[1]]
-        })
-        summary_df.to_excel(writer, sheet_name='Summary', index=False)
-        
-        # Sheet 2: Volume Results
-        volume_df = pd.DataFrame({
-            'Zona': ['Gas Cap', 'Oil Zone', 'Total Reservoir'],
-            'Volume (m³)': [vol_gas_cap, vol_oil_zone, vol_total_res],
-            'Volume (Juta m³)': [vol_gas_cap/1e6, vol_oil_zone/1e6, vol_total_res/1e6]
-        })
-        volume_df.to_excel(writer, sheet_name='Volume Results', index=False)
-        
-        # Sheet 3: Raw Data
-        df.to_excel(writer, sheet_name='Raw Data', index=False)
+    # Sheet 1: Summary
+    summary_df = pd.DataFrame({
+        'Parameter': ['Total Data Points', 'GOC (m)', 'WOC (m)',
+                      'X Min', 'X Max', 'Y Min', 'Y Max', 'Z Min (m)', 'Z Max (m)'],
+        'Nilai': [num_points, goc_input, woc_input,
+                  x_range[0], x_range[1], y_range[0], y_range[1], z_range[0], z_range[1]]
+    })
+    
+    # Sheet 2: Volume Results
+    volume_df = pd.DataFrame({
+        'Zona': ['Gas Cap', 'Oil Zone', 'Total Reservoir'],
+        'Volume (m³)': [vol_gas_cap, vol_oil_zone, vol_total_res],
+        'Volume (Juta m³)': [vol_gas_cap/1e6, vol_oil_zone/1e6, vol_total_res/1e6]
+    })
     
+    # Sheet 3: Raw Data (sheet write-only atau lampiran CSV/Parquet)
+    write_excel_report(buffer, {'Summary': summary_df, 'Volume Results': volume_df},
+                       raw=df, raw_mode=raw_mode)
     buffer.seek(0)
     return buffer
 
+def heatmap_csv(grid, label):
+    """CSV node grid properti (X, Y, nilai); koordinat dari sumbu 1D, urutan = meshgrid().ravel()"""
+    return pd.DataFrame({'X': np.tile(grid.x, len(grid.y)), 'Y': np.repeat(grid.y, len(grid.x)),
+                         label: grid.z.ravel()}).to_csv(index=False)
+
+def distribution_input(label, base, spread, key):
+    """Widget pemilihan distribusi satu parameter untuk mode Monte Carlo"""
+    c1, c2, c3, c4 = st.columns([2, 1, 1, 1])
+    kind = c1.selectbox(label, ["Triangular", "Lognormal", "Konstan"], key=f"{key}_type")
+    if kind == "Triangular":
+        low = c2.number_input("Min", value=float(base - spread), key=f"{key}_min", format="%.4f")
+        mode = c3.number_input("Mode", value=float(base), key=f"{key}_mode", format="%.4f")
+        high = c4.number_input("Max", value=float(base + spread), key=f"{key}_max", format="%.4f")
+        low, high = min(low, mode), max(high, mode)
+        return {'type': 'triangular', 'min': low, 'mode': mode, 'max': high}
+    if kind == "Lognormal":
+        mean = c2.number_input("Mean", value=float(base), key=f"{key}_mean", format="%.4f")
+        sd = c3.number_input("Std Dev", value=float(spread) / 2, min_value=0.0, key=f"{key}_sd", format="%.4f")
+        return {'type': 'lognormal', 'mean': mean, 'sd': sd}
+    return {'type': 'constant', 'value': float(base)}
+
 # --- JUDUL UTAMA ---
 st.title("Proyek Pemetaan Bawah Permukaan IF-A")
 st.title("🌍 3D Reservoir Visualization")
 st.markdown("Interactive Structural Map, Fluid Contact & Reserves Calculator")
 
 # --- 1. INISIALISASI SESSION STATE ---
+# Titik disimpan kolom NumPy (PointStore); list-of-dict lama dikonversi otomatis
 if 'data_points' not in st.session_state:
-    st.session_state['data_points'] = []
+    st.session_state['data_points'] = PointStore()
+elif not isinstance(st.session_state['data_points'], PointStore):
+    st.session_state['data_points'] = PointStore.from_records(st.session_state['data_points'])
+# Surface tambahan (mis. GOC/WOC terpetakan) dari kolom Surface: nama -> DataFrame X, Y, Z
+if 'surfaces' not in st.session_state:
+    st.session_state['surfaces'] = {}
+
+# Spesifikasi grid default (bisa diubah di sidebar)
+grid_spec = GridSpec()
+# None = kontak datar (pakai nilai number input), selain itu nama surface terpetakan
+goc_surface, woc_surface = None, None
+# Metode gridding default (pilihan lain: lihat INTERPOLATION_METHODS)
+grid_method = "cubic"
+METHOD_LABELS = {"cubic": "Cubic (Clough-Tocher)", "linear": "Linear (Delaunay)",
+                 "idw": "IDW (KD-tree)", "rbf": "RBF lokal (thin-plate)", "kriging": "Ordinary kriging"}
+# Praproses titik sebelum gridding (0 / None = nonaktif)
+merge_tolerance, decluster_cell = 0.0, None
+# Key widget yang ikut disimpan/dipulihkan lewat session
+SESSION_CONTACT_KEYS = ["goc", "woc"]
+SESSION_PETRO_KEYS = ["porosity", "sw", "ntg", "bo", "bg"]
 
 # --- 2. SIDEBAR ---
 with st.sidebar:
@@ -186,11 +243,13 @@ with st.sidebar:
         submit_button = st.form_submit_button(label='➕ Tambah Titik', type="primary")
 
     if submit_button:
-        st.session_state['data_points'].append({'X': x_val, 'Y': y_val, 'Z': z_val})
+        st.session_state['data_points'].append(x_val, y_val, z_val)
         st.toast(f"Titik ({x_val}, {y_val}, {z_val}) berhasil disimpan!", icon='✅')
 
     # --- BAGIAN B: STATUS DATA ---
-    df = pd.DataFrame(st.session_state['data_points'])
+    df = st.session_state['data_points'].to_frame()
+    # Hash isi titik: kunci cache semua unduhan yang memuat data mentah
+    data_key = points_hash(*(df[c].values for c in st.session_state['data_points'].columns))
     
     if not df.empty:
         st.divider()
@@ -198,18 +257,20 @@ with st.sidebar:
         
         m1, m2 = st.columns(2)
         m1.metric("Total Titik", len(df))
-        m2.metric("Kedalaman Max", f"{df['Z'].max()} m")
+        m2.metric("Kedalaman Max", f"{df['Z'].max():g} m")
         
         # --- BAGIAN C: KONTAK FLUIDA ---
         st.divider()
         st.markdown("### 💧 Kontak Fluida")
         
         min_z, max_z = df['Z'].min(), df['Z'].max()
+        # Nilai dari session yang dimuat dipakai sebagai default widget
+        restored = st.session_state.get('session_defaults', {})
         
         st.markdown(":red[Gas-Oil Contact (GOC)]")
         goc_input = st.number_input(
             "",
-            value=float(min_z + (max_z - min_z) * 0.3),
+            value=float(restored.get('goc', min_z + (max_z - min_z) * 0.3)),
             key="goc",
             label_visibility="collapsed"
         )
@@ -217,7 +278,7 @@ with st.sidebar:
         st.markdown(":blue[Water-Oil Contact (WOC)]")
         woc_input = st.number_input(
             "",
-            value=float(min_z + (max_z - min_z) * 0.7),
+            value=float(restored.get('woc', min_z + (max_z - min_z) * 0.7)),
             key="woc",
             label_visibility="collapsed"
         )
@@ -225,15 +286,88 @@ with st.sidebar:
         if goc_input > woc_input:
             st.warning("⚠ Awas: GOC > WOC!")
 
+        # Kontak terpetakan (non-datar) dari surface yang di-upload
+        surface_names = list(st.session_state['surfaces'])
+        if surface_names:
+            flat_label = "Datar (nilai di atas)"
+            contact_options = [flat_label] + surface_names
+            goc_choice = st.selectbox("Sumber GOC", contact_options,
+                                      index=contact_options.index("GOC") if "GOC" in contact_options else 0)
+            woc_choice = st.selectbox("Sumber WOC", contact_options,
+                                      index=contact_options.index("WOC") if "WOC" in contact_options else 0)
+            goc_surface = None if goc_choice == flat_label else goc_choice
+            woc_surface = None if woc_choice == flat_label else woc_choice
+
         # --- PARAMETER PETROFISIKA ---
         st.divider()
         with st.expander("🧮 Parameter Petrofisika (Baru)", expanded=True):
             st.caption("Digunakan untuk menghitung STOIIP/GIIP")
-            porosity = st.slider("Porositas (ϕ)", 0.05, 0.40, 0.20, 0.01)
-            sw = st.slider("Water Saturation (Sw)", 0.1, 1.0, 0.3, 0.05)
-            ntg = st.slider("Net-to-Gross (NTG)", 0.1, 1.0, 0.8, 0.05)
-            bo = st.number_input("Faktor Vol. Formasi Minyak (Bo)", 1.0, 2.0, 1.2)
-            bg = st.number_input("Faktor Ekspansi Gas (Bg)", 0.001, 0.1, 0.005, format="%.4f")
+            porosity = st.slider("Porositas (ϕ)", 0.05, 0.40, restored.get('porosity', 0.20), 0.01,
+                                 key="porosity")
+            sw = st.slider("Water Saturation (Sw)", 0.1, 1.0, restored.get('sw', 0.3), 0.05, key="sw")
+            ntg = st.slider("Net-to-Gross (NTG)", 0.1, 1.0, restored.get('ntg', 0.8), 0.05, key="ntg")
+            bo = st.number_input("Faktor Vol. Formasi Minyak (Bo)", 1.0, 2.0, restored.get('bo', 1.2),
+                                 key="bo")
+            bg = st.number_input("Faktor Ekspansi Gas (Bg)", 0.001, 0.1, restored.get('bg', 0.005),
+                                 format="%.4f", key="bg")
+
+        # --- PRAPROSES TITIK ---
+        with st.expander("🧹 Praproses Titik (KD-tree)", expanded=False):
+            st.caption("Gabungkan titik yang hampir berimpit & deklaster sebelum gridding")
+            merge_tolerance = st.number_input("Toleransi gabung (m)", min_value=0.0, value=0.0,
+                                              step=0.1, format="%.3f",
+                                              help="0 = hanya titik dengan X/Y persis sama yang dirata-rata")
+            if st.checkbox("Deklaster ke kerapatan target"):
+                decluster_cell = float(st.number_input("Ukuran sel deklaster (m)", min_value=0.01,
+                                                       value=10.0, format="%.2f"))
+            grid_points = preprocess_points(df['X'].values, df['Y'].values, df['Z'].values,
+                                            merge_tolerance, decluster_cell)
+            prep_report = grid_points[3]
+            if prep_report['output'] < 4 <= len(df):
+                st.warning("Praproses menyisakan < 4 titik, gridding memakai titik asli.")
+                grid_points = preprocess_points(df['X'].values, df['Y'].values, df['Z'].values)
+                merge_tolerance, decluster_cell = 0.0, None
+            st.caption(f"{prep_report['input']:,} → {prep_report['output']:,} titik · "
+                       f"{prep_report['merged']:,} digabung ({prep_report['clusters']:,} kelompok) · "
+                       f"{prep_report['declustered']:,} dideklaster")
+
+        # --- RESOLUSI GRID ---
+        with st.expander("🧱 Resolusi Grid", expanded=False):
+            st.caption("Dipakai konsisten untuk gridding, volumetrik, ekspor & plot")
+            grid_mode = st.radio("Tentukan grid dengan:", ["Jumlah node", "Ukuran sel (m)"], horizontal=True)
+            if grid_mode == "Jumlah node":
+                grid_nodes = st.number_input("Node per sumbu", 10, 5000, 100, step=10)
+                grid_spec = GridSpec(int(grid_nodes), int(grid_nodes))
+            else:
+                extent = max(df['X'].max() - df['X'].min(), df['Y'].max() - df['Y'].min(), 1.0)
+                cell_size = st.number_input("Ukuran sel (m)", min_value=0.01,
+                                            value=float(extent / 99), format="%.2f")
+                grid_spec = GridSpec(cell_size=float(cell_size))
+
+            grid_method = st.selectbox(
+                "Metode interpolasi", INTERPOLATION_METHODS,
+                format_func=lambda m: METHOD_LABELS.get(m, m),
+                help="IDW, RBF & kriging mengisi juga area di luar convex hull titik"
+            )
+
+            resolved_spec = grid_spec.resolve(grid_points[0], grid_points[1])
+            cost = estimate_grid_cost(resolved_spec, prep_report['output'], grid_method)
+            st.caption(f"Grid {resolved_spec.nx} x {resolved_spec.ny} = {cost['nodes']:,} node · "
+                       f"±{cost['memory_mb']:.0f} MB · ±{cost['seconds']:.1f} s"
+                       + (" · diproses per blok" if cost['chunked'] else ""))
+            if resolved_spec.n_nodes > MAX_GRID_NODES:
+                st.error(f"Grid melebihi batas {MAX_GRID_NODES:,} node, kembali ke 100 x 100.")
+                grid_spec = GridSpec()
+
+            # Waktu, memori & galat cross-validation tiap metode pada data & grid yang sama
+            if len(df) >= 4 and st.button("⚖️ Bandingkan Metode"):
+                measure_memory = st.session_state.get('compare_memory', False)
+                with st.spinner("Menjalankan semua metode..."):
+                    st.session_state['method_comparison'] = compare_methods(
+                        *grid_points[:3], grid_spec, measure_memory=measure_memory)
+            st.checkbox("Ukur memori puncak (lebih lambat)", key="compare_memory")
+            if 'method_comparison' in st.session_state:
+                st.dataframe(st.session_state['method_comparison'], hide_index=True)
     
     st.markdown("---")
     
@@ -243,15 +377,13 @@ with st.sidebar:
         
         if uploaded_file is not None:
             try:
-                if uploaded_file.name.endswith('.csv'):
-                    df_upload = pd.read_csv(uploaded_file)
-                else:
-                    df_upload = pd.read_excel(uploaded_file)
+                # Hanya beberapa baris awal yang dibaca untuk preview & cek kolom
+                df_upload = read_preview(uploaded_file, uploaded_file.name)
                     
                 st.caption("🔎 Preview data yang kamu upload:")
-                st.dataframe(df_upload.head(), use_container_width=True)
+                st.dataframe(df_upload, use_container_width=True)
                 
-                df_upload.columns = [c.upper() for c in df_upload.columns]
+                df_upload.columns = [str(c).upper() for c in df_upload.columns]
 
                 # Fitur: Mengecek kekosongan data & integritas awal
                 if df_upload.empty:
@@ -265,11 +397,47 @@ with st.sidebar:
                 required_cols = {'X', 'Y', 'Z'}
                 
                 if required_cols.issubset(df_upload.columns):
-                    st.success(f"File valid! {len(df_upload)} baris data.")
+                    st.success(f"File valid! ({uploaded_file.size / 1e6:.1f} MB)")
+
+                    ingest_engine = 'c'
+                    if not uploaded_file.name.lower().endswith('.xlsx'):
+                        use_arrow = st.toggle("Engine cepat (pyarrow)", value=pa_csv is not None,
+                                              disabled=pa_csv is None)
+                        ingest_engine = 'pyarrow' if use_arrow else 'c'
+
+                    # Kolom Surface -> tiap surface jadi set titik terpisah
+                    top_surface = None
+                    if 'SURFACE' in df_upload.columns:
+                        # Nama surface di-scan sekali per file (bukan tiap rerun)
+                        scanned = st.session_state.setdefault('upload_surface_names', {})
+                        if uploaded_file.file_id not in scanned:
+                            scanned[uploaded_file.file_id] = scan_surface_names(
+                                uploaded_file, uploaded_file.name, ingest_engine
+                            )
+                        upload_surfaces = scanned[uploaded_file.file_id]
+                        st.info(f"Kolom Surface terdeteksi: {', '.join(upload_surfaces)}")
+                        no_top = "(tidak ada)"
+                        top_choice = st.selectbox("Surface struktur utama (top)", [no_top] + upload_surfaces,
+                                                  help="Surface lain disimpan sebagai surface tambahan (mis. GOC/WOC terpetakan)")
+                        top_surface = None if top_choice == no_top else top_choice
+
                     if st.button("📥 Muat Data ke Aplikasi", type="primary"):
-                        new_data = df_upload[['X', 'Y', 'Z']].to_dict('records')
-                        st.session_state['data_points'].extend(new_data)
-                        st.toast(f"Berhasil menambahkan {len(new_data)} titik!", icon='✅')
+                        # File dibaca per chunk langsung ke PointStore
+                        progress_bar = st.progress(0.0, text="Membaca file...")
+
+                        def show_progress(rows, fraction):
+                            progress_bar.progress(fraction if fraction is not None else 0.0,
+                                                  text=f"{rows:,} baris dimuat...")
+
+                        stats = ingest_points(
+                            uploaded_file, uploaded_file.name,
+                            st.session_state['data_points'], st.session_state['surfaces'],
+                            top_surface=top_surface, engine=ingest_engine, progress=show_progress
+                        )
+                        progress_bar.progress(1.0, text="Selesai")
+                        st.toast(f"Berhasil menambahkan {stats['rows']:,} titik!", icon='✅')
+                        if stats['dropped']:
+                            st.toast(f"{stats['dropped']:,} baris X/Y/Z kosong/tidak valid dilewati.", icon='⚠')
                         st.rerun()
                 else:
                     st.error(f"Format salah! File harus punya kolom: {required_cols}")
@@ -279,11 +447,12 @@ with st.sidebar:
     # --- PENGATURAN DATA ---
     with st.expander("⚙ Pengaturan Data", expanded=False):
         if st.button("🔄 Reset Semua Data"):
-            st.session_state['data_points'] = []
+            st.session_state['data_points'].clear()
+            st.session_state['surfaces'] = {}
             st.rerun()
         
         if st.button("📂 Load Data Demo"):
-            st.session_state['data_points'] = [
+            st.session_state['data_points'] = PointStore.from_records([
                 {'X': 100, 'Y': 100, 'Z': 1300}, {'X': 300, 'Y': 100, 'Z': 1300},
                 {'X': 100, 'Y': 300, 'Z': 1300}, {'X': 300, 'Y': 300, 'Z': 1300},
                 {'X': 200, 'Y': 200, 'Z': 1000},  # Puncak
@@ -291,7 +460,7 @@ with st.sidebar:
                 {'X': 100, 'Y': 200, 'Z': 1150}, {'X': 300, 'Y': 200, 'Z': 1150},
                 {'X': 150, 'Y': 150, 'Z': 1100}, {'X': 250, 'Y': 250, 'Z': 1100},
                 {'X': 150, 'Y': 250, 'Z': 1100}, {'X': 250, 'Y': 150, 'Z': 1100}
-            ]
+            ])
             st.rerun()
             
         # --- Hapus titik terakhir ---
@@ -302,17 +471,23 @@ with st.sidebar:
                 st.rerun()
             else:
                 st.warning("Tidak ada titik untuk dihapus.")
+
+        # --- Hapus titik duplikat ---
+        if st.button("🧹 Hapus Titik Duplikat"):
+            removed = st.session_state['data_points'].dedupe()
+            st.toast(f"{removed} titik duplikat (X, Y, Z sama) dihapus.", icon="🧹")
+            st.rerun()
     
     # --- EXPORT & SESSION MANAGEMENT ---
     with st.expander("💾 Export & Session", expanded=False):
         st.markdown("### 📤 Export CSV")
 
         if not df.empty:
-            csv_data = df.to_csv(index=False).encode('utf-8')
-
+            # Frame baru dari PointStore: df nanti ditambah kolom Fluid di tab kontur
             st.download_button(
                 label="⬇ Download CSV Data",
-                data=csv_data,
+                data=lazy_report(report_key("raw-csv", data_key),
+                                 st.session_state['data_points'].to_frame().to_csv, index=False),
                 file_name=f"reservoir_points_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
                 mime="text/csv"
             )
@@ -323,86 +498,127 @@ with st.sidebar:
         col_save1, col_save2 = st.columns(2)
         
         with col_save1:
-            session_json = json.dumps(st.session_state['data_points'], indent=2)
+            session_grid = None
+            if len(df) >= 4:
+                # Grid yang sudah di-cache ikut disimpan agar load tidak perlu gridding ulang
+                session_grid = grid_surface(*grid_points[:3], grid_spec, grid_method)
+            session_args = {
+                'contacts': {k: st.session_state[k] for k in SESSION_CONTACT_KEYS if k in st.session_state},
+                'petrophysics': {k: st.session_state[k] for k in SESSION_PETRO_KEYS if k in st.session_state},
+                'preprocess': {'tolerance': merge_tolerance, 'cell_size': decluster_cell},
+            }
+            surfaces_key = {name: points_hash(sdf['X'], sdf['Y'], sdf['Z'])
+                            for name, sdf in st.session_state['surfaces'].items()}
+            # NPZ terkompresi baru ditulis saat tombol diklik
             st.download_button(
                 label="💾 Save Session",
-                data=session_json,
-                file_name=f"reservoir_session_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-                mime="application/json",
-                help="Simpan data session untuk digunakan kembali"
+                data=lazy_report(report_key("session", data_key, surfaces_key, session_args,
+                                            session_grid.key if session_grid is not None else None),
+                                 session_bytes, st.session_state['data_points'], dict(st.session_state['surfaces']),
+                                 grid=session_grid, **session_args),
+                file_name=f"reservoir_session_{datetime.now().strftime('%Y%m%d_%H%M%S')}.npz",
+                mime="application/octet-stream",
+                help="Simpan titik, surface, kontak, petrofisika & grid (NPZ terkompresi)"
             )
         
         with col_save2:
-            uploaded_session = st.file_uploader("📂 Load Session (JSON)", type=["json"], key="session_upload")
+            uploaded_session = st.file_uploader("📂 Load Session (NPZ / JSON lama)", type=["npz", "json"],
+                                                key="session_upload")
             if uploaded_session is not None:
                 try:
-                    session_data = json.load(uploaded_session)
-                    if isinstance(session_data, list) and all(
-                        ('X' in item and 'Y' in item and 'Z' in item) for item in session_data
-                    ):
-                        if st.button("📥 Muat Session", key="load_session"):
-                            st.session_state['data_points'] = session_data
-                            st.toast("Session berhasil dimuat!", icon='✅')
-                            st.rerun()
+                    if uploaded_session.name.lower().endswith('.json'):
+                        session = load_session_json(json.load(uploaded_session))
                     else:
-                        st.error("Format session tidak valid!")
+                        session = load_session(uploaded_session)
+                    if st.button("📥 Muat Session", key="load_session"):
+                        store = session['points']
+                        st.session_state['data_points'] = store
+                        st.session_state['surfaces'] = session['surfaces']
+                        if session['grid'] is not None:
+                            # Kunci grid diverifikasi ulang dari titik yang dimuat sebelum masuk cache
+                            prep = session['grid'].get('preprocess') or {}
+                            seed_points = preprocess_points(store.column('X'), store.column('Y'),
+                                                            store.column('Z'), prep.get('tolerance', 0.0),
+                                                            prep.get('cell_size'))
+                            try:
+                                seed_grid_cache(session['grid'], *seed_points[:3])
+                            except ValueError as e:
+                                st.toast(f"Grid session diabaikan (akan di-grid ulang): {e}", icon='⚠')
+                        # Hapus state widget agar default dari session berlaku di run berikutnya
+                        st.session_state['session_defaults'] = {**session['contacts'],
+                                                                **session['petrophysics']}
+                        for k in SESSION_CONTACT_KEYS + SESSION_PETRO_KEYS:
+                            st.session_state.pop(k, None)
+                        st.toast("Session berhasil dimuat!", icon='✅')
+                        st.rerun()
                 except Exception as e:
                     st.error(f"Error membaca session: {e}")
 
 # --- 3. LOGIC VISUALISASI UTAMA ---
+# Grid dihitung sekali per dataset (di-cache oleh grid_surface) dan dipakai semua tab
+grid = None
+surface_grids = {}
+if len(df) >= 4:
+    grid = grid_surface(*grid_points[:3], grid_spec, grid_method)
+    grid_z = grid.z
+
+    # Surface tambahan di-grid ke spec yang sama dengan top (paralel di process pool)
+    if st.session_state['surfaces']:
+        surface_points = {name: (sdf['X'], sdf['Y'], sdf['Z'])
+                          for name, sdf in st.session_state['surfaces'].items()}
+        try:
+            surface_grids = grid_surfaces(surface_points, grid.spec, grid_method)
+        except (QhullError, ValueError):
+            # Cari surface yang gagal; surface lain tetap dipakai
+            failed = []
+            for name, xyz in surface_points.items():
+                try:
+                    surface_grids[name] = grid_surface(*xyz, grid.spec, grid_method)
+                except (QhullError, ValueError):
+                    failed.append(name)
+            st.warning(f"Surface {', '.join(failed)} gagal di-grid (butuh >= 3 titik tidak segaris).")
+        # Kontak dari surface yang gagal jatuh ke nilai datar -> tampilkan, jangan diam-diam
+        for label, name in (("GOC", goc_surface), ("WOC", woc_surface)):
+            if name is not None and name not in surface_grids:
+                st.warning(f"{label} memakai kontak datar karena surface '{name}' tidak bisa di-grid.")
+        goc_surface = goc_surface if goc_surface in surface_grids else None
+        woc_surface = woc_surface if woc_surface in surface_grids else None
+goc_level = surface_grids[goc_surface].z if goc_surface in surface_grids else None
+woc_level = surface_grids[woc_surface].z if woc_surface in surface_grids else None
+
 if df.empty:
     st.info("👈 Silakan masukkan data koordinat melalui panel di sebelah kiri.")
     st.image("https://streamlit.io/images/brand/streamlit-mark-color.png", width=100)
 else:
     # Minimal 4 titik untuk kontur yang baik
     if len(df) >= 4:
-        df_unique = df.groupby(['X', 'Y'], as_index=False)['Z'].mean()
-        grid_x = np.linspace(df['X'].min(), df['X'].max(), 100)
-        grid_y = np.linspace(df['Y'].min(), df['Y'].max(), 100)
-        grid_x, grid_y = np.meshgrid(grid_x, grid_y)
-
-        try:
-            grid_z = griddata(
-                (df_unique['X'], df_unique['Y']),
-                df_unique['Z'],
-                (grid_x, grid_y),
-                method='cubic'
-            )
-        except Exception:
-            grid_z = griddata(
-                (df_unique['X'], df_unique['Y']),
-                df_unique['Z'],
-                (grid_x, grid_y),
-                method='linear'
-            )
-
         # --- PERHITUNGAN VOLUME ---
         st.markdown("### 📊 Estimasi Volume & Cadangan")
         
         x_min, x_max = df['X'].min(), df['X'].max()
         y_min, y_max = df['Y'].min(), df['Y'].max()
-        nx, ny = 100, 100
-        
-        dx = (x_max - x_min) / (nx - 1)
-        dy = (y_max - y_min) / (ny - 1)
-        cell_area = dx * dy
-        
-        # Volume di atas WOC (Total Reservoir)
-        thick_above_woc = woc_input - grid_z
-        thick_above_woc[thick_above_woc < 0] = 0
-        vol_total_res = np.nansum(thick_above_woc) * cell_area
-        
-        # Volume di atas GOC (Gas Cap)
-        thick_above_goc = goc_input - grid_z
-        thick_above_goc[thick_above_goc < 0] = 0
-        vol_gas_cap = np.nansum(thick_above_goc) * cell_area
         
-        # Volume Oil = selisih
-        vol_oil_zone = max(0, vol_total_res - vol_gas_cap)
+        # Volume di atas WOC (Total Reservoir) & GOC (Gas Cap), Oil = selisih.
+        # Tabel kedalaman kumulatif per grid di-cache -> geser GOC/WOC cukup binary search
+        if goc_level is None and woc_level is None:
+            volumes = compute_volumetrics(get_grv_table(grid), goc_input, woc_input,
+                                          porosity, sw, ntg, bo, bg)
+        else:
+            # Kontak terpetakan: ketebalan dihitung per node terhadap grid kontak
+            volumes = compute_volumetrics_mapped(
+                grid,
+                goc_level if goc_level is not None else goc_input,
+                woc_level if woc_level is not None else woc_input,
+                porosity, sw, ntg, bo, bg
+            )
+            st.caption(f"Kontak terpetakan: GOC = {goc_surface or 'datar'}, WOC = {woc_surface or 'datar'}")
+        vol_gas_cap = volumes['gas_cap']
+        vol_oil_zone = volumes['oil_zone']
+        vol_total_res = volumes['total']
 
         # STOIIP & GIIP
-        stoiip = (vol_oil_zone * ntg * porosity * (1 - sw)) / bo
-        giip = (vol_gas_cap * ntg * porosity * (1 - sw)) / bg
+        stoiip = volumes['stoiip']
+        giip = volumes['giip']
 
         col_vol1, col_vol2, col_vol3 = st.columns(3)
         def fmt_vol(v): return f"{v/1e6:.2f} Juta m³"
@@ -415,6 +631,108 @@ else:
         c_res1, c_res2 = st.columns(2)
         c_res1.metric("🔥 GIIP (Gas In Place)", f"{giip/1e9:.2f} BCF", help="Miliar Kaki Kubik")
         c_res2.metric("🛢 STOIIP (Oil In Place)", f"{stoiip/1e6:.2f} MMbbls", help="Juta Barel Minyak")
+
+        # --- VOLUMETRIK PROBABILISTIK ---
+        with st.expander("🎲 Volumetrik Probabilistik (Monte Carlo P90/P50/P10)", expanded=False):
+            run_mc = st.toggle("Aktifkan mode probabilistik", value=False)
+            if run_mc:
+                st.caption("Tiap parameter diambil sebagai distribusi; GRV diambil dari tabel kedalaman grid (tanpa gridding ulang).")
+                contact_spread = max((max_z - min_z) * 0.05, 1.0)
+                mc_inputs = {
+                    'porosity': distribution_input("Porositas (ϕ)", porosity, porosity * 0.2, "mc_phi"),
+                    'sw': distribution_input("Water Saturation (Sw)", sw, sw * 0.2, "mc_sw"),
+                    'ntg': distribution_input("Net-to-Gross (NTG)", ntg, ntg * 0.1, "mc_ntg"),
+                    'bo': distribution_input("Bo", bo, bo * 0.05, "mc_bo"),
+                    'bg': distribution_input("Bg", bg, bg * 0.1, "mc_bg"),
+                    'goc': distribution_input("GOC (m)", goc_input, contact_spread, "mc_goc"),
+                    'woc': distribution_input("WOC (m)", woc_input, contact_spread, "mc_woc"),
+                }
+                col_mc1, col_mc2, col_mc3 = st.columns(3)
+                mc_n = col_mc1.number_input("Jumlah realisasi", 1000, 5_000_000, 100_000, step=10_000)
+                mc_seed = col_mc2.number_input("Seed", 0, 2**31 - 1, 42)
+                mc_workers = col_mc3.number_input("Jumlah proses", 1, 16, 1,
+                                                  help="Lebih dari 1 = chunk sampel dibagi ke process pool")
+
+                try:
+                    mc_results = monte_carlo_volumetrics(get_grv_table(grid), mc_inputs, int(mc_n),
+                                                         seed=int(mc_seed), workers=int(mc_workers))
+                except ValueError as e:
+                    st.error(f"Error simulasi Monte Carlo: {e}")
+                    mc_results = None
+
+                if mc_results is not None:
+                    mc_summary = percentile_summary(mc_results)
+                    p_stoiip = mc_summary.set_index('Output').loc['stoiip']
+                    p_giip = mc_summary.set_index('Output').loc['giip']
+
+                    c_mc1, c_mc2, c_mc3 = st.columns(3)
+                    c_mc1.metric("🛢 STOIIP P90", f"{p_stoiip['P90']/1e6:.2f} MMbbls")
+                    c_mc2.metric("🛢 STOIIP P50", f"{p_stoiip['P50']/1e6:.2f} MMbbls")
+                    c_mc3.metric("🛢 STOIIP P10", f"{p_stoiip['P10']/1e6:.2f} MMbbls")
+                    c_mc1.metric("🔥 GIIP P90", f"{p_giip['P90']/1e9:.2f} BCF")
+                    c_mc2.metric("🔥 GIIP P50", f"{p_giip['P50']/1e9:.2f} BCF")
+                    c_mc3.metric("🔥 GIIP P10", f"{p_giip['P10']/1e9:.2f} BCF")
+
+                    col_hist1, col_hist2 = st.columns(2)
+                    for col_hist, key, scale, unit in [(col_hist1, 'stoiip', 1e6, "MMbbls"),
+                                                       (col_hist2, 'giip', 1e9, "BCF")]:
+                        fig_hist = go.Figure(go.Histogram(x=mc_results[key] / scale, nbinsx=60))
+                        row = mc_summary.set_index('Output').loc[key]
+                        for label, color in [('P90', 'red'), ('P50', 'green'), ('P10', 'blue')]:
+                            fig_hist.add_vline(x=row[label] / scale, line_dash="dash", line_color=color,
+                                               annotation_text=label)
+                        fig_hist.update_layout(height=350, title=f"Distribusi {key.upper()}",
+                                               xaxis_title=unit, yaxis_title="Frekuensi", showlegend=False)
+                        col_hist.plotly_chart(fig_hist, use_container_width=True)
+
+                    st.dataframe(mc_summary, use_container_width=True)
+                    st.download_button("⬇ Download Ringkasan P90/P50/P10 (CSV)",
+                                       data=mc_summary.to_csv(index=False),
+                                       file_name=f"montecarlo_summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                                       mime="text/csv")
+        # --- AREA-DEPTH (HIPSOMETRIK) ---
+        with st.expander("📐 Area–Depth / Area–Volume & Konvergensi Integrasi", expanded=False):
+            st.caption("Luas vs kedalaman dari kedalaman node grid terurut; GRV diintegrasikan "
+                       "dengan aturan trapesium, piramidal & Simpson (kontak datar).")
+            ad_steps = st.number_input("Jumlah interval kedalaman", 10, 10_000, AREA_DEPTH_STEPS, step=50)
+            grv_table = get_grv_table(grid)
+            ad_table = area_depth_table(grv_table, max(goc_input, woc_input), int(ad_steps))
+
+            ad_rows = []
+            for contact_name, contact_depth in [("GOC", goc_input), ("WOC", woc_input)]:
+                grv_rules = area_depth_grv(grv_table, contact_depth, int(ad_steps))
+                ad_rows.append({'Kontak': contact_name, 'Kedalaman (m)': contact_depth,
+                                'Prisma (m³)': grv_rules['prism'],
+                                **{f"{label} (m³)": grv_rules[rule] for rule, label in AREA_DEPTH_RULES.items()}})
+            st.dataframe(pd.DataFrame(ad_rows), use_container_width=True, hide_index=True)
+
+            fig_ad = go.Figure()
+            fig_ad.add_trace(go.Scatter(x=ad_table['Luas (m²)'] / 1e6, y=ad_table['Kedalaman (m)'],
+                                        mode='lines', name='Luas'))
+            for contact_name, contact_depth, color in [("GOC", goc_input, 'red'), ("WOC", woc_input, 'blue')]:
+                fig_ad.add_hline(y=contact_depth, line_dash="dash", line_color=color, annotation_text=contact_name)
+            fig_ad.update_layout(height=400, xaxis_title="Luas (km²)", yaxis_title="Kedalaman (m)",
+                                 yaxis_autorange="reversed", title="Kurva Area–Depth")
+            st.plotly_chart(fig_ad, use_container_width=True)
+            st.download_button("⬇ Download Tabel Area–Depth (CSV)", data=ad_table.to_csv(index=False),
+                               file_name=f"area_depth_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                               mime="text/csv")
+
+            if st.button("🔬 Uji Konvergensi Resolusi Grid"):
+                with st.spinner("Gridding ulang pada beberapa resolusi..."):
+                    st.session_state['grv_convergence'] = resolution_convergence(
+                        *grid_points[:3], woc_input, grid.spec.bounds, grid_method, steps=int(ad_steps))
+            convergence = st.session_state.get('grv_convergence')
+            if convergence is not None:
+                fig_conv = go.Figure()
+                for rule_label, part in convergence.groupby('Aturan', sort=False):
+                    fig_conv.add_trace(go.Scatter(x=part['Node per sumbu'], y=part['GRV (m³)'] / 1e6,
+                                                  mode='lines+markers', name=rule_label))
+                fig_conv.update_layout(height=350, xaxis_title="Node per sumbu", xaxis_type="log",
+                                       yaxis_title="GRV di atas WOC (Juta m³)", title="Konvergensi GRV")
+                st.plotly_chart(fig_conv, use_container_width=True)
+                st.dataframe(convergence, use_container_width=True, hide_index=True)
+
         # ===============================================
         #  🤖 NEW FEATURE: SMART ASSISTANT INTEGRATION
         # ===============================================
@@ -481,71 +799,63 @@ else:
         st.markdown("### 📄 Export Laporan Volumetrik")
         col_exp1, col_exp2, col_exp3 = st.columns(3)
         
+        # Laporan baru dibuat saat tombol diklik (di worker latar belakang) & di-cache per input
+        report_args = (vol_gas_cap, vol_oil_zone, vol_total_res, goc_input, woc_input, len(df),
+                       (df['X'].min(), df['X'].max()), (df['Y'].min(), df['Y'].max()),
+                       (df['Z'].min(), df['Z'].max()))
+        report_stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+
         with col_exp1:
-            try:
-                pdf_buffer = create_volumetric_report_pdf(
-                    vol_gas_cap, vol_oil_zone, vol_total_res,
-                    goc_input, woc_input,
-                    len(df),
-                    (df['X'].min(), df['X'].max()),
-                    (df['Y'].min(), df['Y'].max()),
-                    (df['Z'].min(), df['Z'].max())
-                )
-                st.download_button(
-                    label="📄 Download PDF Report",
-                    data=pdf_buffer,
-                    file_name=f"volumetric_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
-                    mime="application/pdf"
-                )
-            except Exception as e:
-                st.error(f"Error membuat PDF: {e}")
+            st.download_button(
+                label="📄 Download PDF Report",
+                data=lazy_report(report_key("pdf", report_args), create_volumetric_report_pdf,
+                                 *report_args),
+                file_name=f"volumetric_report_{report_stamp}.pdf",
+                mime="application/pdf"
+            )
         
         with col_exp2:
-            try:
-                excel_buffer = create_volumetric_report_excel(
-                    vol_gas_cap, vol_oil_zone, vol_total_res,
-                    goc_input, woc_input,
-                    len(df),
-                    (df['X'].min(), df['X'].max()),
-                    (df['Y'].min(), df['Y'].max()),
-                    (df['Z'].min(), df['Z'].max()),
-                    df
-                )
-                st.download_button(
-                    label="📊 Download Excel Report",
-                    data=excel_buffer,
-                    file_name=f"volumetric_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
-            except Exception as e:
-                st.error(f"Error membuat Excel: {e}")
+            raw_modes = list(RAW_DATA_MODES)
+            raw_mode = st.selectbox("Data mentah", raw_modes, index=raw_modes.index(default_raw_mode(len(df))),
+                                    format_func=RAW_DATA_MODES.get)
+            excel_ext, excel_mime = ((".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+                                     if raw_mode == "sheets" else (".zip", "application/zip"))
+            st.download_button(
+                label="📊 Download Excel Report",
+                data=lazy_report(report_key("xlsx", report_args, data_key, raw_mode),
+                                 create_volumetric_report_excel, *report_args,
+                                 st.session_state['data_points'].to_frame(), raw_mode),
+                file_name=f"volumetric_report_{report_stamp}{excel_ext}",
+                mime=excel_mime
+            )
         
         with col_exp3:
-            try:
-                grid_df = pd.DataFrame({
-                    'X': grid_x.flatten(),
-                    'Y': grid_y.flatten(),
-                    'Z': grid_z.flatten()
-                })
-                grid_csv = grid_df.to_csv(index=False)
-                st.download_button(
-                    label="📥 Download Grid Data (CSV)",
-                    data=grid_csv,
-                    file_name=f"grid_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                    mime="text/csv"
-                )
-            except Exception as e:
-                st.error(f"Error membuat CSV: {e}")
+            grid_format = st.selectbox("Format grid", list(GRID_EXPORT_FORMATS),
+                                       format_func=lambda f: GRID_EXPORT_FORMATS[f][0])
+            grid_gzip = st.checkbox("Kompres (gzip)", disabled=grid_format == "npz",
+                                    help="NPZ selalu terkompresi")
+            grid_label, grid_ext, grid_mime = GRID_EXPORT_FORMATS[grid_format]
+            if grid_gzip and grid_format != "npz":
+                grid_ext, grid_mime = grid_ext + ".gz", "application/gzip"
+            st.download_button(
+                label="📥 Download Grid Data",
+                data=lazy_report(report_key("grid", grid.key, grid_format, grid_gzip), grid_export_bytes,
+                                 grid, grid_format, grid_gzip),
+                file_name=f"grid_data_{report_stamp}{grid_ext}",
+                mime=grid_mime
+            )
 
         # --- TABS VISUALISASI (5 TAB) ---
       # --- TABS VISUALISASI (5 TAB) ---
-tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
+tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8 = st.tabs([
     "🗺 Peta Kontur 2D",
     "🧊 Model 3D",
     "📋 Data Mentah",
     "✂ Penampang (Baru)",
     "🔥 Heatmap Property",
-    "⭕ Perbandingan 3D (Before After)"
+    "⭕ Perbandingan 3D (Before After)",
+    "📈 Sensitivitas Kontak",
+    "✅ Validasi Silang"
 ])
 
 # pastikan ada minimal info untuk min_z / max_z (dipakai di beberapa tab)
@@ -556,47 +866,10 @@ else:
 
 # --- jika data cukup, jalankan perhitungan dan isi semua tab ---
 if len(df) >= 4:
-    # grid & interpolasi (siapkan aman dengan try/except)
-    df_unique = df.groupby(['X', 'Y'], as_index=False)['Z'].mean()
-    grid_x = np.linspace(df['X'].min(), df['X'].max(), 100)
-    grid_y = np.linspace(df['Y'].min(), df['Y'].max(), 100)
-    grid_x, grid_y = np.meshgrid(grid_x, grid_y)
-
-    try:
-        grid_z = griddata(
-            (df_unique['X'], df_unique['Y']),
-            df_unique['Z'],
-            (grid_x, grid_y),
-            method='cubic'
-        )
-    except Exception:
-        grid_z = griddata(
-            (df_unique['X'], df_unique['Y']),
-            df_unique['Z'],
-            (grid_x, grid_y),
-            method='linear'
-        )
-
-    # -- PERHITUNGAN VOLUME & CADANGAN (tetap di sini, karena cuma kalau data cukup) --
+    # -- VOLUME & CADANGAN --
+    # grid & volume sudah dihitung (dan di-cache) di atas, tidak perlu hitung ulang
     x_min, x_max = df['X'].min(), df['X'].max()
     y_min, y_max = df['Y'].min(), df['Y'].max()
-    nx, ny = 100, 100
-    dx = (x_max - x_min) / (nx - 1) if nx > 1 else 1.0
-    dy = (y_max - y_min) / (ny - 1) if ny > 1 else 1.0
-    cell_area = dx * dy
-
-    thick_above_woc = woc_input - grid_z
-    thick_above_woc[thick_above_woc < 0] = 0
-    vol_total_res = np.nansum(thick_above_woc) * cell_area
-
-    thick_above_goc = goc_input - grid_z
-    thick_above_goc[thick_above_goc < 0] = 0
-    vol_gas_cap = np.nansum(thick_above_goc) * cell_area
-
-    vol_oil_zone = max(0, vol_total_res - vol_gas_cap)
-
-    stoiip = (vol_oil_zone * ntg * porosity * (1 - sw)) / bo
-    giip = (vol_gas_cap * ntg * porosity * (1 - sw)) / bg
 
     # Metrics (bisa di atas tab atau di salah satu tab — saya tampilkan di atas tab1 untuk ringkasan)
     col_a, col_b, col_c = st.columns(3)
@@ -607,20 +880,60 @@ if len(df) >= 4:
     # === TAB 1: 2D ===
     with tab1:
         fig_2d = go.Figure()
-        fig_2d.add_trace(go.Contour(
-            z=grid_z,
-            x=np.linspace(x_min, x_max, grid_z.shape[1]),
-            y=np.linspace(y_min, y_max, grid_z.shape[0]),
-            colorscale='Greys',
-            opacity=0.4,
-            contours=dict(
-                start=min_z,
-                end=max_z,
-                size=(max_z - min_z) / 10 if max_z != min_z else 1,
-                showlabels=True
-            ),
-            name='Structure'
-        ))
+        contour_mode = st.radio("Render kontur", ["Garis server-side (ringan)", "Plotly Contour (grid penuh)"],
+                                horizontal=True,
+                                help="Server-side: marching squares di Python, browser hanya menerima polyline")
+        contour_levels = (np.linspace(min_z, max_z, 11) if max_z != min_z else np.array([min_z]))
+        # Outline daerah di atas kontak (kontak terpetakan atau datar)
+        contact_outlines = {
+            name: contact_outline(grid, level if level is not None else flat_z)
+            for name, level, flat_z in [("GOC", goc_level, goc_input), ("WOC", woc_level, woc_input)]
+        }
+
+        if contour_mode.startswith("Garis"):
+            structure_lines = {float(level): contour_lines(grid, level) for level in contour_levels}
+            line_x, line_y = line_trace_xy([line for lines in structure_lines.values() for line in lines])
+            fig_2d.add_trace(go.Scattergl(x=line_x, y=line_y, mode='lines',
+                                          line=dict(color='grey', width=1), name='Structure'))
+            # Label kedalaman di tengah garis terpanjang tiap level
+            label_xy, label_text = [], []
+            for level, lines in structure_lines.items():
+                if lines:
+                    longest = max(lines, key=len)
+                    label_xy.append(longest[len(longest) // 2])
+                    label_text.append(f"{level:.0f}")
+            if label_xy:
+                fig_2d.add_trace(go.Scatter(x=[p[0] for p in label_xy], y=[p[1] for p in label_xy],
+                                            mode='text', text=label_text,
+                                            textfont=dict(color='dimgrey'), showlegend=False))
+            for (name, outline), color in zip(contact_outlines.items(), ['red', 'blue']):
+                line_x, line_y = line_trace_xy(outline['polygons'])
+                fig_2d.add_trace(go.Scattergl(x=line_x, y=line_y, mode='lines',
+                                              line=dict(color=color, width=3), name=f"{name} outline"))
+        else:
+            fig_2d.add_trace(go.Contour(
+                z=grid_z,
+                x=grid.x,
+                y=grid.y,
+                colorscale='Greys',
+                opacity=0.4,
+                contours=dict(
+                    start=min_z,
+                    end=max_z,
+                    size=(max_z - min_z) / 10 if max_z != min_z else 1,
+                    showlabels=True
+                ),
+                name='Structure'
+            ))
+
+            # Garis potong kontak terpetakan dengan struktur (top - kontak = 0)
+            for level, color, name in [(goc_level, 'red', 'GOC (mapped)'), (woc_level, 'blue', 'WOC (mapped)')]:
+                if level is not None:
+                    fig_2d.add_trace(go.Contour(
+                        z=grid_z - level, x=grid.x, y=grid.y,
+                        contours=dict(start=0, end=0, size=1, coloring='none'),
+                        line=dict(color=color, width=3), showscale=False, name=name
+                    ))
 
         # point overlay colored by fluid
         conditions = [
@@ -649,13 +962,41 @@ if len(df) >= 4:
                              xaxis_title="X Coordinate", yaxis_title="Y Coordinate")
         st.plotly_chart(fig_2d, use_container_width=True)
 
+        # Luas & keliling poligon kontak (shoelace dari segmen marching squares)
+        st.markdown("#### 📐 Poligon Kontak")
+        st.dataframe(pd.DataFrame([
+            {'Kontak': name, 'Luas (m²)': outline['area'], 'Luas (km²)': outline['area'] / 1e6,
+             'Keliling (m)': outline['perimeter'], 'Jumlah poligon': len(outline['polygons'])}
+            for name, outline in contact_outlines.items()
+        ]), use_container_width=True, hide_index=True)
+        with st.expander("📏 Luas per Kedalaman Kontur"):
+            st.dataframe(contour_area_table(grid, contour_levels), use_container_width=True, hide_index=True)
+        polyline_sets = {name: outline['polygons'] for name, outline in contact_outlines.items()}
+        polyline_sets.update({f"Z {level:.1f}": contour_lines(grid, level) for level in contour_levels})
+        col_pl1, col_pl2 = st.columns(2)
+        contact_keys = [surface_grids[s].key if s in surface_grids else None for s in (goc_surface, woc_surface)]
+        polyline_key = (grid.key, goc_input, woc_input, contact_keys)
+        col_pl1.download_button("📥 Polyline Kontur (CSV)",
+                                data=lazy_report(report_key("polyline-csv", *polyline_key),
+                                                 polylines_csv, polyline_sets),
+                                file_name=f"kontur_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                                mime="text/csv")
+        col_pl2.download_button("📥 Polyline Kontur (GeoJSON)",
+                                data=lazy_report(report_key("polyline-geojson", *polyline_key),
+                                                 polylines_geojson, polyline_sets),
+                                file_name=f"kontur_{datetime.now().strftime('%Y%m%d_%H%M%S')}.geojson",
+                                mime="application/geo+json")
+
         # Export
-        try:
-            img_2d_png = fig_2d.to_image(format="png", width=1200, height=800)
-            st.download_button("🖼 Download PNG", data=img_2d_png,
+        # PNG (kaleido) dirender hanya saat diklik, di-cache berdasarkan data & parameter figure
+        if importlib.util.find_spec("kaleido") is not None:
+            st.download_button("🖼 Download PNG",
+                               data=lazy_report(report_key("png", *polyline_key, data_key, contour_mode),
+                                                fig_2d.to_image,
+                                                format="png", width=1200, height=800),
                                file_name=f"contour_2d_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png",
                                mime="image/png")
-        except Exception:
+        else:
             st.info("Export PNG 2D tidak tersedia (butuh orca/kaleido terpasang).")
 
     # === TAB 2: 3D ===
@@ -667,67 +1008,51 @@ if len(df) >= 4:
         fig_3d = go.Figure()
 
         # 2. Plot Permukaan Struktur (Surface)
-        fig_3d.add_trace(go.Surface(
-            z=grid_z, 
-            x=grid_x, 
-            y=grid_y, 
+        # Resolusi render terpisah dari grid komputasi -> payload browser tetap kecil
+        render_nodes = st.number_input("Resolusi render 3D (node per sumbu)", 20, 1000,
+                                       RENDER_MAX_NODES, step=10,
+                                       help="Grid komputasi tidak berubah, hanya surface yang dikirim ke browser")
+        fig_3d.add_trace(build_surface_trace(
+            grid.x, grid.y, grid_z,
+            max_nodes=int(render_nodes),
             colorscale='Earth_r', 
             opacity=0.9, 
             name='Structure'
         ))
 
-        # 3. Fungsi Helper untuk Bidang Kontak Fluida
-        def create_plane(z_lvl, color, name):
-            return go.Surface(
-                z=z_lvl * np.ones_like(grid_z), 
-                x=grid_x, 
-                y=grid_y,
-                colorscale=[[0, color], [1, color]], 
-                opacity=0.4, 
-                showscale=False, 
-                name=name
-            )
-
-        # 4. Plot GOC dan WOC
-        fig_3d.add_trace(create_plane(goc_input, 'red', 'GOC'))
-        fig_3d.add_trace(create_plane(woc_input, 'blue', 'WOC'))
+        # 3. Plot GOC dan WOC (bidang datar cukup 4 titik sudut)
+        # Kontak terpetakan digambar sebagai surface (resolusi render sama dengan struktur)
+        for level, flat_z, color, name in [(goc_level, goc_input, 'red', 'GOC'),
+                                           (woc_level, woc_input, 'blue', 'WOC')]:
+            if level is None:
+                fig_3d.add_trace(contact_plane(flat_z, grid.spec.bounds, color, name))
+            else:
+                fig_3d.add_trace(build_surface_trace(
+                    grid.x, grid.y, level, max_nodes=int(render_nodes),
+                    colorscale=[[0, color], [1, color]], opacity=0.4, showscale=False, name=name
+                ))
 
-        # 5. --- FITUR BARU: VISUALISASI SUMUR (WELLS) ---
+        # 4. --- FITUR BARU: VISUALISASI SUMUR (WELLS) ---
         # Menambahkan checkbox interaktif
         st.markdown("##### 🛤 Kontrol Visualisasi")
         show_wells = st.checkbox("Tampilkan Jalur Sumur (Wells)", value=True)
         
+        max_wells = st.number_input("Batas jumlah sumur ditampilkan (LOD)", 100, 100_000,
+                                    WELL_LOD_LIMIT, step=100,
+                                    help="Jika titik lebih banyak, sumur diambil merata sampai batas ini")
+        
         if show_wells:
-            # Loop setiap titik data untuk membuat garis sumur
-            for index, row in df.iterrows():
-                # Menentukan titik atas sumur. 
-                # Kita pakai min_z (titik teratas struktur) agar skala visualnya pas.
-                well_top = min_z 
-                
-                # Gambar Garis Sumur (Pipa)
-                fig_3d.add_trace(go.Scatter3d(
-                    x=[row['X'], row['X']], 
-                    y=[row['Y'], row['Y']], 
-                    z=[well_top, row['Z']], # Dari atas struktur ke titik target
-                    mode='lines',
-                    line=dict(color='grey', width=3), # Warna abu-abu pipa
-                    name=f'Well-{index+1}',
-                    showlegend=False,
-                    hoverinfo='text',
-                    text=f"Well-{index+1}<br>X: {row['X']}<br>Y: {row['Y']}<br>Depth: {row['Z']}m"
-                ))
-                
-                # Gambar Marker (Titik Target) di ujung bawah
-                fig_3d.add_trace(go.Scatter3d(
-                    x=[row['X']], y=[row['Y']], z=[row['Z']],
-                    mode='markers',
-                    marker=dict(size=5, color='black', symbol='diamond'), # Ikon diamond biar keren
-                    showlegend=False,
-                    hoverinfo='skip'
-                ))
+            # Semua sumur digabung jadi 1 trace garis (dipisah NaN) + 1 trace marker.
+            # Titik atas sumur pakai min_z (titik teratas struktur) agar skala visualnya pas.
+            well_traces, n_wells_shown = build_well_traces(
+                df['X'], df['Y'], df['Z'], well_top=min_z, max_wells=int(max_wells)
+            )
+            fig_3d.add_traces(well_traces)
+            if n_wells_shown < len(df):
+                st.caption(f"Menampilkan {n_wells_shown} dari {len(df)} sumur (level-of-detail).")
         # -----------------------------------------------
 
-        # 6. Layout & Render
+        # 5. Layout & Render
         fig_3d.update_layout(
             scene=dict(
                 xaxis_title='X (East)', 
@@ -743,37 +1068,124 @@ if len(df) >= 4:
     # === TAB 3: DATA MENTAH ===
     with tab3:
         st.dataframe(df, use_container_width=True)
-        csv_data = df.to_csv(index=False)
-        st.download_button("📥 Download CSV", data=csv_data,
+        # Termasuk kolom Fluid (bergantung GOC/WOC)
+        st.download_button("📥 Download CSV",
+                           data=lazy_report(report_key("raw-csv-fluid", data_key, goc_input, woc_input),
+                                            df.to_csv, index=False),
                            file_name=f"raw_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
                            mime="text/csv")
 
     # === TAB 4: CROSS SECTION ===
     with tab4:
         st.markdown("##### ✂ Penampang Melintang (Cross-Section)")
-        st.caption("Geser slider untuk memotong peta dari Barat ke Timur pada posisi Y tertentu.")
-        slice_y = st.slider("Pilih Posisi Irisan Y", float(y_min), float(y_max), float((y_min + y_max) / 2))
-        idx_y = (np.abs(grid_y[:, 0] - slice_y)).argmin()
-        z_profile = grid_z[idx_y, :]
+        st.caption("Penampang sepanjang azimuth, polyline, atau banyak penampang sejajar (fence); "
+                   "grid disampel bilinear pada jarak sampel yang dipilih.")
+        xs_mode = st.radio("Jenis penampang:", ["Azimuth", "Polyline", "Fence (banyak penampang)"],
+                           horizontal=True)
+        center = ((x_min + x_max) / 2, (y_min + y_max) / 2)
+        diagonal = float(np.hypot(x_max - x_min, y_max - y_min))
+        # Sampel lebih rapat dari 1/10 sel tidak menambah detail interpolasi bilinear
+        xs_spacing = st.number_input("Jarak sampel (m)", min_value=float(min(grid.dx, grid.dy)) / 10,
+                                     value=float(min(grid.dx, grid.dy)), format="%.2f")
+        # Kontak terpetakan ikut disampel; kontak datar digambar sebagai garis horizontal
+        xs_contacts = {name: level for name, level in (("GOC", goc_level), ("WOC", woc_level))
+                       if level is not None}
+
+        if xs_mode == "Fence (banyak penampang)":
+            col_f1, col_f2, col_f3 = st.columns(3)
+            with col_f1:
+                fence_azimuth = st.slider("Azimuth penampang (°)", 0.0, 180.0, 90.0, 1.0)
+            with col_f2:
+                fence_n = st.number_input("Jumlah penampang", 1, 1000, 50)
+            with col_f3:
+                fence_gap = st.number_input("Jarak antar penampang (m)", min_value=0.01,
+                                            value=float(diagonal / max(int(fence_n), 1)), format="%.2f")
+            fence = fence_sections(grid, center, fence_azimuth, diagonal, int(fence_n), fence_gap, xs_spacing)
+            xs_used_spacing = fence['spacing']
+            # Slider butuh min < max: satu penampang langsung dipakai
+            fence_idx = (st.slider("Penampang ke-", 1, int(fence_n), (int(fence_n) + 1) // 2) - 1
+                         if fence_n > 1 else 0)
+
+            # Ringkasan semua penampang sekaligus: offset vs jarak, warna = kedalaman
+            fig_fence = go.Figure(go.Heatmap(x=fence['distance'], y=fence['offset'], z=fence['z'],
+                                             colorscale='Viridis', reversescale=True,
+                                             colorbar=dict(title="Depth (m)")))
+            fig_fence.add_hline(y=fence['offset'][fence_idx], line_color="white", line_dash="dot")
+            fig_fence.update_layout(height=400, title="Fence diagram (semua penampang)",
+                                    xaxis_title="Jarak sepanjang penampang (m)", yaxis_title="Offset (m)")
+            st.plotly_chart(fig_fence, use_container_width=True)
+
+            xs_profile = pd.DataFrame({'Jarak (m)': fence['distance'], 'X': fence['x'][fence_idx],
+                                       'Y': fence['y'][fence_idx], 'Z': fence['z'][fence_idx]})
+            for name, level in xs_contacts.items():
+                xs_profile[name] = sample_grid(grid.x, grid.y, level, xs_profile['X'], xs_profile['Y'])
+            xs_lines = [np.column_stack([fence['x'][k, [0, -1]], fence['y'][k, [0, -1]]])
+                        for k in range(int(fence_n))]
+            xs_title = f"Penampang {fence_idx + 1}/{int(fence_n)} (offset {fence['offset'][fence_idx]:.1f} m)"
+        else:
+            if xs_mode == "Azimuth":
+                col_a1, col_a2 = st.columns(2)
+                with col_a1:
+                    xs_azimuth = st.slider("Azimuth (°, dari utara)", 0.0, 180.0, 90.0, 1.0)
+                with col_a2:
+                    xs_length = st.number_input("Panjang penampang (m)", min_value=1.0, value=diagonal)
+                xs_vertices = azimuth_line(center, xs_azimuth, xs_length)
+                xs_title = f"Penampang azimuth {xs_azimuth:.0f}°"
+            else:
+                default_vertices = f"{x_min:.2f}, {y_min:.2f}\n{center[0]:.2f}, {y_max:.2f}\n{x_max:.2f}, {y_min:.2f}"
+                vertex_text = st.text_area("Vertex polyline (X, Y per baris)", default_vertices)
+                try:
+                    xs_vertices = np.array([[float(v) for v in line.split(",")]
+                                            for line in vertex_text.strip().splitlines() if line.strip()])
+                except ValueError:
+                    xs_vertices = np.empty((0, 2))
+                if xs_vertices.ndim != 2 or xs_vertices.shape[1] != 2 or len(xs_vertices) < 2:
+                    st.warning("Masukkan minimal 2 vertex dengan format: X, Y")
+                    xs_vertices = azimuth_line(center, 90.0, diagonal)
+                xs_title = f"Penampang polyline ({len(xs_vertices)} vertex)"
+            xs_profile = section_profile(grid, xs_vertices, xs_spacing, xs_contacts)
+            xs_lines = [xs_vertices]
+            xs_used_spacing = station_spacing(np.hypot(*np.diff(xs_vertices, axis=0).T).sum(), xs_spacing)
+        if xs_used_spacing > xs_spacing:
+            st.caption(f"Jarak sampel diperbesar ke {xs_used_spacing:.2f} m agar total titik penampang "
+                       f"tidak melebihi {MAX_SECTION_STATIONS:,}.")
+
         fig_xs = go.Figure()
-        fig_xs.add_trace(go.Scatter(x=grid_x[0, :], y=z_profile, mode='lines', fill='tozeroy', name='Top Structure'))
-        fig_xs.add_hline(y=goc_input, line_dash="dash", line_color="red", annotation_text="GOC")
-        fig_xs.add_hline(y=woc_input, line_dash="dash", line_color="blue", annotation_text="WOC")
+        fig_xs.add_trace(go.Scatter(x=xs_profile['Jarak (m)'], y=xs_profile['Z'], mode='lines',
+                                    fill='tozeroy', name='Top Structure'))
+        for name, color in (("GOC", "red"), ("WOC", "blue")):
+            if name in xs_profile:
+                fig_xs.add_trace(go.Scatter(x=xs_profile['Jarak (m)'], y=xs_profile[name], mode='lines',
+                                            line=dict(color=color, dash='dash'), name=name))
+            else:
+                fig_xs.add_hline(y=goc_input if name == "GOC" else woc_input, line_dash="dash",
+                                 line_color=color, annotation_text=name)
         fig_xs.update_yaxes(autorange="reversed", title="Depth (m)")
-        fig_xs.update_layout(title=f"Irisan pada Y = {slice_y:.1f}", xaxis_title="X Coordinate", height=500)
+        fig_xs.update_layout(title=xs_title, xaxis_title="Jarak sepanjang penampang (m)", height=500)
         st.plotly_chart(fig_xs, use_container_width=True)
 
+        # Lokasi penampang di peta (semua garis dalam satu trace, dipisah NaN)
+        fig_xs_map = go.Figure(go.Contour(x=grid.x, y=grid.y, z=grid.z, colorscale='Viridis',
+                                          reversescale=True, showscale=False, opacity=0.7))
+        map_x = np.concatenate([np.append(line[:, 0], np.nan) for line in xs_lines])
+        map_y = np.concatenate([np.append(line[:, 1], np.nan) for line in xs_lines])
+        fig_xs_map.add_trace(go.Scatter(x=map_x, y=map_y, mode='lines', line=dict(color='red', width=1),
+                                        name='Penampang'))
+        fig_xs_map.update_layout(height=400, xaxis_title="X", yaxis_title="Y",
+                                 yaxis=dict(scaleanchor="x", scaleratio=1))
+        st.plotly_chart(fig_xs_map, use_container_width=True)
+
+        st.download_button(label="⬇ Download Profil Penampang (CSV)", data=xs_profile.to_csv(index=False),
+                           file_name=f"cross_section_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                           mime="text/csv")
+
     # === TAB 5: HEATMAP PROPERTY ===
     with tab5:
         st.subheader("🔥 Heatmap Interpolasi Properti")
         st.markdown("Pilih properti yang ingin di-interpolasi (Porosity/Sw/NTG atau custom upload).")
 
-        # use petrophys params per-point (scalar sliders) -> expand to grid by repeating per-point
-        df_prop = df.copy()
-        # kalau porosity/sw/ntg adalah scalar (slider), buat kolom constant per titik
-        df_prop["Porosity"] = porosity
-        df_prop["Sw"] = sw
-        df_prop["NTG"] = ntg
+        # Porosity/Sw/NTG dari slider (skalar) -> nilai konstan per titik, tanpa menyalin df
+        scalar_props = {"Porosity": porosity, "Sw": sw, "NTG": ntg}
 
         option = st.selectbox("Sumber properti:", ["Porosity", "Sw", "NTG", "Depth (Z)", "Upload CSV (kolom VALUE)"])
         if option == "Upload CSV (kolom VALUE)":
@@ -789,108 +1201,208 @@ if len(df) >= 4:
                 prop_values = None
         else:
             if option == "Depth (Z)":
-                prop_values = df_prop["Z"].values
+                prop_values = df["Z"].values
             else:
-                prop_values = df_prop[option].values
+                prop_values = np.full(len(df), scalar_props[option], dtype=np.float64)
 
         if prop_values is None:
             st.info("Belum ada property yang valid untuk di-interpolasi.")
         else:
-            try:
-                grid_prop = griddata((df["X"], df["Y"]), prop_values, (grid_x, grid_y), method='cubic')
-            except Exception:
-                grid_prop = griddata((df["X"], df["Y"]), prop_values, (grid_x, grid_y), method='linear')
-
-            fig_heat = go.Figure(data=go.Heatmap(
-                x=np.linspace(x_min, x_max, grid_prop.shape[1]),
-                y=np.linspace(y_min, y_max, grid_prop.shape[0]),
-                z=grid_prop,
-                colorscale="Viridis",
-                colorbar=dict(title=f"{option}")
-            ))
-            fig_heat.update_layout(height=650, xaxis_title="X", yaxis_title="Y", title=f"Heatmap {option} (Interpolated)")
+            # Lewat grid_surface: cache memori/disk + jalur per blok untuk grid besar;
+            # triangulasi & bobot lokasi titik tetap dipakai ulang antar properti
+            heat_method = st.radio("Metode interpolasi:", ["linear", "cubic"], horizontal=True,
+                                   help="Linear memakai bobot barycentric yang sudah di-cache (paling cepat)")
+            fig_heat, heat_grid = generate_property_heatmap(df["X"], df["Y"], prop_values, option,
+                                                            grid.spec, heat_method)
             st.plotly_chart(fig_heat, use_container_width=True)
 
-            # export
-            heat_df = pd.DataFrame({'X': grid_x.flatten(), 'Y': grid_y.flatten(), option: grid_prop.flatten()})
+            # export: CSV node grid baru ditulis saat diklik, di-cache per grid properti
             st.download_button(label=f"⬇ Download {option} Heatmap CSV",
-                               data=heat_df.to_csv(index=False),
+                               data=lazy_report(report_key("heatmap-csv", heat_grid.key, option),
+                                                heatmap_csv, heat_grid, option),
                                file_name=f"heatmap_{option.replace(' ','')}{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
                                mime="text/csv")
             
-      # === TAB 6: PERBANDINGAN 3D BEFORE–AFTER ===
+    # === TAB 7: SENSITIVITAS KONTAK ===
+    with tab7:
+        st.subheader("📈 Kurva GRV vs Kedalaman Kontak")
+        st.caption("Semua kedalaman kontak dievaluasi sekaligus dari tabel kedalaman kumulatif grid.")
+
+        col_sw1, col_sw2, col_sw3 = st.columns(3)
+        with col_sw1:
+            sweep_vary = st.radio("Kontak yang digeser:", ["GOC", "WOC"], horizontal=True)
+        with col_sw2:
+            sweep_lo, sweep_hi = float(min_z), float(max_z)
+            if sweep_hi <= sweep_lo:
+                # Semua Z sama -> rentang dilebarkan agar slider tetap punya min < max
+                sweep_lo, sweep_hi = sweep_lo - 1.0, sweep_hi + 1.0
+            sweep_range = st.slider("Rentang kedalaman (m)", sweep_lo, sweep_hi, (sweep_lo, sweep_hi))
+        with col_sw3:
+            sweep_n = st.number_input("Jumlah kedalaman", 10, 5000, 200, step=10)
+
+        sweep_df = contact_sweep(
+            get_grv_table(grid), np.linspace(sweep_range[0], sweep_range[1], int(sweep_n)),
+            sweep_vary, goc_input, woc_input, porosity, sw, ntg, bo, bg
+        )
+        depth_col = f"{sweep_vary} (m)"
+
+        fig_sweep = go.Figure()
+        for col_name, color in [("Gas Cap (m³)", "red"), ("Oil Zone (m³)", "green"),
+                                ("Total Reservoir (m³)", "blue")]:
+            fig_sweep.add_trace(go.Scatter(x=sweep_df[depth_col], y=sweep_df[col_name] / 1e6,
+                                           mode='lines', name=col_name, line=dict(color=color)))
+        current_contact = goc_input if sweep_vary == "GOC" else woc_input
+        fig_sweep.add_vline(x=current_contact, line_dash="dash", line_color="grey",
+                            annotation_text=f"{sweep_vary} saat ini")
+        fig_sweep.update_layout(height=450, xaxis_title=f"Kedalaman {sweep_vary} (m)",
+                                yaxis_title="Volume (Juta m³)")
+        st.plotly_chart(fig_sweep, use_container_width=True)
+
+        fig_res = go.Figure()
+        fig_res.add_trace(go.Scatter(x=sweep_df[depth_col], y=sweep_df["STOIIP (bbl)"] / 1e6,
+                                     mode='lines', name="STOIIP (MMbbls)"))
+        fig_res.add_trace(go.Scatter(x=sweep_df[depth_col], y=sweep_df["GIIP (scf)"] / 1e9,
+                                     mode='lines', name="GIIP (BCF)", yaxis="y2"))
+        fig_res.update_layout(height=400, xaxis_title=f"Kedalaman {sweep_vary} (m)",
+                              yaxis=dict(title="STOIIP (MMbbls)"),
+                              yaxis2=dict(title="GIIP (BCF)", overlaying="y", side="right"))
+        st.plotly_chart(fig_res, use_container_width=True)
+
+        st.download_button(label="⬇ Download Kurva Sensitivitas (CSV)",
+                           data=sweep_df.to_csv(index=False),
+                           file_name=f"contact_sweep_{sweep_vary}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                           mime="text/csv")
+
+    # === TAB 8: VALIDASI SILANG ===
+    with tab8:
+        st.subheader("✅ Validasi Silang Gridding")
+        st.caption(f"Prediksi ulang tiap titik tanpa dirinya sendiri dengan metode "
+                   f"{METHOD_LABELS.get(grid_method, grid_method)}.")
+
+        col_cv1, col_cv2 = st.columns(2)
+        with col_cv1:
+            cv_scheme = st.radio("Skema:", ["Leave-one-out", "K-fold"], horizontal=True)
+        with col_cv2:
+            cv_folds = st.number_input("Jumlah fold", 2, 50, 5, disabled=cv_scheme != "K-fold")
+        cv_folds = "loo" if cv_scheme == "Leave-one-out" else int(cv_folds)
+
+        # Data kecil langsung divalidasi (hasil di-cache per dataset & metode)
+        cv_result = None
+        if prep_report['output'] <= CV_AUTO_MAX_POINTS or st.button("▶ Jalankan Validasi"):
+            with st.spinner("Menjalankan validasi silang..."):
+                cv_result = cross_validate(*grid_points[:3], grid_method, cv_folds,
+                                           workers=GRID_WORKERS)
+
+        if cv_result is not None:
+            m_cv1, m_cv2, m_cv3 = st.columns(3)
+            m_cv1.metric("RMSE", f"{cv_result['rmse']:.2f} m")
+            m_cv2.metric("MAE", f"{cv_result['mae']:.2f} m")
+            m_cv3.metric("Titik Terprediksi", f"{cv_result['coverage'] * 100:.0f}%")
+            if cv_result.get('approximate'):
+                st.caption(f"⚠ Pendekatan: LOO cubic untuk lebih dari {CV_EXACT_CUBIC_POINTS} titik memakai "
+                           "lingkungan Delaunay dua ring, bukan triangulasi ulang penuh.")
+            st.plotly_chart(build_residual_map(cv_result, grid), use_container_width=True)
+            cv_df = cv_table(cv_result)
+            st.download_button(label="⬇ Download Residual (CSV)", data=cv_df.to_csv(index=False),
+                               file_name=f"cv_residual_{grid_method}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                               mime="text/csv")
+
+    # === TAB 6: PERBANDINGAN 3D BEFORE–AFTER ===
     with tab6:
         st.subheader("⭕ Perbandingan 3D Sebelum–Sesudah")
-        st.info("Upload dua dataset untuk melihat perubahan struktur reservoir sebelum dan sesudah.")
+        st.info("Upload dua dataset (atau lebih untuk time-lapse) untuk melihat perubahan struktur reservoir. "
+                "Semua survey di-grid ke satu grid bersama sehingga node selisihnya berimpit.")
 
         colA, colB = st.columns(2)
         with colA:
             file_before = st.file_uploader("Upload Data Before", type=["csv"])
         with colB:
             file_after = st.file_uploader("Upload Data After", type=["csv"])
+        files_extra = st.file_uploader("Survey tambahan (opsional, time-lapse)", type=["csv"],
+                                       accept_multiple_files=True)
 
-    # ===== CEK FILE =====
         if file_before is None or file_after is None:
             st.warning("Silakan upload kedua file (Before & After) terlebih dahulu.")
-            st.stop()
-
-    # ===== BACA DATA =====
-        df_before = pd.read_csv(file_before)
-        df_after = pd.read_csv(file_after)
-
-        required = {"X", "Y", "Z"}
-        if not required.issubset(df_before.columns) or not required.issubset(df_after.columns):
-            st.error("CSV harus memiliki kolom: X, Y, Z.")
-            st.stop()
-
-    # ===== INTERPOLASI BEFORE =====
-        dfb = df_before.groupby(["X", "Y"], as_index=False)["Z"].mean()
-        xb, yb, zb = dfb["X"].values, dfb["Y"].values, dfb["Z"].values
-
-        gx_b, gy_b = np.meshgrid(
-            np.linspace(xb.min(), xb.max(), 100),
-            np.linspace(yb.min(), yb.max(), 100)
-        )
-        gz_b = griddata((xb, yb), zb, (gx_b, gy_b), method="linear")
-
-    # ===== INTERPOLASI AFTER =====
-        dfa = df_after.groupby(["X", "Y"], as_index=False)["Z"].mean()
-        xa, ya, za = dfa["X"].values, dfa["Y"].values, dfa["Z"].values
-
-        gx_a, gy_a = np.meshgrid(
-            np.linspace(xa.min(), xa.max(), 100),
-            np.linspace(ya.min(), ya.max(), 100)
-        )
-        gz_a = griddata((xa, ya), za, (gx_a, gy_a), method="linear")
-
-    # ===== PLOT BEFORE & AFTER =====
-        from plotly.subplots import make_subplots
-
-        fig = make_subplots(
-            rows=1, cols=2,
-            specs=[[{"type": "surface"}, {"type": "surface"}]],
-            subplot_titles=("Before", "After")
-        )
-
-        fig.add_trace(go.Surface(x=gx_b, y=gy_b, z=gz_b, colorscale="Viridis"), row=1, col=1)
-        fig.add_trace(go.Surface(x=gx_a, y=gy_a, z=gz_a, colorscale="Turbo"), row=1, col=2)
+        else:
+            survey_files = [("Before", file_before), ("After", file_after)]
+            survey_files += [(f.name, f) for f in files_extra or []]
+            surveys, invalid, survey_grid = {}, [], None
+            for name, file in survey_files:
+                sdf = pd.read_csv(file)
+                if {"X", "Y", "Z"}.issubset(sdf.columns) and len(sdf) >= 3:
+                    surveys[name] = (sdf["X"].to_numpy(float), sdf["Y"].to_numpy(float), sdf["Z"].to_numpy(float))
+                else:
+                    invalid.append(name)
 
-        fig.update_layout(height=600, margin=dict(l=10, r=10, t=40, b=10))
-        st.plotly_chart(fig, use_container_width=True)
+            if invalid:
+                st.error(f"CSV harus memiliki kolom X, Y, Z (minimal 3 titik): {', '.join(invalid)}")
+            elif len(surveys) < 2:
+                st.error("Nama survey tambahan bentrok dengan Before/After; ganti nama file.")
+            else:
+                # Triangulasi ter-cache dipakai ulang untuk survey dengan lokasi X/Y sama
+                try:
+                    survey_grid = resample_surveys(surveys, GridSpec(grid_spec.nx, grid_spec.ny,
+                                                                     cell_size=grid_spec.cell_size))
+                except (QhullError, ValueError) as e:
+                    st.error(f"Gagal meng-grid survey (butuh >= 3 titik tidak segaris): {e}")
+
+            if survey_grid is not None:
+                compare_names = survey_grid['names'][1:]
+                compare_name = st.selectbox("Survey yang dibandingkan dengan Before", compare_names,
+                                            index=0)
+                compare_idx = survey_grid['names'].index(compare_name)
+
+                fig = make_subplots(
+                    rows=1, cols=2,
+                    specs=[[{"type": "surface"}, {"type": "surface"}]],
+                    subplot_titles=("Before", compare_name)
+                )
+                fig.add_trace(build_surface_trace(survey_grid['x'], survey_grid['y'], survey_grid['z'][0],
+                                                  colorscale="Viridis", showscale=False), row=1, col=1)
+                fig.add_trace(build_surface_trace(survey_grid['x'], survey_grid['y'],
+                                                  survey_grid['z'][compare_idx], colorscale="Turbo"),
+                              row=1, col=2)
+                fig.update_layout(height=600, margin=dict(l=10, r=10, t=40, b=10))
+                st.plotly_chart(fig, use_container_width=True)
+
+                # ===== SELISIH =====
+                st.subheader(f"📉 Selisih Elevasi ({compare_name} – Before)")
+                diff_maps = difference_maps(survey_grid)
+                rx, ry, rdiff = decimate_grid(survey_grid['x'], survey_grid['y'], diff_maps[compare_idx])
+                diff_range = float(np.nanmax(np.abs(rdiff))) if np.isfinite(rdiff).any() else 1.0
+                fig_diff = go.Figure(go.Heatmap(x=rx, y=ry, z=rdiff, colorscale="RdBu",
+                                                zmid=0, zmin=-diff_range, zmax=diff_range,
+                                                colorbar=dict(title="Δ (m)")))
+                fig_diff.update_layout(height=550, title="Perbedaan Elevasi",
+                                       xaxis_title="X Coordinate", yaxis_title="Y Coordinate")
+                st.plotly_chart(fig_diff, use_container_width=True)
+
+                st.markdown("#### 📊 Statistik Selisih (semua survey vs Before)")
+                diff_table = difference_stats(survey_grid)
+                st.dataframe(diff_table, use_container_width=True, hide_index=True)
+
+                st.markdown("#### 🛢 Perubahan Volume di Antara Kontak")
+                col_c1, col_c2 = st.columns(2)
+                cmp_goc = col_c1.number_input("GOC perbandingan (m)", value=float(goc_input), key="cmp_goc")
+                cmp_woc = col_c2.number_input("WOC perbandingan (m)", value=float(woc_input), key="cmp_woc")
+                volume_table = contact_volume_change(survey_grid, cmp_goc, cmp_woc)
+                st.dataframe(volume_table, use_container_width=True, hide_index=True)
+
+                if len(survey_grid['names']) > 2:
+                    fig_tl = go.Figure()
+                    for column in ['Gas Cap (m³)', 'Oil Zone (m³)', 'Total Reservoir (m³)']:
+                        fig_tl.add_trace(go.Scatter(x=volume_table['Survey'], y=volume_table[column] / 1e6,
+                                                    mode='lines+markers', name=column.replace(' (m³)', '')))
+                    fig_tl.update_layout(height=350, title="GRV per Survey (time-lapse)",
+                                         yaxis_title="Juta m³")
+                    st.plotly_chart(fig_tl, use_container_width=True)
+
+                st.download_button("⬇ Download Statistik Perbandingan (CSV)",
+                                   data=diff_table.merge(volume_table, on='Survey', how='right').to_csv(index=False),
+                                   file_name=f"perbandingan_4d_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                                   mime="text/csv")
 
-    # ===== SELISIH =====
-        st.subheader("📉 Selisih Elevasi (After – Before)")
-    try:
-            diff = gz_a - gz_b
-            fig_diff = go.Figure(go.Surface(
-            x=gx_a, y=gy_a, z=diff, colorscale="RdBu"
-            ))
-            fig_diff.update_layout(height=600, title="Perbedaan Elevasi")
-            st.plotly_chart(fig_diff, use_container_width=True)
-    except:
-            st.warning("Grid Before dan After tidak cocok ukurannya.")
 
-  
 # --- jika data TIDAK cukup: tampilkan pesan di masing-masing tab (tab tetap ada) ---
 else:
     # small informative content per tab to avoid NameError / empty with-blocks
@@ -905,7 +1417,9 @@ else:
             st.subheader("📋 Data Mentah")
             st.dataframe(df, use_container_width=True)
             if not df.empty:
-                    st.download_button("📥 Download CSV", data=df.to_csv(index=False), file_name="raw_data.csv", mime="text/csv")
+                    st.download_button("📥 Download CSV",
+                                       data=lazy_report(report_key("raw-csv", data_key), df.to_csv, index=False),
+                                       file_name="raw_data.csv", mime="text/csv")
 
         with tab4:
             st.info("Penampang (Cross-section) akan aktif saat data cukup (>=4 titik).")
@@ -916,6 +1430,12 @@ else:
         with tab6:
             st.info("Perbandingan 3D Before–After memerlukan dua dataset dengan kolom X,Y,Z.")
 
+        with tab7:
+            st.info("Kurva sensitivitas kontak akan aktif saat data cukup (>=4 titik).")
+
+        with tab8:
+            st.info("Validasi silang akan aktif saat data cukup (>=4 titik).")
+
 
 # === TAB 5: FITUR EKSTENSI ===
 from extra_features import run_extra_features
@@ -928,72 +1448,42 @@ with tab_extra:
 # ============================
 #  PERHITUNGAN VOLUME RESERVOIR
 # ============================
+# Mode rincian volume pori dari mesin volumetrik yang sama (grid & GRV ter-cache di atas),
+# sehingga Bulk Volume = Total Reservoir / Gross Gas Volume tanpa pass ulang atas data.
 
 st.subheader("📦 Perhitungan Volume Reservoir")
 
-# Input parameter volumetrik
-col_v1, col_v2, col_v3 = st.columns(3)
-
-phi = col_v1.number_input("Porosity (ϕ)", 0.0, 1.0, 0.20)
-sw  = col_v2.number_input("Water Saturation (Sw)", 0.0, 1.0, 0.30)
-ntg = col_v3.number_input("Net-to-Gross (NTG)", 0.0, 1.0, 0.80)
-
-# ============================
-#  AUTO DETECT KOLom X, Y, Z
-# ============================
-
-possible_x = ["X", "x", "Easting", "easting", "Long", "long", "Longitude", "longitude"]
-possible_y = ["Y", "y", "Northing", "northing", "Lat", "lat", "Latitude", "latitude"]
-possible_z = ["Z", "z", "Depth", "depth", "TVD", "tvd", "Elevation", "elevation"]
-
-col_x = next((c for c in possible_x if c in df.columns), None)
-col_y = next((c for c in possible_y if c in df.columns), None)
-col_z = next((c for c in possible_z if c in df.columns), None)
-
-if col_x is None or col_y is None:
-    st.error("❌ Tidak menemukan kolom X/Y di file CSV. Harus ada koordinat X dan Y.")
-    st.stop()
-
-# Thickness (Z)
-if col_z:
-    thickness = df[col_z]
+if grid is None:
+    st.info("Perhitungan volume memerlukan grid struktur (minimal 4 titik).")
 else:
-    thickness = st.number_input("Masukkan thickness (jika kolom Z tidak tersedia)", 
-                                0.0, 500.0, 50.0)
-
-# ============================
-#  PERHITUNGAN AREA
-# ============================
-
-xmin, xmax = df[col_x].min(), df[col_x].max()
-ymin, ymax = df[col_y].min(), df[col_y].max()
-area = (xmax - xmin) * (ymax - ymin)
-
-# Volume bulk reservoir
-bulk_volume = area * (thickness.mean() if hasattr(thickness, "mean") else thickness)
-
-# Net reservoir volume
-net_volume = bulk_volume * ntg
-
-# Pore volume
-pore_volume = net_volume * phi
-
-# Hydrocarbon pore volume
-hcpv = pore_volume * (1 - sw)
-
-# ============================
-#  DISPLAY HASIL
-# ============================
-
-st.write("### 📊 Hasil Perhitungan")
-
-col_r1, col_r2 = st.columns(2)
-
-col_r1.metric("Area (m²)", f"{area:,.2f}")
-col_r2.metric("Bulk Volume (m³)", f"{bulk_volume:,.2f}")
-
-col_r1.metric("Net Volume (m³)", f"{net_volume:,.2f}")
-col_r2.metric("Pore Volume (m³)", f"{pore_volume:,.2f}")
-
-st.metric("Hydrocarbon Pore Volume (HCPV)", f"{hcpv:,.2f} m³")
-
+    pv_contact = st.radio("Volume di atas kontak", ["WOC (total reservoir)", "GOC (gas cap)"], horizontal=True)
+    if pv_contact.startswith("WOC"):
+        pv_level, pv_flat = woc_level, woc_input
+    else:
+        pv_level, pv_flat = goc_level, goc_input
+    pv = contact_volumes(grid, pv_level if pv_level is not None else pv_flat, porosity, sw, ntg)
+    st.caption(f"Parameter dari sidebar: ϕ = {porosity:.2f}, Sw = {sw:.2f}, NTG = {ntg:.2f}; "
+               f"kontak {'terpetakan' if pv_level is not None else f'datar {pv_flat:.0f} m'}.")
+
+    st.write("### 📊 Hasil Perhitungan")
+
+    col_r1, col_r2 = st.columns(2)
+
+    col_r1.metric("Area (m²)", f"{pv['area']:,.2f}", help="Luas node grid yang lebih dangkal dari kontak")
+    col_r2.metric("Bulk Volume (m³)", f"{pv['bulk']:,.2f}")
+
+    col_r1.metric("Net Volume (m³)", f"{pv['net']:,.2f}")
+    col_r2.metric("Pore Volume (m³)", f"{pv['pore']:,.2f}")
+
+    st.metric("Hydrocarbon Pore Volume (HCPV)", f"{pv['hcpv']:,.2f} m³")
+
+    with st.expander("🗺 Peta Net Thickness", expanded=False):
+        net_thickness = thickness_map(grid.z, pv_level if pv_level is not None else pv_flat) * ntg
+        # Dikirim ke browser dengan stride agar payload tetap kecil pada grid besar
+        stride = max(1, int(np.ceil(max(net_thickness.shape) / RENDER_MAX_NODES)))
+        shown = np.where(net_thickness > 0, net_thickness, np.nan)[::stride, ::stride]
+        fig_net = go.Figure(go.Heatmap(z=shown, x=grid.x[::stride], y=grid.y[::stride],
+                                       colorscale='YlOrBr', colorbar=dict(title="m")))
+        fig_net.update_layout(height=450, margin=dict(l=20, r=20, t=30, b=20),
+                              xaxis_title="X Coordinate", yaxis_title="Y Coordinate")
+        st.plotly_chart(fig_net, use_container_width=True)
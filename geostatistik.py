@@ -0,0 +1,132 @@
+import numpy as np
+from scipy.interpolate import RBFInterpolator
+from scipy.optimize import curve_fit
+from scipy.spatial import cKDTree
+from scipy.spatial.distance import pdist
+
+# Jumlah tetangga default tiap mesin (estimasi lokal -> skala ke ratusan ribu titik)
+IDW_NEIGHBORS = 12
+IDW_POWER = 2.0
+RBF_NEIGHBORS = 16
+KRIGING_NEIGHBORS = 16
+
+# Jumlah target per blok sistem kriging (m x (k+1) x (k+1) float64)
+KRIGING_BLOCK = 5_000
+# Sampel titik untuk variogram eksperimental
+VARIOGRAM_SAMPLE = 3000
+VARIOGRAM_LAGS = 15
+
+
+class IDWInterpolator:
+    """Inverse Distance Weighting dengan k tetangga terdekat (cKDTree)"""
+
+    def __init__(self, xy, values, neighbors=IDW_NEIGHBORS, power=IDW_POWER):
+        self.tree = cKDTree(xy)
+        self.values = np.asarray(values, dtype=np.float64)
+        self.k = min(neighbors, len(self.values))
+        self.power = power
+
+    def __call__(self, targets):
+        dist, idx = self.tree.query(targets, k=self.k, workers=-1)
+        if self.k == 1:
+            dist, idx = dist[:, None], idx[:, None]
+        with np.errstate(divide='ignore'):
+            weights = 1.0 / dist ** self.power
+        # Target tepat di titik data -> ambil nilai titik itu
+        exact = dist[:, 0] == 0
+        weights[exact] = 0.0
+        weights[exact, 0] = 1.0
+        return (weights * self.values[idx]).sum(axis=1) / weights.sum(axis=1)
+
+
+class LocalRBFInterpolator:
+    """RBF thin-plate spline dengan lingkungan k tetangga (scipy RBFInterpolator)"""
+
+    def __init__(self, xy, values, neighbors=RBF_NEIGHBORS):
+        self.rbf = RBFInterpolator(xy, values, neighbors=min(neighbors, len(values)),
+                                   kernel='thin_plate_spline')
+
+    def __call__(self, targets):
+        return self.rbf(targets)
+
+
+def exponential_variogram(h, nugget, psill, vrange):
+    return nugget + psill * (1.0 - np.exp(-3.0 * h / vrange))
+
+
+def fit_variogram(xy, values, n_lags=VARIOGRAM_LAGS, sample=VARIOGRAM_SAMPLE, seed=0):
+    """Fit model variogram eksponensial (nugget, partial sill, range) ke variogram eksperimental"""
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) > sample:
+        pick = np.random.default_rng(seed).choice(len(values), sample, replace=False)
+        xy, values = xy[pick], values[pick]
+    dist = pdist(xy)
+    gamma = 0.5 * pdist(values[:, None], 'sqeuclidean')
+    max_lag = dist.max() / 2 if len(dist) else 1.0
+    variance = values.var() if values.var() > 0 else 1.0
+    fallback = (0.0, variance, max(max_lag, 1e-9))
+
+    edges = np.linspace(0, max_lag, n_lags + 1)
+    lag_idx = np.digitize(dist, edges) - 1
+    valid = (lag_idx >= 0) & (lag_idx < n_lags)
+    counts = np.bincount(lag_idx[valid], minlength=n_lags)
+    if np.count_nonzero(counts) < 3:
+        return fallback
+    sums = np.bincount(lag_idx[valid], weights=gamma[valid], minlength=n_lags)
+    used = counts > 0
+    lags = ((edges[:-1] + edges[1:]) / 2)[used]
+    try:
+        params, _ = curve_fit(exponential_variogram, lags, sums[used] / counts[used],
+                              p0=fallback, sigma=1.0 / np.sqrt(counts[used]),
+                              bounds=([0, 1e-12, 1e-9], [variance * 2, variance * 4, max_lag * 4]))
+        return tuple(float(p) for p in params)
+    except (RuntimeError, ValueError):
+        return fallback
+
+
+class OrdinaryKrigingInterpolator:
+    """Ordinary kriging lokal (k tetangga) dengan variogram eksponensial yang di-fit otomatis.
+
+    Sistem kriging tiap target diselesaikan sekaligus per blok dengan np.linalg.solve.
+    """
+
+    def __init__(self, xy, values, neighbors=KRIGING_NEIGHBORS, variogram=None):
+        self.xy = np.asarray(xy, dtype=np.float64)
+        self.values = np.asarray(values, dtype=np.float64)
+        self.tree = cKDTree(self.xy)
+        self.k = min(neighbors, len(self.values))
+        self.variogram = variogram or fit_variogram(self.xy, self.values)
+
+    def _gamma(self, h):
+        # gamma(0) = 0 menurut definisi; nugget hanya berlaku untuk h > 0
+        return np.where(h > 0, exponential_variogram(h, *self.variogram), 0.0)
+
+    def __call__(self, targets):
+        targets = np.asarray(targets, dtype=np.float64)
+        out = np.empty(len(targets))
+        k = self.k
+        for start in range(0, len(targets), KRIGING_BLOCK):
+            block = targets[start:start + KRIGING_BLOCK]
+            dist, idx = self.tree.query(block, k=k, workers=-1)
+            if k == 1:
+                out[start:start + len(block)] = self.values[idx]
+                continue
+            pts = self.xy[idx]
+            pair_dist = np.linalg.norm(pts[:, :, None, :] - pts[:, None, :, :], axis=-1)
+
+            lhs = np.ones((len(block), k + 1, k + 1))
+            lhs[:, :k, :k] = self._gamma(pair_dist)
+            lhs[:, k, k] = 0.0
+            rhs = np.ones((len(block), k + 1, 1))
+            rhs[:, :k, 0] = self._gamma(dist)
+            weights = np.linalg.solve(lhs, rhs)[:, :k, 0]
+            out[start:start + len(block)] = (weights * self.values[idx]).sum(axis=1)
+        return out
+
+
+# Mesin interpolasi titik-sebar yang bisa mengisi di luar convex hull
+ENGINES = {
+    'idw': IDWInterpolator,
+    'rbf': LocalRBFInterpolator,
+    'kriging': OrdinaryKrigingInterpolator,
+}
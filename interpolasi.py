@@ -1,21 +1,700 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+
 import numpy as np
-from scipy.interpolate import griddata
+from scipy.interpolate import CloughTocher2DInterpolator, LinearNDInterpolator
+from scipy.sparse import csr_matrix
+from scipy.spatial import Delaunay, cKDTree
 import plotly.graph_objects as go
 
-def generate_property_heatmap(x, y, prop, prop_label="Property"):
-    # Grid
-    grid_x = np.linspace(min(x), max(x), 150)
-    grid_y = np.linspace(min(y), max(y), 150)
-    gx, gy = np.meshgrid(grid_x, grid_y)
+from geostatistik import ENGINES
+
+# Jumlah grid yang disimpan di cache proses (dipakai bersama semua session)
+GRID_CACHE_MAX_ENTRIES = 16
+# Batas memori tiap cache proses berisi array seukuran grid (grid, bobot triangulasi, tabel GRV, ...)
+GRID_CACHE_MAX_MB = float(os.environ.get('PBP_GRID_CACHE_MEM_MB', 1024))
+
+# Batas aman ukuran grid & jumlah node yang diproses per blok baris
+MAX_GRID_NODES = 25_000_000
+GRID_CHUNK_NODES = 1_000_000
+
+# Di atas jumlah node ini gridding memakai jalur per blok (grid_tiled) dengan thread pool
+TILED_GRID_NODES = 4_000_000
+GRID_WORKERS = min(4, os.cpu_count() or 1)
+
+# Metode gridding: triangulasi (hanya di dalam convex hull) + mesin titik-sebar di geostatistik.py
+INTERPOLATION_METHODS = ('cubic', 'linear') + tuple(ENGINES)
+
+# Cache grid di disk (dipakai bersama antar session & restart); direktori kosong = nonaktif
+GRID_DISK_CACHE_DIR = os.environ.get(
+    'PBP_GRID_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'pbp3d', 'grids'))
+GRID_DISK_CACHE_MAX_MB = float(os.environ.get('PBP_GRID_CACHE_MAX_MB', 2048))
+
+
+@dataclass(frozen=True)
+class GridSpec:
+    """Spesifikasi grid target: jumlah node atau ukuran sel, plus batas area (opsional)"""
+    nx: int = 100
+    ny: int = 100
+    bounds: tuple = None  # (x_min, x_max, y_min, y_max), None = ikut sebaran data
+    cell_size: float = None  # jika diisi, nx/ny dihitung dari extent / cell_size
+
+    def resolve(self, x, y):
+        """Kembalikan spec dengan bounds & nx/ny final (siap dipakai gridding)"""
+        if self.bounds is not None:
+            bounds = tuple(float(b) for b in self.bounds)
+        else:
+            bounds = (float(np.min(x)), float(np.max(x)), float(np.min(y)), float(np.max(y)))
+        if self.cell_size is None:
+            return GridSpec(self.nx, self.ny, bounds)
+
+        # Ukuran sel tetap: extent dibulatkan ke atas agar spasi node tepat = cell_size
+        x_min, x_max, y_min, y_max = bounds
+        nx = max(int(np.ceil((x_max - x_min) / self.cell_size - 1e-9)) + 1, 2)
+        ny = max(int(np.ceil((y_max - y_min) / self.cell_size - 1e-9)) + 1, 2)
+        bounds = (x_min, x_min + (nx - 1) * self.cell_size,
+                  y_min, y_min + (ny - 1) * self.cell_size)
+        return GridSpec(nx, ny, bounds)
+
+    @property
+    def n_nodes(self):
+        return self.nx * self.ny
+
+
+def estimate_grid_cost(spec, n_points=0, method='cubic'):
+    """Perkiraan kasar memori (MB) & waktu (detik) untuk spec yang sudah di-resolve"""
+    nodes = spec.n_nodes
+    # z float64 + mask + bobot sparse (3 nnz) + blok target sementara
+    memory_mb = (nodes * (8 + 1 + 3 * 12 + 4) + min(nodes, GRID_CHUNK_NODES) * 16 * 4) / 1e6
+    per_node = 1.5e-6 if method == 'cubic' else 0.6e-6
+    seconds = nodes * per_node + n_points * 5e-6
+    return {'nodes': nodes, 'memory_mb': memory_mb, 'seconds': seconds,
+            'chunked': nodes > GRID_CHUNK_NODES}
+
+
+def check_grid_spec(spec):
+    """Guardrail: tolak grid yang melebihi batas node"""
+    if spec.n_nodes > MAX_GRID_NODES:
+        raise ValueError(
+            f"Grid {spec.nx} x {spec.ny} ({spec.n_nodes:,} node) melebihi batas "
+            f"{MAX_GRID_NODES:,} node. Perbesar ukuran sel atau kurangi jumlah node."
+        )
+
+
+@dataclass(frozen=True)
+class GridResult:
+    """Hasil gridding: sumbu, nilai Z, mask node valid & ukuran sel"""
+    x: np.ndarray
+    y: np.ndarray
+    z: np.ndarray
+    mask: np.ndarray
+    spec: GridSpec
+    method: str
+    key: str
+
+    @property
+    def dx(self):
+        return (self.x[-1] - self.x[0]) / (len(self.x) - 1) if len(self.x) > 1 else 1.0
+
+    @property
+    def dy(self):
+        return (self.y[-1] - self.y[0]) / (len(self.y) - 1) if len(self.y) > 1 else 1.0
+
+    @property
+    def cell_area(self):
+        return self.dx * self.dy
+
+    def mesh(self):
+        """Meshgrid 2D (grid_x, grid_y) untuk plot Surface/ekspor"""
+        return np.meshgrid(self.x, self.y)
+
+
+def cache_nbytes(value, _depth=0):
+    """Perkiraan memori (byte) nilai cache: jumlah array NumPy/sparse di dalamnya.
+
+    Array memmap tidak dihitung (halaman file yang dikelola OS, bukan memori proses).
+    Future dihitung dari hasilnya setelah selesai (mis. bytes laporan).
+    """
+    if isinstance(value, np.memmap):
+        return 0
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, Future):
+        if not value.done() or value.cancelled() or value.exception() is not None:
+            return 0
+        return cache_nbytes(value.result(), _depth)
+    if isinstance(value, Delaunay):
+        # Tanpa menyentuh .transform (dihitung lazily oleh scipy)
+        return value.points.nbytes + value.simplices.nbytes + value.neighbors.nbytes
+    if _depth > 3:
+        return 0
+    if isinstance(value, dict):
+        return sum(cache_nbytes(v, _depth + 1) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(cache_nbytes(v, _depth + 1) for v in value)
+    if hasattr(value, '__dict__'):
+        return sum(cache_nbytes(v, _depth + 1) for v in vars(value).values())
+    return 0
+
+
+class LRUCache:
+    """Cache LRU sederhana yang aman dipakai dari beberapa thread Streamlit.
+
+    max_mb (opsional) membatasi total ukuran array di dalam cache selain jumlah entri;
+    entri terbaru selalu disimpan walau sendirian melebihi batas.
+    """
+
+    def __init__(self, max_entries, max_mb=None):
+        self.max_entries = max_entries
+        self.max_bytes = None if max_mb is None else int(max_mb * 1e6)
+        self._data = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key, value):
+        size = cache_nbytes(value) if self.max_bytes is not None else 0
+        with self._lock:
+            self._data[key] = value
+            self._sizes[key] = size
+            self._data.move_to_end(key)
+            self._evict()
+
+    def remeasure(self, key):
+        """Hitung ulang ukuran entri yang isinya baru lengkap (mis. Future yang selesai)"""
+        if self.max_bytes is None:
+            return
+        with self._lock:
+            if key in self._data:
+                self._sizes[key] = cache_nbytes(self._data[key])
+                self._evict()
+
+    def _evict(self):
+        while len(self._data) > self.max_entries or (
+                self.max_bytes is not None and len(self._data) > 1 and self.nbytes > self.max_bytes):
+            old_key, _ = self._data.popitem(last=False)
+            del self._sizes[old_key]
 
-    # Interpolasi
-    grid_prop = griddata((x, y), prop, (gx, gy), method='cubic')
+    @property
+    def nbytes(self):
+        return sum(self._sizes.values())
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+_grid_cache = LRUCache(GRID_CACHE_MAX_ENTRIES, GRID_CACHE_MAX_MB)
+
+
+class DiskGridCache:
+    """Cache grid di disk: z disimpan sebagai .npy (dibuka memmap) + metadata JSON.
+
+    Entri lama dibuang (LRU berdasarkan waktu akses) jika total ukuran melewati max_mb.
+    Setiap entri diverifikasi (kunci, ukuran, shape & checksum) sebelum dipakai.
+    """
+
+    def __init__(self, directory, max_mb=GRID_DISK_CACHE_MAX_MB):
+        self.directory = directory
+        self.max_bytes = int(max_mb * 1e6)
+        self._lock = threading.Lock()
+
+    def _paths(self, key):
+        name = hashlib.sha1(key.encode()).hexdigest()
+        return os.path.join(self.directory, name + '.npy'), os.path.join(self.directory, name + '.json')
+
+    @staticmethod
+    def _checksum(z):
+        h = hashlib.sha1()
+        flat = z.reshape(-1)
+        for start in range(0, flat.size, GRID_CHUNK_NODES):
+            h.update(np.ascontiguousarray(flat[start:start + GRID_CHUNK_NODES]).tobytes())
+        return h.hexdigest()
+
+    def get(self, key):
+        data_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, encoding='utf-8') as fh:
+                meta = json.load(fh)
+            z = np.load(data_path, mmap_mode='r')
+            if (meta['key'] != key or list(z.shape) != meta['shape']
+                    or self._checksum(z) != meta['sha1']):
+                raise ValueError("entri cache rusak")
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError):
+            self._remove(data_path, meta_path)
+            return None
+        os.utime(meta_path)
+        spec = GridSpec(meta['nx'], meta['ny'], tuple(meta['bounds']))
+        axis_x, axis_y = grid_axes(spec)
+        return GridResult(x=axis_x, y=axis_y, z=z, mask=~np.isnan(z),
+                          spec=spec, method=meta['method'], key=key)
+
+    def put(self, result):
+        os.makedirs(self.directory, exist_ok=True)
+        data_path, meta_path = self._paths(result.key)
+        meta = {'key': result.key, 'nx': result.spec.nx, 'ny': result.spec.ny,
+                'bounds': list(result.spec.bounds), 'method': result.method,
+                'shape': list(result.z.shape), 'sha1': self._checksum(result.z)}
+        # Tulis ke file sementara lalu rename agar proses lain tidak membaca file setengah jadi
+        tmp = f'{data_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp, 'wb') as fh:
+            np.save(fh, np.asarray(result.z, dtype=np.float64))
+        os.replace(tmp, data_path)
+        with open(tmp, 'w', encoding='utf-8') as fh:
+            json.dump(meta, fh)
+        os.replace(tmp, meta_path)
+        self.evict()
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            meta_path = os.path.join(self.directory, name)
+            data_path = meta_path[:-5] + '.npy'
+            try:
+                size = os.path.getsize(meta_path) + os.path.getsize(data_path)
+                entries.append((os.path.getmtime(meta_path), size, data_path, meta_path))
+            except OSError:
+                continue
+        return sorted(entries)
+
+    def evict(self):
+        """Hapus entri yang paling lama tidak diakses sampai total ukuran <= max_bytes"""
+        with self._lock:
+            entries = self._entries()
+            total = sum(e[1] for e in entries)
+            for _, size, data_path, meta_path in entries:
+                if total <= self.max_bytes:
+                    break
+                self._remove(data_path, meta_path)
+                total -= size
+
+    def clear(self):
+        if os.path.isdir(self.directory):
+            for _, _, data_path, meta_path in self._entries():
+                self._remove(data_path, meta_path)
+
+    @staticmethod
+    def _remove(*paths):
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+_disk_cache = DiskGridCache(GRID_DISK_CACHE_DIR) if GRID_DISK_CACHE_DIR else None
+
+
+def cached_grid(key):
+    """Grid dari cache memori, lalu cache disk (tanpa menghitung); None jika belum ada"""
+    result = _grid_cache.get(key)
+    if result is None and _disk_cache is not None:
+        result = _disk_cache.get(key)
+        if result is not None:
+            _grid_cache.put(key, result)
+    return result
+
+
+def store_grid(result):
+    """Simpan grid ke cache memori & disk (kegagalan tulis disk tidak menggagalkan gridding)"""
+    _grid_cache.put(result.key, result)
+    if _disk_cache is not None:
+        try:
+            _disk_cache.put(result)
+        except OSError:
+            pass
+
+
+def points_hash(*arrays):
+    """Hash isi titik (X, Y, Z, ...) sebagai kunci cache"""
+    h = hashlib.sha1()
+    for arr in arrays:
+        arr = np.ascontiguousarray(arr, dtype=np.float64)
+        h.update(str(arr.shape).encode())
+        h.update(arr.tobytes())
+    return h.hexdigest()
+
+
+def grid_axes(spec):
+    """Sumbu X & Y (1D) dari spec yang sudah di-resolve"""
+    x_min, x_max, y_min, y_max = spec.bounds
+    return np.linspace(x_min, x_max, spec.nx), np.linspace(y_min, y_max, spec.ny)
+
+
+def row_blocks(spec, chunk_nodes=GRID_CHUNK_NODES):
+    """Rentang baris (r0, r1) agar tiap blok <= chunk_nodes node"""
+    step = max(1, chunk_nodes // spec.nx)
+    for r0 in range(0, spec.ny, step):
+        yield r0, min(r0 + step, spec.ny)
+
+
+def block_targets(axis_x, axis_y, r0, r1):
+    """Koordinat node grid (N, 2) untuk baris r0..r1"""
+    gx, gy = np.meshgrid(axis_x, axis_y[r0:r1])
+    return np.column_stack([gx.ravel(), gy.ravel()])
+
+
+def merge_xy(x, y):
+    """Lokasi unik + indeks balik & jumlah titik kembar per lokasi"""
+    xy, inverse, counts = np.unique(
+        np.column_stack([np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)]),
+        axis=0, return_inverse=True, return_counts=True
+    )
+    return xy, inverse.ravel(), counts
+
+
+_preprocess_cache = LRUCache(GRID_CACHE_MAX_ENTRIES, GRID_CACHE_MAX_MB)
+
+
+def _group_mean(labels, *arrays):
+    """Rata-rata tiap array per label 0..k-1"""
+    counts = np.bincount(labels)
+    return [np.bincount(labels, weights=arr) / counts for arr in arrays]
+
+
+def merge_clusters(xy, tolerance):
+    """Label kelompok titik berdekatan: greedy dari seed, diameter kelompok <= 2 x tolerance.
+
+    Tiap seed (urut indeks) mengambil titik yang belum berkelompok dalam radius tolerance.
+    Tidak berantai, jadi garis/profil yang disampel rapat tetap berbentuk garis.
+    Hanya titik yang punya tetangga dalam tolerance yang diproses per titik.
+    """
+    n = len(xy)
+    labels = np.arange(n)
+    tree = cKDTree(xy)
+    pairs = tree.query_pairs(tolerance, output_type='ndarray')
+    if len(pairs) == 0:
+        return labels
+    candidates = np.unique(pairs)
+    grouped = np.zeros(n, dtype=bool)
+    for seed, near in zip(candidates, tree.query_ball_point(xy[candidates], tolerance)):
+        if grouped[seed]:
+            continue
+        near = np.asarray(near, dtype=np.intp)
+        near = near[~grouped[near]]
+        labels[near] = seed
+        grouped[near] = True
+    return np.unique(labels, return_inverse=True)[1].ravel()
+
+
+def preprocess_points(x, y, z, tolerance=0.0, cell_size=None):
+    """Gabungkan titik yang berdekatan (KD-tree) & deklaster opsional sebelum gridding.
+
+    tolerance: titik dalam radius ini dari seed kelompok digabung ke rata-rata X, Y, Z
+    (lihat merge_clusters; tidak berantai).
+    cell_size: jika diisi, titik dirata-rata per sel berukuran cell_size (target kerapatan).
+    Kembalikan (x, y, z, laporan). Tanpa parameter, titik dikembalikan apa adanya.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    z = np.asarray(z, dtype=np.float64)
+    report = {'input': len(x), 'merged': 0, 'clusters': 0, 'declustered': 0, 'output': len(x)}
+    if tolerance <= 0 and not cell_size:
+        return x, y, z, report
+
+    key = f"{points_hash(x, y, z)}:{tolerance}:{cell_size}"
+    cached = _preprocess_cache.get(key)
+    if cached is not None:
+        return cached
+
+    if tolerance > 0 and len(x) > 1:
+        labels = merge_clusters(np.column_stack([x, y]), tolerance)
+        n_groups = int(labels.max()) + 1
+        if n_groups < len(x):
+            report['merged'] = len(x) - n_groups
+            report['clusters'] = int(np.count_nonzero(np.bincount(labels) > 1))
+            x, y, z = _group_mean(labels, x, y, z)
+
+    if cell_size and len(x):
+        cells = np.column_stack([np.floor((x - x.min()) / cell_size), np.floor((y - y.min()) / cell_size)])
+        _, labels = np.unique(cells, axis=0, return_inverse=True)
+        n_before = len(x)
+        x, y, z = _group_mean(labels.ravel(), x, y, z)
+        report['declustered'] = n_before - len(x)
+
+    report['output'] = len(x)
+    result = (x, y, z, report)
+    _preprocess_cache.put(key, result)
+    return result
+
+
+class TriangulationInterpolator:
+    """Triangulasi Delaunay lokasi titik sekali, bobot barycentric ke grid target di-cache"""
+
+    def __init__(self, x, y, spec):
+        check_grid_spec(spec)
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        self.spec = spec
+        self.n_points = len(x)
+
+        # Titik dengan X/Y kembar digabung (nilai dirata-rata, setara groupby().mean())
+        xy, self._inverse, counts = merge_xy(x, y)
+        self._counts = counts
+        self.tri = Delaunay(xy)
+        self.axis_x, self.axis_y = grid_axes(spec)
+
+        # Simplex & bobot barycentric tiap node grid, dihitung per blok baris
+        rows, cols, vals = [], [], []
+        inside = np.zeros(spec.n_nodes, dtype=bool)
+        for r0, r1 in row_blocks(spec):
+            targets = block_targets(self.axis_x, self.axis_y, r0, r1)
+            simplex = self.tri.find_simplex(targets)
+            hit = simplex >= 0
+            transform = self.tri.transform[simplex[hit]]
+            bary = np.einsum('ijk,ik->ij', transform[:, :2, :], targets[hit] - transform[:, 2, :])
+            node_idx = r0 * spec.nx + np.flatnonzero(hit)
+            inside[node_idx] = True
+            rows.append(np.repeat(node_idx, 3))
+            cols.append(self.tri.simplices[simplex[hit]].ravel())
+            vals.append(np.column_stack([bary, 1.0 - bary.sum(axis=1)]).ravel())
+
+        w_unique = csr_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+                              shape=(spec.n_nodes, len(xy)))
+        # Matriks rata-rata titik kembar -> satu perkalian sparse per properti
+        averaging = csr_matrix((1.0 / counts[self._inverse], (self._inverse, np.arange(self.n_points))),
+                               shape=(len(xy), self.n_points))
+        self.weights = (w_unique @ averaging).tocsr()
+        self.inside = inside.reshape(spec.ny, spec.nx)
+
+    def _unique_values(self, values):
+        return np.bincount(self._inverse, weights=values) / self._counts
+
+    def interpolate(self, values, method='linear'):
+        """Interpolasi satu properti per titik ke grid target"""
+        values = np.asarray(values, dtype=np.float64)
+        if method == 'linear':
+            out = self.weights @ values
+            out[~self.inside.ravel()] = np.nan
+            return out.reshape(self.spec.ny, self.spec.nx)
+        if method == 'cubic':
+            # Triangulasi dipakai ulang, tinggal estimasi gradien Clough-Tocher
+            ct = CloughTocher2DInterpolator(self.tri, self._unique_values(values))
+            out = np.empty((self.spec.ny, self.spec.nx))
+            for r0, r1 in row_blocks(self.spec):
+                out[r0:r1] = ct(block_targets(self.axis_x, self.axis_y, r0, r1)).reshape(r1 - r0, self.spec.nx)
+            return out
+        raise ValueError(f"Metode interpolasi tidak dikenal: {method}")
+
+    def interpolate_stack(self, values):
+        """Interpolasi linear banyak properti (kolom values[n_points, k]) dengan satu perkalian sparse"""
+        values = np.asarray(values, dtype=np.float64)
+        out = self.weights @ values
+        out[~self.inside.ravel()] = np.nan
+        return out.T.reshape(values.shape[1], self.spec.ny, self.spec.nx)
+
+
+_interpolator_cache = LRUCache(GRID_CACHE_MAX_ENTRIES, GRID_CACHE_MAX_MB)
+
+
+def get_interpolator(x, y, spec=None):
+    """Ambil TriangulationInterpolator dari cache (kunci: hash lokasi titik + spec)"""
+    spec = (spec or GridSpec()).resolve(x, y)
+    key = f"{points_hash(x, y)}:{spec}"
+    interp = _interpolator_cache.get(key)
+    if interp is None:
+        interp = TriangulationInterpolator(x, y, spec)
+        _interpolator_cache.put(key, interp)
+    return interp
+
+
+def make_point_interpolator(xy, values, method):
+    """Interpolator callable (targets (N, 2) -> nilai) untuk lokasi unik xy"""
+    if method == 'cubic':
+        return CloughTocher2DInterpolator(Delaunay(xy), values)
+    if method == 'linear':
+        return LinearNDInterpolator(Delaunay(xy), values)
+    if method in ENGINES:
+        return ENGINES[method](xy, values)
+    raise ValueError(f"Metode interpolasi tidak dikenal: {method}")
+
+
+def open_grid_memmap(path, spec):
+    """Array output float64 ter-memory-map (.npy) seukuran grid"""
+    return np.lib.format.open_memmap(path, mode='w+', dtype=np.float64, shape=(spec.ny, spec.nx))
+
+
+def grid_tiled(x, y, z, spec=None, method='cubic', out=None, chunk_nodes=GRID_CHUNK_NODES,
+               workers=1):
+    """Gridding per blok baris dengan memori puncak sebatas ukuran blok.
+
+    Triangulasi (dan gradien Clough-Tocher) dibangun sekali; tiap blok hanya membuat
+    koordinat target miliknya lalu menulis ke `out` (array biasa atau memmap).
+    workers > 1 mengerjakan blok di thread pool.
+    """
+    spec = (spec or GridSpec()).resolve(x, y)
+    check_grid_spec(spec)
+    xy, inverse, counts = merge_xy(x, y)
+    values = np.bincount(inverse, weights=np.asarray(z, dtype=np.float64)) / counts
+    interp = make_point_interpolator(xy, values, method)
+
+    axis_x, axis_y = grid_axes(spec)
+    if out is None:
+        out = np.empty((spec.ny, spec.nx))
+
+    def fill(block):
+        r0, r1 = block
+        out[r0:r1] = interp(block_targets(axis_x, axis_y, r0, r1)).reshape(r1 - r0, spec.nx)
+
+    blocks = list(row_blocks(spec, chunk_nodes))
+    if workers > 1:
+        # Atribut Delaunay dihitung lazy & tidak thread-safe -> isi dulu sebelum dibagi ke thread
+        if method in ('cubic', 'linear'):
+            interp.tri.transform
+        interp(xy[:1])
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(fill, blocks))
+    else:
+        for block in blocks:
+            fill(block)
+    return out
+
+
+def _surface_key(x, y, z, spec, method):
+    return f"{points_hash(x, y, z)}:{spec}:{method}"
+
+
+def grid_surface(x, y, z, spec=None, method='cubic'):
+    """Interpolasi titik XYZ ke grid, di-cache berdasarkan hash data + spec"""
+    spec = (spec or GridSpec()).resolve(x, y)
+    key = _surface_key(x, y, z, spec, method)
+
+    cached = cached_grid(key)
+    if cached is not None:
+        return cached
+
+    # Grid besar & mesin titik-sebar: jalur per blok (tanpa matriks bobot seukuran grid)
+    if spec.n_nodes > TILED_GRID_NODES or method in ENGINES:
+        run = lambda m: grid_tiled(x, y, z, spec, m, workers=GRID_WORKERS)
+    else:
+        interp = get_interpolator(x, y, spec)
+        run = lambda m: interp.interpolate(z, m)
+
+    used_method = method
+    try:
+        grid_z = run(method)
+    except Exception:
+        # Cubic bisa gagal untuk sebaran titik tertentu -> fallback ke linear
+        if method != 'cubic':
+            raise
+        grid_z, used_method = run('linear'), 'linear'
+
+    axis_x, axis_y = grid_axes(spec)
+    result = GridResult(
+        x=axis_x, y=axis_y, z=grid_z, mask=~np.isnan(grid_z),
+        spec=spec, method=used_method, key=key
+    )
+    store_grid(result)
+    return result
+
+
+def seed_grid_cache(grid, x, y, z):
+    """Masukkan grid hasil session (dict dari load_session) ke cache agar tidak di-grid ulang.
+
+    Kunci dihitung ulang dari titik (x, y, z) yang dimuat + spec + metode, dan shape z
+    dicek terhadap spec; grid usang/rekayasa ditolak (ValueError) agar tidak meracuni
+    cache bersama.
+    """
+    try:
+        spec = GridSpec(int(grid['nx']), int(grid['ny']), tuple(float(b) for b in grid['bounds']))
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Spec grid session tidak valid: {e}") from e
+    if len(spec.bounds) != 4 or min(spec.nx, spec.ny) < 2:
+        raise ValueError("Spec grid session tidak valid")
+    check_grid_spec(spec)
+
+    grid_z = np.asarray(grid['z'])
+    if grid_z.shape != (spec.ny, spec.nx) or grid_z.dtype.kind != 'f':
+        raise ValueError("Ukuran grid session tidak cocok dengan spec")
+    # Cubic yang gagal jatuh ke linear -> kunci memakai metode yang diminta
+    methods = {grid['method']} | ({'cubic'} if grid['method'] == 'linear' else set())
+    if grid['key'] not in {_surface_key(x, y, z, spec, m) for m in methods if m in INTERPOLATION_METHODS}:
+        raise ValueError("Grid session tidak cocok dengan titik yang dimuat")
+
+    axis_x, axis_y = grid_axes(spec)
+    grid_z = np.ascontiguousarray(grid_z, dtype=np.float64)
+    result = GridResult(
+        x=axis_x, y=axis_y, z=grid_z, mask=~np.isnan(grid_z),
+        spec=spec, method=grid['method'], key=grid['key']
+    )
+    store_grid(result)
+    return result
+
+
+def _grid_surface_job(args):
+    return grid_surface(*args)
+
+
+def grid_surfaces(surfaces, spec=None, method='cubic', workers=GRID_WORKERS):
+    """Gridding banyak surface (mis. top struktur, GOC, WOC) ke satu grid bersama.
+
+    surfaces: dict nama -> (x, y, z). Bounds spec (jika kosong) diambil dari gabungan
+    semua titik. Surface yang belum ada di cache dikerjakan paralel di process pool.
+    """
+    all_x = np.concatenate([np.asarray(xyz[0], dtype=np.float64) for xyz in surfaces.values()])
+    all_y = np.concatenate([np.asarray(xyz[1], dtype=np.float64) for xyz in surfaces.values()])
+    spec = (spec or GridSpec()).resolve(all_x, all_y)
+
+    results, pending = {}, {}
+    for name, (x, y, z) in surfaces.items():
+        cached = cached_grid(_surface_key(x, y, z, spec, method))
+        if cached is not None:
+            results[name] = cached
+        else:
+            pending[name] = (x, y, z, spec, method)
+
+    if workers > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as pool:
+            computed = dict(zip(pending, pool.map(_grid_surface_job, pending.values())))
+        # Worker sudah menulis ke cache disk; cukup isi cache memori proses ini
+        for result in computed.values():
+            _grid_cache.put(result.key, result)
+    else:
+        computed = {name: _grid_surface_job(args) for name, args in pending.items()}
+
+    results.update(computed)
+    return {name: results[name] for name in surfaces}
+
+
+def clear_grid_cache(disk=False):
+    _grid_cache.clear()
+    _interpolator_cache.clear()
+    _preprocess_cache.clear()
+    if disk and _disk_cache is not None:
+        _disk_cache.clear()
+
+
+def generate_property_heatmap(x, y, prop, prop_label="Property", spec=None, method='cubic'):
+    """Heatmap properti hasil grid_surface (cache memori/disk); kembalikan (figure, GridResult)"""
+    # Grid
+    grid = grid_surface(x, y, prop, spec or GridSpec(150, 150), method)
 
     # Plot Heatmap
     fig = go.Figure(data=go.Heatmap(
-        x=grid_x,
-        y=grid_y,
-        z=grid_prop,
+        x=grid.x,
+        y=grid.y,
+        z=grid.z,
         colorscale='Turbo',
         colorbar=dict(title=prop_label)
     ))
@@ -27,4 +706,4 @@ def generate_property_heatmap(x, y, prop, prop_label="Property"):
         height=700
     )
 
-    return fig
\ No newline at end of file
+    return fig, grid
@@ -0,0 +1,267 @@
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+
+from interpolasi import GRID_CACHE_MAX_ENTRIES, GRID_CACHE_MAX_MB, LRUCache
+
+# Toleransi penyederhanaan garis (Douglas-Peucker) dalam satuan ukuran sel grid
+CONTOUR_SIMPLIFY_CELLS = 0.5
+
+_contour_cache = LRUCache(GRID_CACHE_MAX_ENTRIES, GRID_CACHE_MAX_MB)
+
+# Sudut sel (berlawanan jarum jam): 0 (i, j), 1 (i, j+1), 2 (i+1, j+1), 3 (i+1, j).
+# Sisi k menghubungkan sudut k dan k+1: 0 bawah, 1 kanan, 2 atas, 3 kiri.
+
+
+def _case_segments(case, center_inside=False):
+    """Segmen (sisi asal, sisi tujuan) untuk satu kasus marching squares.
+
+    Arah segmen dipilih sehingga daerah 'di dalam' (nilai < 0) selalu di kiri,
+    jadi poligon luar berlawanan jarum jam dan lubang searah jarum jam.
+    """
+    inside = [bool(case >> k & 1) for k in range(4)]
+    if case in (5, 10) and center_inside:
+        # Sadel tersambung di tengah: potong tiap sudut luar
+        return [((o - 1) % 4, o) for o in range(4) if not inside[o]]
+    segments = []
+    for k in range(4):
+        # Awal rangkaian sudut dalam yang berurutan (siklik)
+        if inside[k] and not inside[(k - 1) % 4]:
+            m = k
+            while inside[(m + 1) % 4]:
+                m = (m + 1) % 4
+            segments.append((m, (k - 1) % 4))
+    return segments
+
+
+_CASES = {case: _case_segments(case) for case in range(1, 15)}
+_SADDLE_JOINED = {case: _case_segments(case, True) for case in (5, 10)}
+
+
+def _edge_points(field, axis_x, axis_y, rows, cols, edge):
+    """Titik potong nilai 0 pada sisi sel (rows, cols) + id sisi unik + penanda batas data"""
+    ny, nx = field.shape
+    # Sudut awal (a) & akhir (b) tiap sisi; sisi atas & kiri diinterpolasi dari sudut kiri/bawah
+    (ra, ca), (rb, cb) = {0: ((0, 0), (0, 1)), 1: ((0, 1), (1, 1)),
+                          2: ((1, 0), (1, 1)), 3: ((0, 0), (1, 0))}[edge]
+    fa = field[rows + ra, cols + ca]
+    fb = field[rows + rb, cols + cb]
+    with np.errstate(invalid='ignore'):
+        # Node kosong (inf) -> garis menempel di node valid di seberangnya
+        t = np.where(np.isinf(fa), 1.0, fa / (fa - fb))
+    x = axis_x[cols + ca] + t * (axis_x[cols + cb] - axis_x[cols + ca])
+    y = axis_y[rows + ra] + t * (axis_y[rows + rb] - axis_y[rows + ra])
+
+    if edge in (0, 2):
+        ids = (rows + ra) * (nx - 1) + cols
+    else:
+        ids = ny * (nx - 1) + rows * nx + cols + ca
+    return np.column_stack([x, y]), ids, np.isinf(fa) | np.isinf(fb)
+
+
+def marching_squares(axis_x, axis_y, field):
+    """Segmen batas daerah field < 0 pada grid (axis_x, axis_y, field[ny, nx]), tervektorisasi.
+
+    Node NaN dan sekeliling grid dianggap di luar, sehingga semua batas tertutup.
+    Kembalikan dict start/end (N, 2), start_id/end_id (id sisi sel) dan boundary
+    (segmen yang seluruhnya menempel di tepi data, bukan garis iso).
+    """
+    axis_x = np.asarray(axis_x, dtype=np.float64)
+    axis_y = np.asarray(axis_y, dtype=np.float64)
+    field = np.asarray(field, dtype=np.float64)
+    field = np.pad(np.where(np.isnan(field), np.inf, field), 1, constant_values=np.inf)
+    # Koordinat node padding tidak pernah dipakai (t selalu menempel di node valid)
+    axis_x = np.concatenate([[axis_x[0]], axis_x, [axis_x[-1]]])
+    axis_y = np.concatenate([[axis_y[0]], axis_y, [axis_y[-1]]])
+
+    inside = field < 0
+    case = (inside[:-1, :-1] * 1 + inside[:-1, 1:] * 2 + inside[1:, 1:] * 4 + inside[1:, :-1] * 8)
+    center_inside = (field[:-1, :-1] + field[:-1, 1:] + field[1:, 1:] + field[1:, :-1]) < 0
+
+    parts = []
+    for code, segments in _CASES.items():
+        selected = case == code
+        if code in _SADDLE_JOINED:
+            groups = [(selected & ~center_inside, segments),
+                      (selected & center_inside, _SADDLE_JOINED[code])]
+        else:
+            groups = [(selected, segments)]
+        for cells, group_segments in groups:
+            rows, cols = np.nonzero(cells)
+            if len(rows) == 0:
+                continue
+            for edge_from, edge_to in group_segments:
+                start, start_id, start_edge = _edge_points(field, axis_x, axis_y, rows, cols, edge_from)
+                end, end_id, end_edge = _edge_points(field, axis_x, axis_y, rows, cols, edge_to)
+                parts.append((start, end, start_id, end_id, start_edge & end_edge))
+
+    if not parts:
+        empty = np.empty((0, 2))
+        return {'start': empty, 'end': empty, 'start_id': np.empty(0, np.intp),
+                'end_id': np.empty(0, np.intp), 'boundary': np.empty(0, bool)}
+    start, end, start_id, end_id, boundary = (np.concatenate(p) for p in zip(*parts))
+    return {'start': start, 'end': end, 'start_id': start_id, 'end_id': end_id, 'boundary': boundary}
+
+
+def region_metrics(segments):
+    """Luas (shoelace) & keliling daerah dari segmen terorientasi, tanpa merangkai poligon"""
+    start, end = segments['start'], segments['end']
+    area = 0.5 * float(np.sum(start[:, 0] * end[:, 1] - end[:, 0] * start[:, 1]))
+    perimeter = float(np.hypot(*(end - start).T).sum())
+    return area, perimeter
+
+
+def link_segments(segments, mask=None):
+    """Rangkai segmen menjadi polyline (N, 2); poligon tertutup mengulang titik pertamanya.
+
+    mask: pilih sebagian segmen (mis. tanpa segmen tepi data) -> hasilnya bisa garis terbuka.
+    """
+    start, end = segments['start'], segments['end']
+    start_id, end_id = segments['start_id'], segments['end_id']
+    if mask is not None:
+        start, end, start_id, end_id = start[mask], end[mask], start_id[mask], end_id[mask]
+    n = len(start)
+    if n == 0:
+        return []
+
+    # Tiap sisi sel menjadi awal paling banyak satu segmen (orientasi konsisten)
+    order = np.argsort(start_id)
+    pos = np.minimum(np.searchsorted(start_id[order], end_id), n - 1)
+    following = np.where(start_id[order][pos] == end_id, order[pos], -1)
+    has_previous = np.zeros(n, bool)
+    has_previous[following[following >= 0]] = True
+
+    visited = np.zeros(n, bool)
+    lines = []
+    # Garis terbuka dulu (dari segmen tanpa pendahulu), lalu sisa siklus tertutup
+    for first in np.concatenate([np.flatnonzero(~has_previous), np.arange(n)]):
+        if visited[first]:
+            continue
+        chain = [first]
+        visited[first] = True
+        nxt = following[first]
+        while nxt >= 0 and not visited[nxt]:
+            chain.append(nxt)
+            visited[nxt] = True
+            nxt = following[nxt]
+        chain = np.asarray(chain)
+        lines.append(np.vstack([start[chain], end[chain[-1:]]]))
+    return lines
+
+
+def simplify_line(points, tolerance):
+    """Douglas-Peucker: buang vertex yang menyimpang kurang dari tolerance dari garis"""
+    if tolerance <= 0 or len(points) < 3:
+        return points
+    keep = np.zeros(len(points), bool)
+    keep[[0, -1]] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        a, b = points[first], points[last]
+        inner = points[first + 1:last]
+        chord = b - a
+        length = np.hypot(*chord)
+        if length == 0:
+            # Poligon tertutup: ujung sama -> pakai jarak ke titik
+            dist = np.hypot(*(inner - a).T)
+        else:
+            dist = np.abs(chord[0] * (inner[:, 1] - a[1]) - chord[1] * (inner[:, 0] - a[0])) / length
+        k = int(np.argmax(dist))
+        if dist[k] > tolerance:
+            split = first + 1 + k
+            keep[split] = True
+            stack += [(first, split), (split, last)]
+    return points[keep]
+
+
+def _level_key(grid, level, *extra):
+    h = hashlib.sha1(np.asarray(level, dtype=np.float64).tobytes())
+    for part in extra:
+        h.update(repr(part).encode())
+    return f"{grid.key}:{h.hexdigest()}"
+
+
+def _default_tolerance(grid):
+    return CONTOUR_SIMPLIFY_CELLS * min(grid.dx, grid.dy)
+
+
+def contour_lines(grid, level, tolerance=None):
+    """Garis iso z = level (skalar atau grid kontak terpetakan), disederhanakan untuk browser"""
+    tolerance = _default_tolerance(grid) if tolerance is None else tolerance
+    key = _level_key(grid, level, 'lines', tolerance)
+    lines = _contour_cache.get(key)
+    if lines is None:
+        segments = marching_squares(grid.x, grid.y, grid.z - level)
+        lines = [simplify_line(line, tolerance)
+                 for line in link_segments(segments, ~segments['boundary'])]
+        _contour_cache.put(key, lines)
+    return lines
+
+
+def contact_outline(grid, contact, tolerance=None):
+    """Poligon daerah struktur di atas kontak (z < contact) + luas & keliling.
+
+    Luas dihitung langsung dari segmen (shoelace), poligon hanya dirangkai untuk
+    ekspor/tampilan. Lubang berorientasi searah jarum jam sehingga luasnya terkurang.
+    """
+    tolerance = _default_tolerance(grid) if tolerance is None else tolerance
+    key = _level_key(grid, contact, 'outline', tolerance)
+    outline = _contour_cache.get(key)
+    if outline is None:
+        segments = marching_squares(grid.x, grid.y, grid.z - contact)
+        area, perimeter = region_metrics(segments)
+        polygons = [simplify_line(line, tolerance) for line in link_segments(segments)]
+        outline = {'area': area, 'perimeter': perimeter, 'polygons': polygons}
+        _contour_cache.put(key, outline)
+    return outline
+
+
+def contour_area_table(grid, levels):
+    """Luas & keliling daerah di atas tiap kedalaman kontur (marching squares, di-cache per level)"""
+    rows = []
+    for level in levels:
+        key = _level_key(grid, level, 'metrics')
+        metrics = _contour_cache.get(key)
+        if metrics is None:
+            metrics = region_metrics(marching_squares(grid.x, grid.y, grid.z - level))
+            _contour_cache.put(key, metrics)
+        area, perimeter = metrics
+        rows.append({'Kedalaman (m)': float(level), 'Luas (m²)': area, 'Keliling (m)': perimeter})
+    return pd.DataFrame(rows)
+
+
+def line_trace_xy(lines):
+    """Gabung polyline menjadi satu x/y dipisah NaN (satu trace Plotly untuk banyak garis)"""
+    if not lines:
+        return np.empty(0), np.empty(0)
+    gap = np.full((1, 2), np.nan)
+    xy = np.vstack([part for line in lines for part in (line, gap)][:-1])
+    return xy[:, 0], xy[:, 1]
+
+
+def polylines_frame(named_lines):
+    """Polyline per nama (mis. kedalaman kontur, GOC/WOC) sebagai tabel Nama, Garis, Urutan, X, Y"""
+    frames = [pd.DataFrame({'Nama': name, 'Garis': i, 'Urutan': np.arange(len(line)),
+                            'X': line[:, 0], 'Y': line[:, 1]})
+              for name, lines in named_lines.items() for i, line in enumerate(lines)]
+    if not frames:
+        return pd.DataFrame(columns=['Nama', 'Garis', 'Urutan', 'X', 'Y'])
+    return pd.concat(frames, ignore_index=True)
+
+
+def polylines_csv(named_lines):
+    """polylines_frame sebagai teks CSV (untuk unduhan)"""
+    return polylines_frame(named_lines).to_csv(index=False)
+
+
+def polylines_geojson(named_lines):
+    """Polyline per nama sebagai GeoJSON FeatureCollection (MultiLineString per nama)"""
+    features = [{'type': 'Feature', 'properties': {'name': str(name)},
+                 'geometry': {'type': 'MultiLineString', 'coordinates': [line.tolist() for line in lines]}}
+                for name, lines in named_lines.items()]
+    return json.dumps({'type': 'FeatureCollection', 'features': features})
@@ -0,0 +1,126 @@
+import hashlib
+import importlib.util
+import io
+import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from openpyxl import Workbook
+
+from interpolasi import LRUCache
+
+# Jumlah file laporan (PDF/Excel/PNG/CSV) yang disimpan di cache proses
+REPORT_CACHE_MAX_ENTRIES = 32
+# Batas total ukuran laporan yang sudah jadi (bytes) di cache proses
+REPORT_CACHE_MAX_MB = float(os.environ.get('PBP_REPORT_CACHE_MB', 256))
+
+_report_cache = LRUCache(REPORT_CACHE_MAX_ENTRIES, REPORT_CACHE_MAX_MB)
+# Satu worker: laporan dibuat di luar rerun Streamlit & permintaan sama tidak dibuat dua kali
+_report_executor = ThreadPoolExecutor(max_workers=1)
+
+
+def report_key(kind, *parts):
+    """Kunci cache laporan dari jenis + semua input yang memengaruhi isinya"""
+    h = hashlib.sha1(kind.encode())
+    for part in parts:
+        h.update(repr(part).encode())
+    return f"{kind}:{h.hexdigest()}"
+
+
+def _build_bytes(builder, args, kwargs):
+    data = builder(*args, **kwargs)
+    if isinstance(data, io.IOBase):
+        data = data.getvalue()
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return data
+
+
+def _submit(key, builder, args, kwargs):
+    future = _report_cache.get(key)
+    if future is None or (future.done() and future.exception() is not None):
+        future = _report_executor.submit(_build_bytes, builder, args, kwargs)
+        _report_cache.put(key, future)
+        # Ukuran baru diketahui setelah selesai -> ukur ulang & evict bila melebihi batas
+        future.add_done_callback(lambda _: _report_cache.remeasure(key))
+    return future
+
+
+def lazy_report(key, builder, *args, **kwargs):
+    """Callable tanpa argumen untuk st.download_button(data=...).
+
+    Laporan baru dibuat saat tombol diklik (di worker latar belakang), lalu di-cache
+    berdasarkan kunci sehingga unduhan ulang dengan input yang sama langsung tersedia.
+    """
+    return lambda: _submit(key, builder, args, kwargs).result()
+
+
+# -------------------------------------------------------------------
+# WRITER EXCEL (WRITE-ONLY) + LAMPIRAN DATA MENTAH
+# -------------------------------------------------------------------
+# Batas baris per sheet Excel (1.048.576 termasuk header)
+EXCEL_SHEET_ROWS = 1_048_575
+# Di atas jumlah baris ini data mentah default dijadikan lampiran, bukan sheet
+EXCEL_RAW_ROW_LIMIT = 100_000
+# Baris yang dikonversi ke objek Python per langkah saat menulis sheet
+EXCEL_CHUNK_ROWS = 50_000
+
+# kode -> label; selain 'sheets', laporan menjadi ZIP berisi .xlsx + file data mentah
+RAW_DATA_MODES = {
+    'sheets': 'Sheet Excel (dipecah per ±1 juta baris)',
+    'csv': 'Lampiran CSV (ZIP)',
+    'parquet': 'Lampiran Parquet (ZIP)',
+}
+
+
+def write_sheet(workbook, name, frame, max_rows=EXCEL_SHEET_ROWS):
+    """Tulis DataFrame ke worksheet write-only, dipecah ke beberapa sheet jika melebihi max_rows"""
+    n_sheets = max(1, -(-len(frame) // max_rows))
+    for part in range(n_sheets):
+        ws = workbook.create_sheet(name if n_sheets == 1 else f"{name} {part + 1}")
+        ws.append([str(c) for c in frame.columns])
+        stop = min((part + 1) * max_rows, len(frame))
+        for start in range(part * max_rows, stop, EXCEL_CHUNK_ROWS):
+            chunk = frame.iloc[start:min(start + EXCEL_CHUNK_ROWS, stop)]
+            # NaN tidak valid di Excel -> sel kosong
+            chunk = chunk.astype(object).where(chunk.notna(), None)
+            for row in chunk.itertuples(index=False, name=None):
+                ws.append(row)
+
+
+def write_excel_report(fh, sheets, raw=None, raw_mode='sheets', raw_name='raw_data'):
+    """Laporan Excel dengan openpyxl write-only (baris dialirkan, bukan disimpan per sel).
+
+    sheets: dict nama sheet -> DataFrame ringkasan. raw_mode 'csv'/'parquet' menulis
+    ZIP berisi report.xlsx + data mentah sebagai lampiran (cepat & tanpa batas baris).
+    """
+    if raw_mode not in RAW_DATA_MODES:
+        raise ValueError(f"Mode data mentah tidak dikenal: {raw_mode}")
+    workbook = Workbook(write_only=True)
+    for name, frame in sheets.items():
+        write_sheet(workbook, name, frame)
+
+    if raw is None or raw_mode == 'sheets':
+        if raw is not None:
+            write_sheet(workbook, 'Raw Data', raw)
+        workbook.save(fh)
+        return
+
+    raw_file = f"{raw_name}.{raw_mode}"
+    note = workbook.create_sheet('Raw Data')
+    note.append(['Data mentah', f"{len(raw):,} baris di lampiran {raw_file}"])
+    with zipfile.ZipFile(fh, 'w', zipfile.ZIP_DEFLATED) as archive:
+        with archive.open('report.xlsx', 'w') as member:
+            workbook.save(member)
+        with archive.open(raw_file, 'w') as member:
+            if raw_mode == 'parquet':
+                raw.to_parquet(member, index=False)
+            else:
+                raw.to_csv(io.TextIOWrapper(member, encoding='utf-8', newline=''), index=False)
+
+
+def default_raw_mode(n_rows):
+    """Sheet untuk data kecil; di atas EXCEL_RAW_ROW_LIMIT lampiran (Parquet jika tersedia)"""
+    if n_rows <= EXCEL_RAW_ROW_LIMIT:
+        return 'sheets'
+    return 'parquet' if importlib.util.find_spec('pyarrow') is not None else 'csv'
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+# Batas total titik sampel penampang (semua penampang fence), setara batas node grid
+MAX_SECTION_STATIONS = 2_000_000
+
+
+def sample_grid(axis_x, axis_y, z, x, y):
+    """Sampling bilinear grid (axis_x, axis_y, z[ny, nx]) di titik sembarang, tervektorisasi.
+
+    Bentuk x/y bebas (mis. 2D untuk banyak penampang sekaligus). Titik di luar grid
+    atau yang bergantung pada node NaN (bobot > 0) bernilai NaN.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    z = np.asarray(z)
+    nx, ny = len(axis_x), len(axis_y)
+    # Indeks pecahan (setara koordinat map_coordinates)
+    col = (x - axis_x[0]) / (axis_x[-1] - axis_x[0]) * (nx - 1)
+    row = (y - axis_y[0]) / (axis_y[-1] - axis_y[0]) * (ny - 1)
+    inside = (col >= 0) & (col <= nx - 1) & (row >= 0) & (row <= ny - 1)
+    col = np.where(inside, col, 0.0)
+    row = np.where(inside, row, 0.0)
+
+    c0 = np.minimum(np.floor(col).astype(np.intp), nx - 2)
+    r0 = np.minimum(np.floor(row).astype(np.intp), ny - 2)
+    tx, ty = col - c0, row - r0
+
+    out = np.zeros(x.shape)
+    for dr, dc, weight in ((0, 0, (1 - ty) * (1 - tx)), (0, 1, (1 - ty) * tx),
+                           (1, 0, ty * (1 - tx)), (1, 1, ty * tx)):
+        corner = z[r0 + dr, c0 + dc]
+        # Node NaN hanya berpengaruh jika bobotnya tidak nol
+        out += np.where(weight > 0, weight * corner, 0.0)
+    out[~inside] = np.nan
+    return out
+
+
+def station_spacing(length, spacing, n_sections=1):
+    """Jarak sampel yang dipakai: diperbesar bila total titik melebihi MAX_SECTION_STATIONS"""
+    return max(float(spacing), n_sections * float(length) / max(MAX_SECTION_STATIONS - n_sections, 1))
+
+
+def polyline_stations(vertices, spacing):
+    """Titik sampel berjarak `spacing` sepanjang polyline (semua vertex ikut disampel)"""
+    vertices = np.asarray(vertices, dtype=np.float64)
+    seg = np.hypot(*np.diff(vertices, axis=0).T)
+    cum = np.concatenate([[0.0], np.cumsum(seg)])
+    distance = np.union1d(np.arange(0.0, cum[-1], station_spacing(cum[-1], spacing)), cum)
+    return np.interp(distance, cum, vertices[:, 0]), np.interp(distance, cum, vertices[:, 1]), distance
+
+
+def azimuth_line(center, azimuth, length):
+    """Dua ujung garis sepanjang `length` melalui center, azimuth dalam derajat dari utara"""
+    az = np.radians(azimuth)
+    half = np.array([np.sin(az), np.cos(az)]) * length / 2
+    center = np.asarray(center, dtype=np.float64)
+    return np.array([center - half, center + half])
+
+
+def section_profile(grid, vertices, spacing, contacts=None):
+    """Profil penampang sepanjang polyline: Jarak, X, Y, Z (+ kolom kontak terpetakan).
+
+    contacts: dict nama -> grid z (mis. {'GOC': goc_grid}) pada spec yang sama.
+    """
+    x, y, distance = polyline_stations(vertices, spacing)
+    profile = pd.DataFrame({'Jarak (m)': distance, 'X': x, 'Y': y,
+                            'Z': sample_grid(grid.x, grid.y, grid.z, x, y)})
+    for name, contact_z in (contacts or {}).items():
+        profile[name] = sample_grid(grid.x, grid.y, contact_z, x, y)
+    return profile
+
+
+def fence_sections(grid, center, azimuth, length, n_sections, gap, spacing):
+    """Banyak penampang sejajar (fence diagram) dalam satu panggilan tervektorisasi.
+
+    Penampang digeser tegak lurus azimuth sejauh `gap`, berpusat di `center`. Total titik
+    dibatasi MAX_SECTION_STATIONS (spacing diperbesar bila perlu, lihat station_spacing).
+    Kembalikan dict dengan offset (n,), jarak (m,), x/y/z (n, m) dan spacing yang dipakai.
+    """
+    az = np.radians(azimuth)
+    direction = np.array([np.sin(az), np.cos(az)])
+    normal = np.array([direction[1], -direction[0]])
+    spacing = station_spacing(length, spacing, n_sections)
+    distance = np.arange(0.0, length + spacing / 2, spacing)
+    offsets = (np.arange(n_sections) - (n_sections - 1) / 2) * gap
+
+    along = distance - length / 2
+    x = center[0] + offsets[:, None] * normal[0] + along[None, :] * direction[0]
+    y = center[1] + offsets[:, None] * normal[1] + along[None, :] * direction[1]
+    return {'offset': offsets, 'distance': distance, 'x': x, 'y': y,
+            'z': sample_grid(grid.x, grid.y, grid.z, x, y), 'spacing': spacing}
@@ -0,0 +1,554 @@
+import gzip
+import io
+import json
+import os
+import struct
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+# Kolom wajib setiap titik
+POINT_COLUMNS = ('X', 'Y', 'Z')
+
+
+class PointStore:
+    """Penyimpanan titik berbasis kolom NumPy (float64) pengganti list-of-dict.
+
+    Kapasitas array tumbuh 2x saat penuh sehingga append/extend amortized O(1).
+    `version` naik setiap kali isi berubah, dipakai sebagai penanda cache.
+    """
+
+    def __init__(self, capacity=1024, attributes=()):
+        self._capacity = max(int(capacity), 1)
+        self._n = 0
+        self._cols = {name: np.empty(self._capacity) for name in POINT_COLUMNS}
+        for name in attributes:
+            self._cols[name] = np.full(self._capacity, np.nan)
+        self.version = 0
+
+    def __len__(self):
+        return self._n
+
+    @property
+    def columns(self):
+        return list(self._cols)
+
+    def _reserve(self, extra):
+        needed = self._n + extra
+        if needed <= self._capacity:
+            return
+        capacity = max(needed, self._capacity * 2)
+        for name, arr in self._cols.items():
+            grown = np.full(capacity, np.nan)
+            grown[:self._n] = arr[:self._n]
+            self._cols[name] = grown
+        self._capacity = capacity
+
+    def _touch(self):
+        self.version += 1
+
+    def append(self, x, y, z, **attrs):
+        """Tambah satu titik"""
+        self.extend([x], [y], [z], **{k: [v] for k, v in attrs.items()})
+
+    def extend(self, x, y, z, **attrs):
+        """Tambah banyak titik sekaligus dari array/Series (tanpa round-trip records)"""
+        x = np.asarray(x, dtype=np.float64)
+        n = len(x)
+        if n == 0:
+            return
+        self._reserve(n)
+        s = slice(self._n, self._n + n)
+        self._cols['X'][s] = x
+        self._cols['Y'][s] = np.asarray(y, dtype=np.float64)
+        self._cols['Z'][s] = np.asarray(z, dtype=np.float64)
+        for name, values in attrs.items():
+            if name not in self._cols:
+                self._cols[name] = np.full(self._capacity, np.nan)
+            self._cols[name][s] = np.asarray(values, dtype=np.float64)
+        # Atribut yang tidak diberikan diisi NaN (slot bisa berisi sisa data setelah pop/clear)
+        for name in self._cols:
+            if name not in POINT_COLUMNS and name not in attrs:
+                self._cols[name][s] = np.nan
+        self._n += n
+        self._touch()
+
+    def extend_frame(self, frame):
+        """Tambah titik dari DataFrame berkolom X, Y, Z (+ atribut numerik opsional)"""
+        attrs = {c: frame[c].to_numpy() for c in frame.columns if c not in POINT_COLUMNS}
+        self.extend(frame['X'].to_numpy(), frame['Y'].to_numpy(), frame['Z'].to_numpy(), **attrs)
+
+    def pop(self):
+        """Hapus & kembalikan titik terakhir sebagai dict"""
+        if self._n == 0:
+            raise IndexError("PointStore kosong")
+        self._n -= 1
+        self._touch()
+        return {name: float(arr[self._n]) for name, arr in self._cols.items()}
+
+    def clear(self):
+        self._n = 0
+        self._touch()
+
+    def dedupe(self):
+        """Hapus titik dengan X, Y, Z persis sama (urutan pertama dipertahankan); kembalikan jumlah yang dihapus"""
+        xyz = np.column_stack([self.column(name) for name in POINT_COLUMNS])
+        _, first = np.unique(xyz, axis=0, return_index=True)
+        keep = np.sort(first)
+        removed = self._n - len(keep)
+        if removed:
+            for name, arr in self._cols.items():
+                arr[:len(keep)] = arr[keep]
+            self._n = len(keep)
+            self._touch()
+        return removed
+
+    def column(self, name):
+        """View (tanpa salinan) kolom sepanjang jumlah titik"""
+        return self._cols[name][:self._n]
+
+    def to_frame(self):
+        """DataFrame yang langsung memakai view kolom (tanpa salinan data)"""
+        return pd.DataFrame({name: self.column(name) for name in self._cols}, copy=False)
+
+    def to_records(self):
+        return self.to_frame().to_dict('records')
+
+    @classmethod
+    def from_records(cls, records):
+        """Bangun PointStore dari list-of-dict (format lama session JSON)"""
+        frame = pd.DataFrame.from_records(records)
+        store = cls(capacity=len(frame))
+        if len(frame):
+            store.extend_frame(frame)
+        return store
+
+
+# -------------------------------------------------------------------
+# INGESTI FILE BERTAHAP (CSV/EXCEL)
+# -------------------------------------------------------------------
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+except ImportError:  # pyarrow opsional, fallback ke engine C pandas
+    pa, pa_csv = None, None
+
+# Jumlah baris per chunk saat membaca file besar
+INGEST_CHUNK_ROWS = 250_000
+# Kolom yang dibaca dari file (nama dicocokkan tanpa memperhatikan huruf besar/kecil)
+INGEST_COLUMNS = POINT_COLUMNS + ('SURFACE',)
+
+
+def _is_excel(filename):
+    return filename.lower().endswith(('.xlsx', '.xlsm'))
+
+
+def read_preview(file, filename, nrows=5):
+    """Beberapa baris awal file untuk preview (tanpa membaca seluruh file)"""
+    file.seek(0)
+    preview = pd.read_excel(file, nrows=nrows) if _is_excel(filename) else pd.read_csv(file, nrows=nrows)
+    file.seek(0)
+    return preview
+
+
+def _column_map(columns):
+    """Nama kolom asli -> nama standar (huruf besar) untuk kolom yang dibutuhkan"""
+    return {c: str(c).upper() for c in columns if str(c).upper() in INGEST_COLUMNS}
+
+
+def _iter_csv_chunks(file, chunk_rows, engine):
+    header = pd.read_csv(file, nrows=0).columns
+    file.seek(0)
+    colmap = _column_map(header)
+    dtypes = {c: ('string' if name == 'SURFACE' else 'float64') for c, name in colmap.items()}
+
+    # dtype float64 eksplisit: nilai non-numerik di X/Y/Z langsung ditolak oleh kedua engine
+    if engine == 'pyarrow' and pa_csv is not None:
+        arrow_types = {c: ('string' if t == 'string' else 'float64') for c, t in dtypes.items()}
+        try:
+            reader = pa_csv.open_csv(
+                file,
+                convert_options=pa_csv.ConvertOptions(include_columns=list(colmap), column_types=arrow_types)
+            )
+            for batch in reader:
+                yield batch.to_pandas().rename(columns=colmap)
+        except pa.ArrowException as e:
+            raise ValueError(f"Kolom X/Y/Z harus numerik: {e}") from e
+        return
+
+    try:
+        for chunk in pd.read_csv(file, usecols=list(colmap), dtype=dtypes, chunksize=chunk_rows):
+            yield chunk.rename(columns=colmap)
+    except ValueError as e:
+        raise ValueError(f"Kolom X/Y/Z harus numerik: {e}") from e
+
+
+def _iter_excel_chunks(file, chunk_rows):
+    from openpyxl import load_workbook
+
+    # read_only = baris dibaca bertahap dari XML, bukan seluruh sheet ke memori
+    try:
+        workbook = load_workbook(file, read_only=True, data_only=True)
+    except Exception as e:
+        raise ValueError(f"File Excel tidak valid: {e}") from e
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, ())
+        colmap = _column_map(header)
+        index = [i for i, c in enumerate(header) if c in colmap]
+        names = [colmap[header[i]] for i in index]
+
+        buffer = []
+        for row in rows:
+            buffer.append([row[i] if i < len(row) else None for i in index])
+            if len(buffer) >= chunk_rows:
+                yield pd.DataFrame(buffer, columns=names)
+                buffer = []
+        if buffer:
+            yield pd.DataFrame(buffer, columns=names)
+    finally:
+        workbook.close()
+
+
+def iter_point_chunks(file, filename, chunk_rows=INGEST_CHUNK_ROWS, engine='c'):
+    """Baca file per chunk, hanya kolom X, Y, Z (+ Surface bila ada) dengan tipe eksplisit"""
+    file.seek(0)
+    if _is_excel(filename):
+        yield from _iter_excel_chunks(file, chunk_rows)
+    else:
+        yield from _iter_csv_chunks(file, chunk_rows, engine)
+
+
+def _validate_chunk(chunk):
+    """Paksa X/Y/Z ke float64 & buang baris kosong/inf (dihitung).
+
+    Aturan sama untuk semua reader: sel kosong dilewati, teks non-numerik ditolak.
+    """
+    for name in POINT_COLUMNS:
+        if chunk[name].dtype != np.float64:
+            values = pd.to_numeric(chunk[name], errors='coerce').astype(np.float64)
+            blank = chunk[name].isna() | (chunk[name].astype(str).str.strip() == '')
+            invalid = values.isna() & ~blank
+            if invalid.any():
+                raise ValueError(f"Kolom X/Y/Z harus numerik: nilai {chunk[name][invalid].iloc[0]!r} "
+                                 f"di kolom {name}")
+            chunk[name] = values
+    valid = np.isfinite(chunk[list(POINT_COLUMNS)].to_numpy()).all(axis=1)
+    return chunk[valid], int((~valid).sum())
+
+
+def ingest_points(file, filename, store, surfaces=None, top_surface=None, engine='c',
+                  chunk_rows=INGEST_CHUNK_ROWS, progress=None):
+    """Muat file ke PointStore per chunk (tanpa round-trip records).
+
+    Jika ada kolom Surface: baris surface `top_surface` masuk ke store, surface lain
+    ke dict `surfaces` (nama -> DataFrame X, Y, Z). progress(rows, fraksi|None) dipanggil per chunk.
+    """
+    rows, dropped = 0, 0
+    surface_parts = {}
+    total_bytes = getattr(file, 'size', None)
+
+    for chunk in iter_point_chunks(file, filename, chunk_rows, engine):
+        chunk, bad = _validate_chunk(chunk)
+        dropped += bad
+        if 'SURFACE' in chunk.columns and surfaces is not None:
+            names = chunk['SURFACE'].astype(str)
+            is_top = (names == top_surface).to_numpy()
+            top = chunk[is_top]
+            store.extend(top['X'].to_numpy(), top['Y'].to_numpy(), top['Z'].to_numpy())
+            for name, group in chunk[~is_top].groupby(names[~is_top]):
+                surface_parts.setdefault(name, []).append(group[list(POINT_COLUMNS)])
+        else:
+            store.extend(chunk['X'].to_numpy(), chunk['Y'].to_numpy(), chunk['Z'].to_numpy())
+        rows += len(chunk)
+
+        if progress is not None:
+            fraction = None
+            if total_bytes and not _is_excel(filename):
+                fraction = min(file.tell() / total_bytes, 1.0)
+            progress(rows, fraction)
+
+    for name, parts in surface_parts.items():
+        surfaces[name] = pd.concat([surfaces.get(name)] + parts, ignore_index=True)
+    return {'rows': rows, 'dropped': dropped}
+
+
+def scan_surface_names(file, filename, engine='c'):
+    """Daftar nama surface unik (dibaca per chunk)"""
+    names = set()
+    for chunk in iter_point_chunks(file, filename, engine=engine):
+        if 'SURFACE' in chunk.columns:
+            names.update(chunk['SURFACE'].dropna().astype(str).unique())
+    file.seek(0)
+    return sorted(names)
+
+
+# -------------------------------------------------------------------
+# FORMAT SESSION BINER (NPZ KOLOM)
+# -------------------------------------------------------------------
+SESSION_FORMAT = 'pbp-3d-session'
+SESSION_VERSION = 1
+
+
+def save_session(file, store, surfaces=None, contacts=None, petrophysics=None, grid=None,
+                 compress=True, preprocess=None):
+    """Simpan session sebagai NPZ: kolom titik, surface, grid cache + metadata JSON.
+
+    preprocess: parameter praproses titik (tolerance, cell_size) yang dipakai untuk grid,
+    agar kunci grid bisa dihitung ulang saat session dimuat.
+    """
+    surfaces = surfaces or {}
+    arrays = {f'points/{name}': store.column(name) for name in store.columns}
+    for name, frame in surfaces.items():
+        for col in POINT_COLUMNS:
+            arrays[f'surfaces/{name}/{col}'] = frame[col].to_numpy(dtype=np.float64)
+
+    meta = {
+        'format': SESSION_FORMAT,
+        'version': SESSION_VERSION,
+        'columns': store.columns,
+        'surfaces': list(surfaces),
+        'contacts': contacts or {},
+        'petrophysics': petrophysics or {},
+        'grid': None,
+    }
+    if grid is not None:
+        arrays['grid/x'], arrays['grid/y'], arrays['grid/z'] = grid.x, grid.y, grid.z
+        meta['grid'] = {'nx': grid.spec.nx, 'ny': grid.spec.ny, 'bounds': list(grid.spec.bounds),
+                        'method': grid.method, 'key': grid.key, 'preprocess': preprocess or {}}
+    arrays['meta'] = np.array(json.dumps(meta))
+
+    (np.savez_compressed if compress else np.savez)(file, **arrays)
+
+
+def session_bytes(store, *args, **kwargs):
+    """Hasil save_session sebagai bytes (untuk tombol unduh)"""
+    buffer = io.BytesIO()
+    save_session(buffer, store, *args, **kwargs)
+    return buffer.getvalue()
+
+
+def _memmap_members(path):
+    """Peta nama member -> np.memmap untuk NPZ tanpa kompresi di disk"""
+    members = {}
+    with zipfile.ZipFile(path) as archive, open(path, 'rb') as fh:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED or not info.filename.endswith('.npy'):
+                continue
+            # Lewati local file header (30 byte + nama + extra) lalu header .npy
+            fh.seek(info.header_offset + 26)
+            name_len, extra_len = struct.unpack('<HH', fh.read(4))
+            fh.seek(info.header_offset + 30 + name_len + extra_len)
+            version = np.lib.format.read_magic(fh)
+            read_header = (np.lib.format.read_array_header_1_0 if version == (1, 0)
+                           else np.lib.format.read_array_header_2_0)
+            shape, fortran, dtype = read_header(fh)
+            if dtype.hasobject:
+                continue
+            members[info.filename[:-4]] = np.memmap(path, dtype=dtype, mode='r', offset=fh.tell(),
+                                                    shape=shape, order='F' if fortran else 'C')
+    return members
+
+
+def _validate_session(arrays, meta):
+    """Validasi skema (nama, dimensi, panjang kolom) tanpa cek per baris"""
+    if meta.get('format') != SESSION_FORMAT:
+        raise ValueError("Bukan file session aplikasi ini")
+    if meta.get('version', 0) > SESSION_VERSION:
+        raise ValueError(f"Versi session {meta['version']} lebih baru dari yang didukung")
+
+    def check_columns(prefix, columns):
+        lengths = set()
+        for col in columns:
+            key = f'{prefix}/{col}'
+            if key not in arrays:
+                raise ValueError(f"Kolom '{key}' tidak ada di session")
+            arr = arrays[key]
+            if arr.ndim != 1 or arr.dtype.kind != 'f':
+                raise ValueError(f"Kolom '{key}' harus array float 1 dimensi")
+            lengths.add(arr.shape[0])
+        if len(lengths) > 1:
+            raise ValueError(f"Panjang kolom '{prefix}' tidak sama")
+
+    check_columns('points', meta['columns'])
+    for name in meta['surfaces']:
+        check_columns(f'surfaces/{name}', POINT_COLUMNS)
+    if meta.get('grid'):
+        z = arrays['grid/z']
+        if z.shape != (arrays['grid/y'].shape[0], arrays['grid/x'].shape[0]) or \
+                z.shape != (meta['grid'].get('ny'), meta['grid'].get('nx')) or z.dtype.kind != 'f':
+            raise ValueError("Ukuran grid session tidak konsisten")
+
+
+def load_session(source, mmap=False):
+    """Muat session NPZ (atau JSON list-of-dict lama). mmap=True untuk NPZ tanpa kompresi di disk"""
+    if isinstance(source, (str, os.PathLike)) and str(source).lower().endswith('.json'):
+        with open(source, encoding='utf-8') as fh:
+            return load_session_json(json.load(fh))
+
+    if mmap and isinstance(source, (str, os.PathLike)):
+        members = _memmap_members(source)
+        with np.load(source, allow_pickle=False) as npz:
+            arrays = {key: members[key] if key in members else npz[key] for key in npz.files}
+    else:
+        with np.load(source, allow_pickle=False) as npz:
+            arrays = {key: npz[key] for key in npz.files}
+
+    if 'meta' not in arrays:
+        raise ValueError("Session tidak memiliki metadata")
+    meta = json.loads(str(arrays['meta']))
+    _validate_session(arrays, meta)
+
+    store = PointStore(capacity=max(len(arrays['points/X']), 1))
+    columns = {name: arrays[f'points/{name}'] for name in meta['columns']}
+    store.extend(columns.pop('X'), columns.pop('Y'), columns.pop('Z'), **columns)
+    surfaces = {
+        name: pd.DataFrame({col: arrays[f'surfaces/{name}/{col}'] for col in POINT_COLUMNS})
+        for name in meta['surfaces']
+    }
+    grid = None
+    if meta.get('grid'):
+        grid = dict(meta['grid'], x=arrays['grid/x'], y=arrays['grid/y'], z=arrays['grid/z'])
+    return {'points': store, 'surfaces': surfaces, 'contacts': meta['contacts'],
+            'petrophysics': meta['petrophysics'], 'grid': grid}
+
+
+def load_session_json(session_data):
+    """Format session lama: list of {'X', 'Y', 'Z'}; divalidasi per kolom, bukan per item"""
+    if not isinstance(session_data, list):
+        raise ValueError("Format session tidak valid!")
+    frame = pd.DataFrame.from_records(session_data)
+    if len(frame) and not set(POINT_COLUMNS).issubset(frame.columns):
+        raise ValueError("Format session tidak valid!")
+    if len(frame) and frame[list(POINT_COLUMNS)].isna().any().any():
+        raise ValueError("Format session tidak valid!")
+    return {'points': PointStore.from_records(session_data), 'surfaces': {}, 'contacts': {},
+            'petrophysics': {}, 'grid': None}
+
+
+# -------------------------------------------------------------------
+# EKSPOR GRID (CSV, ESRI ASCII, ZMAP+, NPZ)
+# -------------------------------------------------------------------
+# Jumlah baris/kolom grid yang diformat per langkah saat menulis teks
+GRID_EXPORT_BLOCK = 256
+# Level gzip rendah: rasio sudah baik untuk teks angka & jauh lebih cepat dari level default
+GRID_EXPORT_GZIP_LEVEL = 1
+ESRI_NODATA = -9999.0
+ZMAP_NODATA = 1e30
+ZMAP_PER_LINE = 5
+
+# kode -> (label, ekstensi, mime)
+GRID_EXPORT_FORMATS = {
+    'csv': ('CSV (X, Y, Z per node)', '.csv', 'text/csv'),
+    'asc': ('ESRI ASCII Grid', '.asc', 'text/plain'),
+    'zmap': ('ZMAP+ (Petrel)', '.dat', 'text/plain'),
+    'npz': ('NPZ float32 + georeferensi', '.npz', 'application/octet-stream'),
+}
+
+
+def write_grid_csv(fh, grid, fmt='%.15g'):
+    """CSV X, Y, Z per node, ditulis per blok baris (tanpa DataFrame seukuran grid).
+
+    Dengan pyarrow, blok diformat oleh writer CSV Arrow (presisi penuh, jauh lebih cepat).
+    Node kosong (NaN) ditulis sebagai field kosong, sama seperti DataFrame.to_csv.
+    """
+    fh.write(b'X,Y,Z\n')
+    for r0 in range(0, len(grid.y), GRID_EXPORT_BLOCK):
+        r1 = min(r0 + GRID_EXPORT_BLOCK, len(grid.y))
+        gx, gy = np.meshgrid(grid.x, grid.y[r0:r1])
+        z = np.asarray(grid.z[r0:r1], dtype=np.float64).ravel()
+        if pa_csv is not None:
+            # from_pandas: NaN -> null (field kosong), bukan teks 'nan'
+            table = pa.table({'X': gx.ravel(), 'Y': gy.ravel(), 'Z': pa.array(z, from_pandas=True)})
+            pa_csv.write_csv(table, fh, pa_csv.WriteOptions(include_header=False))
+        else:
+            block = io.BytesIO()
+            np.savetxt(block, np.column_stack([gx.ravel(), gy.ravel(), z]), fmt=fmt, delimiter=',')
+            # Z kolom terakhir: 'nan' di akhir baris -> field kosong
+            fh.write(block.getvalue().replace(b',nan\n', b',\n'))
+
+
+def write_esri_ascii(fh, grid, fmt='%.4f', nodata=ESRI_NODATA):
+    """ESRI ASCII Grid: header origin/ukuran sel sekali, lalu baris dari utara ke selatan"""
+    dx, dy = grid.dx, grid.dy
+    header = [f"ncols {len(grid.x)}", f"nrows {len(grid.y)}",
+              f"xllcenter {grid.x[0]:.6f}", f"yllcenter {grid.y[0]:.6f}"]
+    # Sel persegi -> cellsize; selain itu dx/dy (dibaca GDAL)
+    if np.isclose(dx, dy):
+        header.append(f"cellsize {dx:.6f}")
+    else:
+        header += [f"dx {dx:.6f}", f"dy {dy:.6f}"]
+    header.append(f"NODATA_value {nodata:g}")
+    fh.write(('\n'.join(header) + '\n').encode())
+    for r1 in range(len(grid.y), 0, -GRID_EXPORT_BLOCK):
+        r0 = max(r1 - GRID_EXPORT_BLOCK, 0)
+        block = np.asarray(grid.z[r0:r1])[::-1]
+        np.savetxt(fh, np.where(np.isnan(block), nodata, block), fmt=fmt, delimiter=' ')
+
+
+def write_zmap(fh, grid, name='GRID', decimals=4, nodata=ZMAP_NODATA):
+    """ZMAP+ grid: nilai per kolom (barat ke timur), tiap kolom dari utara ke selatan"""
+    nrows, ncols = len(grid.y), len(grid.x)
+    # Lebar kolom cukup untuk nilai terbesar (+ tanda & spasi pemisah)
+    finite = np.asarray(grid.z)[np.isfinite(grid.z)]
+    largest = float(np.abs(finite).max()) if finite.size else 0.0
+    width = max(15, len(f'{largest:.{decimals}f}') + 2)
+    header = (f"! Diekspor dari {name}\n"
+              f"@{name}, GRID, {ZMAP_PER_LINE}\n"
+              f"{width}, {nodata:.1E}, , {decimals}, 1\n"
+              f"{nrows}, {ncols}, {grid.x[0]:.6f}, {grid.x[-1]:.6f}, {grid.y[0]:.6f}, {grid.y[-1]:.6f}\n"
+              f"0.0, 0.0, 0.0\n@\n")
+    fh.write(header.encode())
+    value_fmt = f'%{width}.{decimals}f'
+    null_text = f'{nodata:{width}.{decimals}E}'
+    line_width = width * ZMAP_PER_LINE
+    for c0 in range(0, ncols, GRID_EXPORT_BLOCK):
+        c1 = min(c0 + GRID_EXPORT_BLOCK, ncols)
+        block = np.asarray(grid.z[:, c0:c1])[::-1].T
+        for column in block:
+            nulls = np.isnan(column)
+            # Satu operasi format per kolom; tiap nilai tepat `width` karakter
+            text = (value_fmt * nrows) % tuple(np.where(nulls, 0.0, column))
+            if nulls.any():
+                values = [text[i:i + width] for i in range(0, len(text), width)]
+                for i in np.flatnonzero(nulls):
+                    values[i] = null_text
+                text = ''.join(values)
+            lines = [text[i:i + line_width] for i in range(0, len(text), line_width)]
+            fh.write(('\n'.join(lines) + '\n').encode())
+
+
+def write_grid_npz(fh, grid, compress=True):
+    """Raster float32 + origin & increment (cukup disimpan sekali) dalam NPZ"""
+    arrays = {
+        'z': np.asarray(grid.z, dtype=np.float32),
+        'origin': np.array([grid.x[0], grid.y[0]]),
+        'increment': np.array([grid.dx, grid.dy]),
+        'shape': np.array(grid.z.shape),
+    }
+    (np.savez_compressed if compress else np.savez)(fh, **arrays)
+
+
+_GRID_WRITERS = {'csv': write_grid_csv, 'asc': write_esri_ascii, 'zmap': write_zmap,
+                 'npz': write_grid_npz}
+
+
+def export_grid(fh, grid, fmt, compress=False):
+    """Tulis grid ke file biner dalam format GRID_EXPORT_FORMATS; compress=True -> gzip (teks)"""
+    if fmt not in _GRID_WRITERS:
+        raise ValueError(f"Format grid tidak dikenal: {fmt}")
+    if fmt == 'npz':
+        write_grid_npz(fh, grid, compress)
+    elif compress:
+        with gzip.GzipFile(fileobj=fh, mode='wb', compresslevel=GRID_EXPORT_GZIP_LEVEL) as gz:
+            _GRID_WRITERS[fmt](gz, grid)
+    else:
+        _GRID_WRITERS[fmt](fh, grid)
+
+
+def grid_export_bytes(grid, fmt, compress=False):
+    """Hasil export_grid sebagai bytes (untuk tombol unduh)"""
+    buffer = io.BytesIO()
+    export_grid(buffer, grid, fmt, compress)
+    return buffer.getvalue()
@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+
+from interpolasi import TILED_GRID_NODES, GridSpec, get_interpolator, grid_axes, grid_surface, points_hash
+from volumetrik import thickness_map
+
+# Persentil selisih yang dilaporkan per survey
+DIFF_PERCENTILES = (10, 50, 90)
+
+
+def resample_surveys(surveys, spec=None, method='linear'):
+    """Grid semua survey (dict nama -> (x, y, z)) ke satu grid bersama.
+
+    Bounds diambil dari gabungan semua survey (kecuali spec sudah punya bounds).
+    Survey dengan lokasi X/Y sama (sumur yang sama disurvei ulang) berbagi satu
+    triangulasi ter-cache; untuk linear semuanya diinterpolasi dengan satu perkalian sparse.
+    Grid di atas TILED_GRID_NODES lewat grid_surface (jalur per blok, tanpa matriks bobot
+    seukuran grid). Kembalikan dict names, spec, x, y (sumbu) dan z (k, ny, nx).
+    """
+    names = list(surveys)
+    all_x = np.concatenate([np.asarray(xyz[0], dtype=np.float64) for xyz in surveys.values()])
+    all_y = np.concatenate([np.asarray(xyz[1], dtype=np.float64) for xyz in surveys.values()])
+    spec = (spec or GridSpec()).resolve(all_x, all_y)
+
+    groups = {}
+    for i, (x, y, _) in enumerate(surveys.values()):
+        groups.setdefault(points_hash(x, y), []).append(i)
+
+    stack = np.empty((len(names), spec.ny, spec.nx))
+    for members in groups.values():
+        x, y, _ = surveys[names[members[0]]]
+        if method == 'linear' and spec.n_nodes <= TILED_GRID_NODES:
+            values = np.column_stack([np.asarray(surveys[names[i]][2], dtype=np.float64) for i in members])
+            stack[members] = get_interpolator(x, y, spec).interpolate_stack(values)
+        else:
+            for i in members:
+                stack[i] = grid_surface(*surveys[names[i]], spec, method).z
+    axis_x, axis_y = grid_axes(spec)
+    return {'names': names, 'spec': spec, 'x': axis_x, 'y': axis_y, 'z': stack}
+
+
+def _cell_area(resampled):
+    x, y = resampled['x'], resampled['y']
+    return float((x[1] - x[0]) * (y[1] - y[0]))
+
+
+def difference_maps(resampled, base=0):
+    """Peta selisih tiap survey terhadap survey acuan (k, ny, nx); NaN di luar cakupan bersama"""
+    return resampled['z'] - resampled['z'][base]
+
+
+def difference_stats(resampled, base=0):
+    """Statistik selisih semua survey terhadap acuan dalam satu operasi array (k, ny, nx)"""
+    diff = difference_maps(resampled, base)
+    k = len(diff)
+    valid = ~np.isnan(diff)
+    n_valid = valid.sum(axis=(1, 2))
+    filled = np.where(valid, diff, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = filled.sum(axis=(1, 2)) / n_valid
+        std = np.sqrt(np.maximum((filled ** 2).sum(axis=(1, 2)) / n_valid - mean ** 2, 0.0))
+        rms = np.sqrt((filled ** 2).sum(axis=(1, 2)) / n_valid)
+
+    percentiles = np.full((len(DIFF_PERCENTILES), k), np.nan)
+    overlap = n_valid > 0
+    if overlap.any():
+        percentiles[:, overlap] = np.nanpercentile(diff[overlap].reshape(int(overlap.sum()), -1),
+                                                   DIFF_PERCENTILES, axis=1)
+
+    cell_area = _cell_area(resampled)
+    frame = pd.DataFrame({
+        'Survey': resampled['names'],
+        'Node tumpang tindih': n_valid,
+        'Rata-rata Δ (m)': mean,
+        'Std Δ (m)': std,
+        'RMS Δ (m)': rms,
+        'Min Δ (m)': np.where(overlap, np.where(valid, diff, np.inf).min(axis=(1, 2)), np.nan),
+        'Max Δ (m)': np.where(overlap, np.where(valid, diff, -np.inf).max(axis=(1, 2)), np.nan),
+    })
+    for p, values in zip(DIFF_PERCENTILES, percentiles):
+        frame[f'P{p} Δ (m)'] = values
+    frame['Volume Δ+ (m³)'] = np.clip(filled, 0, None).sum(axis=(1, 2)) * cell_area
+    frame['Volume Δ− (m³)'] = np.clip(filled, None, 0).sum(axis=(1, 2)) * cell_area
+    frame['Volume bersih (m³)'] = filled.sum(axis=(1, 2)) * cell_area
+    return frame.drop(index=base).reset_index(drop=True)
+
+
+def contact_volume_change(resampled, goc, woc, base=0):
+    """GRV gas cap, oil zone & total tiap survey + perubahannya terhadap acuan.
+
+    Hanya node yang terisi di semua survey yang dihitung, agar beda cakupan
+    interpolasi tidak terbaca sebagai perubahan volume.
+    """
+    z = resampled['z']
+    common = np.all(~np.isnan(z), axis=0)
+    top = np.where(common, z, np.nan)
+    cell_area = _cell_area(resampled)
+    gas_cap = thickness_map(top, goc).sum(axis=(1, 2)) * cell_area
+    total = thickness_map(top, woc).sum(axis=(1, 2)) * cell_area
+    frame = pd.DataFrame({
+        'Survey': resampled['names'],
+        'Gas Cap (m³)': gas_cap,
+        'Oil Zone (m³)': np.maximum(total - gas_cap, 0),
+        'Total Reservoir (m³)': total,
+        'Δ Total vs acuan (m³)': total - total[base],
+    })
+    with np.errstate(invalid='ignore', divide='ignore'):
+        frame['Δ Total vs acuan (%)'] = np.where(total[base] > 0, 100 * (total - total[base]) / total[base],
+                                                 np.nan)
+    return frame
@@ -0,0 +1,55 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import interpolasi
+from penyimpanan import PointStore
+
+AppTest = pytest.importorskip('streamlit.testing.v1').AppTest
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app.py')
+
+
+@pytest.fixture(autouse=True)
+def memory_only_cache(monkeypatch):
+    monkeypatch.setattr(interpolasi, '_disk_cache', None)
+    interpolasi.clear_grid_cache()
+    yield
+    interpolasi.clear_grid_cache()
+
+
+def run_with_surfaces(surfaces):
+    rng = np.random.default_rng(0)
+    x, y = rng.uniform(0, 1000, (2, 80))
+    store = PointStore()
+    store.extend(x, y, 1000 + 0.1 * x + 0.05 * y)
+    at = AppTest.from_file(APP, default_timeout=120)
+    at.session_state['data_points'] = store
+    at.session_state['surfaces'] = surfaces
+    at.run()
+    return at
+
+
+def contact_surface(z, n=30, seed=1):
+    x, y = np.random.default_rng(seed).uniform(0, 1000, (2, n))
+    return pd.DataFrame({'X': x, 'Y': y, 'Z': np.full(n, z)})
+
+
+def test_mapped_contacts_are_used():
+    at = run_with_surfaces({'GOC': contact_surface(1060.0), 'WOC': contact_surface(1120.0, seed=2)})
+    assert not at.exception
+    assert not [w for w in at.warning if 'gagal' in w.value or 'datar' in w.value]
+    assert any('Kontak terpetakan: GOC = GOC, WOC = WOC' in c.value for c in at.caption)
+
+
+def test_failed_surface_falls_back_to_flat_contact():
+    line = pd.DataFrame({'X': [0.0, 100.0, 200.0, 300.0], 'Y': [0.0, 100.0, 200.0, 300.0],
+                         'Z': [1060.0] * 4})
+    at = run_with_surfaces({'GOC': line, 'WOC': contact_surface(1120.0, seed=2)})
+    assert not at.exception
+    warnings = [w.value for w in at.warning]
+    assert any('Surface GOC gagal di-grid' in w for w in warnings)
+    assert any('GOC memakai kontak datar' in w for w in warnings)
+    # WOC yang valid tetap terpetakan
+    assert any('GOC = datar, WOC = WOC' in c.value for c in at.caption)
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from scipy.spatial.distance import cdist
+
+from geostatistik import ENGINES, IDWInterpolator, OrdinaryKrigingInterpolator, fit_variogram
+
+
+def scattered(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    xy = rng.uniform(0, 1000, (n, 2))
+    return xy, 1000 + 0.05 * xy[:, 0] + 20 * np.sin(xy[:, 1] / 120)
+
+
+@pytest.mark.parametrize('method', sorted(ENGINES))
+def test_engine_reproduces_data_points(method):
+    xy, values = scattered()
+    interp = ENGINES[method](xy, values)
+    np.testing.assert_allclose(interp(xy), values, atol=1e-6)
+
+
+@pytest.mark.parametrize('method', sorted(ENGINES))
+def test_engine_is_finite_when_extrapolating(method):
+    xy, values = scattered()
+    interp = ENGINES[method](xy, values)
+    far = np.array([[-5000.0, -5000.0], [6000.0, 500.0], [500.0, 1e5], [1001.0, 1001.0]])
+    predicted = interp(far)
+    assert np.all(np.isfinite(predicted))
+
+
+def test_idw_and_kriging_stay_near_data_range():
+    xy, values = scattered()
+    targets = np.random.default_rng(1).uniform(-500, 1500, (500, 2))
+    idw = IDWInterpolator(xy, values)(targets)
+    # IDW: rata-rata berbobot positif -> tidak keluar rentang data
+    assert values.min() <= idw.min() and idw.max() <= values.max()
+    kriged = OrdinaryKrigingInterpolator(xy, values)(targets)
+    spread = values.max() - values.min()
+    assert values.min() - 0.5 * spread < kriged.min() and kriged.max() < values.max() + 0.5 * spread
+
+
+def test_fit_variogram_recovers_exponential_model():
+    # Realisasi medan Gauss dengan kovarians eksponensial: sill 4, range praktis 300 m
+    rng = np.random.default_rng(5)
+    xy = rng.uniform(0, 1000, (800, 2))
+    cov = 4.0 * np.exp(-3.0 * cdist(xy, xy) / 300.0) + 1e-8 * np.eye(len(xy))
+    values = 100.0 + np.linalg.cholesky(cov) @ rng.standard_normal(len(xy))
+    nugget, psill, vrange = fit_variogram(xy, values)
+    assert 0 <= nugget < 0.5 * (nugget + psill)
+    assert 2.0 < nugget + psill < 8.0
+    assert 150.0 < vrange < 700.0
+
+
+def test_fit_variogram_constant_values_falls_back():
+    xy, _ = scattered(50)
+    nugget, psill, vrange = fit_variogram(xy, np.full(50, 1234.0))
+    assert nugget >= 0 and psill > 0 and vrange > 0
+    kriged = OrdinaryKrigingInterpolator(xy, np.full(50, 1234.0))(np.array([[10.0, 10.0], [2000.0, 0.0]]))
+    np.testing.assert_allclose(kriged, 1234.0)
@@ -0,0 +1,131 @@
+import json
+import os
+import time
+
+import numpy as np
+import pytest
+
+import interpolasi
+from interpolasi import (GridSpec, clear_grid_cache, grid_surface, grid_surfaces, merge_clusters,
+                         preprocess_points)
+
+
+def dense_line(length=100.0, step=0.05, y=0.0):
+    x = np.arange(0.0, length + step / 2, step)
+    return x, np.full_like(x, y), np.linspace(1000.0, 1100.0, len(x))
+
+
+def test_dense_line_keeps_its_extent():
+    clear_grid_cache()
+    x, y, z = dense_line()
+    px, py, pz, report = preprocess_points(x, y, z, tolerance=0.1)
+    # Tidak berantai: garis 100 m tidak runtuh menjadi satu titik
+    assert report['output'] > len(x) // 4
+    assert px.min() < 0.2 and px.max() > 99.8
+    assert report['merged'] == len(x) - report['output']
+    np.testing.assert_allclose(np.sort(pz), pz[np.argsort(px)])
+
+
+def test_parallel_lines_stay_separate():
+    clear_grid_cache()
+    x1, y1, z1 = dense_line(y=0.0)
+    x2, y2, z2 = dense_line(y=1.0)
+    px, py, _, report = preprocess_points(np.r_[x1, x2], np.r_[y1, y2], np.r_[z1, z2], tolerance=0.1)
+    assert set(np.round(py, 6)) == {0.0, 1.0}
+    assert np.count_nonzero(py == 0.0) == np.count_nonzero(py == 1.0) == report['output'] // 2
+
+
+def test_cluster_diameter_is_capped():
+    rng = np.random.default_rng(0)
+    xy = rng.uniform(0, 10, (5000, 2))
+    tolerance = 0.3
+    labels = merge_clusters(xy, tolerance)
+    for label in np.unique(labels):
+        members = xy[labels == label]
+        if len(members) > 1:
+            spread = np.hypot(*(members[:, None, :] - members[None, :, :]).transpose(2, 0, 1))
+            assert spread.max() <= 2 * tolerance + 1e-12
+
+
+def test_no_parameters_returns_input():
+    x, y, z = dense_line(length=1.0)
+    px, py, pz, report = preprocess_points(x, y, z)
+    assert px is not None and len(px) == len(x) and report['merged'] == 0
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_grid_surfaces_matches_grid_surface(workers, monkeypatch):
+    monkeypatch.setattr(interpolasi, '_disk_cache', None)
+    clear_grid_cache()
+    rng = np.random.default_rng(3)
+    surfaces = {}
+    for name, base in (('Top', 1000.0), ('GOC', 1080.0), ('WOC', 1120.0)):
+        x, y = rng.uniform(0, 500, (2, 40))
+        surfaces[name] = (x, y, base + 0.02 * x + 0.01 * y)
+    spec = GridSpec(25, 20, (0.0, 500.0, 0.0, 500.0))
+    grids = grid_surfaces(surfaces, spec, 'linear', workers=workers)
+    assert list(grids) == list(surfaces)
+    clear_grid_cache()
+    for name, xyz in surfaces.items():
+        expected = grid_surface(*xyz, spec, 'linear')
+        assert grids[name].key == expected.key
+        np.testing.assert_allclose(grids[name].z, expected.z, equal_nan=True)
+
+
+def disk_grid(key, seed=0, nx=50, ny=40):
+    z = np.random.default_rng(seed).uniform(1000, 1100, (ny, nx))
+    spec = GridSpec(nx, ny, (0.0, 490.0, 0.0, 390.0))
+    x, y = interpolasi.grid_axes(spec)
+    return interpolasi.GridResult(x, y, z, np.ones(z.shape, bool), spec, 'linear', key)
+
+
+def test_disk_cache_round_trip(tmp_path):
+    cache = interpolasi.DiskGridCache(str(tmp_path))
+    grid = disk_grid('a')
+    cache.put(grid)
+    loaded = cache.get('a')
+    assert isinstance(loaded.z, np.memmap)
+    np.testing.assert_array_equal(loaded.z, grid.z)
+    assert loaded.spec == grid.spec and loaded.method == 'linear'
+    assert cache.get('b') is None
+
+
+def test_disk_cache_drops_truncated_npy(tmp_path):
+    cache = interpolasi.DiskGridCache(str(tmp_path))
+    cache.put(disk_grid('a'))
+    data_path, meta_path = cache._paths('a')
+    with open(data_path, 'r+b') as fh:
+        fh.truncate(os.path.getsize(data_path) // 2)
+    assert cache.get('a') is None
+    assert not os.path.exists(data_path) and not os.path.exists(meta_path)
+
+
+@pytest.mark.parametrize('field, value', [('sha1', '0' * 40), ('key', 'lain'), ('shape', [1, 1])])
+def test_disk_cache_drops_tampered_metadata(tmp_path, field, value):
+    cache = interpolasi.DiskGridCache(str(tmp_path))
+    cache.put(disk_grid('a'))
+    data_path, meta_path = cache._paths('a')
+    with open(meta_path, encoding='utf-8') as fh:
+        meta = json.load(fh)
+    meta[field] = value
+    with open(meta_path, 'w', encoding='utf-8') as fh:
+        json.dump(meta, fh)
+    assert cache.get('a') is None
+    assert not os.path.exists(data_path) and not os.path.exists(meta_path)
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    entry_bytes = disk_grid('a').z.nbytes
+    # Muat dua entri, bukan tiga
+    cache = interpolasi.DiskGridCache(str(tmp_path), max_mb=2.5 * entry_bytes / 1e6)
+    cache.put(disk_grid('a', 1))
+    cache.put(disk_grid('b', 2))
+    now = time.time()
+    os.utime(cache._paths('a')[1], (now - 100, now - 100))
+    os.utime(cache._paths('b')[1], (now - 50, now - 50))
+    # Akses 'a' memperbarui waktu akses -> 'b' yang paling lama tidak dipakai
+    assert cache.get('a') is not None
+    cache.put(disk_grid('c', 3))
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+    assert not os.path.exists(cache._paths('b')[0])
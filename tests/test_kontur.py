@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from interpolasi import GridResult, GridSpec
+from kontur import contact_outline, contour_area_table, marching_squares, region_metrics
+
+
+def make_grid(z, x, y):
+    spec = GridSpec(len(x), len(y), (x[0], x[-1], y[0], y[-1]))
+    return GridResult(x, y, z, ~np.isnan(z), spec, 'test', f"test:{hash(z.tobytes())}")
+
+
+def radial_grid(n=401, half=100.0):
+    axis = np.linspace(-half, half, n)
+    gx, gy = np.meshgrid(axis, axis)
+    return axis, np.hypot(gx, gy)
+
+
+def area_of(x, y, field):
+    return region_metrics(marching_squares(x, y, field))
+
+
+def test_plane_area_is_exact():
+    x, y = np.linspace(0, 100, 51), np.linspace(0, 40, 21)
+    z = np.tile(x, (len(y), 1))
+    area, perimeter = area_of(x, y, z - 37.3)
+    assert area == pytest.approx(37.3 * 40)
+    assert perimeter == pytest.approx(2 * (37.3 + 40))
+
+
+def test_cone_disc_area_and_perimeter():
+    axis, r = radial_grid()
+    area, perimeter = area_of(axis, axis, r - 60.0)
+    assert area == pytest.approx(np.pi * 60.0 ** 2, rel=1e-3)
+    assert perimeter == pytest.approx(2 * np.pi * 60.0, rel=1e-3)
+
+
+def test_annulus_hole_is_subtracted():
+    axis, r = radial_grid()
+    # Daerah 40 < r < 70: lingkaran dalam berorientasi searah jarum jam (lubang)
+    area, perimeter = area_of(axis, axis, np.abs(r - 55.0) - 15.0)
+    assert area == pytest.approx(np.pi * (70.0 ** 2 - 40.0 ** 2), rel=1e-3)
+    assert perimeter == pytest.approx(2 * np.pi * (70.0 + 40.0), rel=1e-3)
+
+
+def test_nan_hole_removes_its_cells():
+    axis, r = radial_grid()
+    dx = axis[1] - axis[0]
+    full, _ = area_of(axis, axis, r - 60.0)
+    field = r - 60.0
+    # Blok 10x10 node kosong di dalam lingkaran
+    field[200:210, 200:210] = np.nan
+    holed, _ = area_of(axis, axis, field)
+    removed = full - holed
+    # Batas menempel di node valid terdekat: lubang antara 9x9 dan 11x11 sel
+    assert (9 * dx) ** 2 < removed < (11 * dx) ** 2
+
+
+def test_contour_area_table_matches_contact_outline():
+    axis, r = radial_grid(201)
+    grid = make_grid(1000.0 + r, axis, axis)
+    table = contour_area_table(grid, [1030.0, 1060.0])
+    np.testing.assert_allclose(table['Luas (m²)'], np.pi * np.array([30.0, 60.0]) ** 2, rtol=5e-3)
+    assert table['Luas (m²)'].iloc[1] == pytest.approx(contact_outline(grid, 1060.0)['area'])
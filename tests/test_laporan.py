@@ -0,0 +1,28 @@
+from concurrent.futures import Future
+
+import laporan
+from interpolasi import LRUCache, cache_nbytes
+from laporan import lazy_report, report_key
+
+
+def test_finished_report_is_measured_by_length():
+    future = Future()
+    assert cache_nbytes(future) == 0
+    future.set_result(b'x' * 1234)
+    assert cache_nbytes(future) == 1234
+
+
+def test_report_cache_is_bounded_by_bytes(monkeypatch):
+    cache = LRUCache(32, max_mb=1.0)
+    monkeypatch.setattr(laporan, '_report_cache', cache)
+    payload = lambda n: b'x' * n
+    for i in range(5):
+        data = lazy_report(report_key('csv', i), payload, 400_000)()
+        assert len(data) == 400_000
+    # Callback ukur ulang jalan di worker setelah tiap laporan; tunggu sampai antrean kosong
+    laporan._report_executor.submit(lambda: None).result()
+    # 5 x 0.4 MB > 1 MB -> hanya dua laporan terbaru yang tersisa
+    assert cache.nbytes <= 1_000_000
+    assert len(cache) == 2
+    assert cache.get(report_key('csv', 4)) is not None
+    assert cache.get(report_key('csv', 0)) is None
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+import penampang
+from interpolasi import GridResult, GridSpec
+from penampang import fence_sections, polyline_stations, sample_grid
+
+
+def plane_grid():
+    x, y = np.linspace(0, 1000, 51), np.linspace(0, 800, 41)
+    z = 1000.0 + 0.1 * x[None, :] + 0.05 * y[:, None]
+    spec = GridSpec(len(x), len(y), (0.0, 1000.0, 0.0, 800.0))
+    return GridResult(x, y, z, np.ones(z.shape, bool), spec, 'linear', 'plane')
+
+
+def test_sample_grid_is_exact_on_plane_and_nan_outside():
+    grid = plane_grid()
+    x, y = np.array([12.5, 999.0, 1200.0]), np.array([7.0, 799.0, 10.0])
+    values = sample_grid(grid.x, grid.y, grid.z, x, y)
+    np.testing.assert_allclose(values[:2], 1000.0 + 0.1 * x[:2] + 0.05 * y[:2])
+    assert np.isnan(values[2])
+
+
+def test_fence_station_count_is_capped(monkeypatch):
+    monkeypatch.setattr(penampang, 'MAX_SECTION_STATIONS', 10_000)
+    fence = fence_sections(plane_grid(), (500.0, 400.0), 90.0, 1000.0, 1000, 0.5, 0.01)
+    assert fence['z'].size <= 10_000
+    assert fence['spacing'] > 0.01
+    assert fence['distance'][-1] == pytest.approx(1000.0, abs=fence['spacing'])
+
+
+def test_fence_keeps_requested_spacing_when_small():
+    fence = fence_sections(plane_grid(), (500.0, 400.0), 90.0, 600.0, 1, 10.0, 20.0)
+    assert fence['spacing'] == 20.0
+    assert fence['z'].shape == (1, 31)
+    np.testing.assert_allclose(fence['z'][0], 1000.0 + 0.1 * fence['x'][0] + 0.05 * fence['y'][0])
+
+
+def test_polyline_station_count_is_capped(monkeypatch):
+    monkeypatch.setattr(penampang, 'MAX_SECTION_STATIONS', 5_000)
+    x, y, distance = polyline_stations([[0.0, 0.0], [1000.0, 0.0], [1000.0, 800.0]], 0.01)
+    assert len(distance) <= 5_000 + 3
+    assert distance[-1] == pytest.approx(1800.0)
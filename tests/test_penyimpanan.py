@@ -0,0 +1,65 @@
+import io
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+import penyimpanan
+from penyimpanan import PointStore, ingest_points, pa_csv, write_grid_csv
+
+ENGINES = ['c'] + (['pyarrow'] if pa_csv is not None else [])
+
+
+def excel_bytes(rows):
+    workbook = Workbook()
+    for row in rows:
+        workbook.active.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_csv_non_numeric_rejected(engine):
+    with pytest.raises(ValueError, match='numerik'):
+        ingest_points(io.BytesIO(b"X,Y,Z\n1,2,3\n4,abc,6\n"), 'data.csv', PointStore(), engine=engine)
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_csv_blank_cells_dropped(engine):
+    store = PointStore()
+    stats = ingest_points(io.BytesIO(b"X,Y,Z\n1,2,3\n4,,6\n"), 'data.csv', store, engine=engine)
+    assert stats == {'rows': 1, 'dropped': 1}
+    assert len(store) == 1
+
+
+def test_excel_follows_csv_rules():
+    with pytest.raises(ValueError, match='numerik'):
+        ingest_points(excel_bytes([['X', 'Y', 'Z'], [1, 2, 3], [4, 'abc', 6]]), 'data.xlsx', PointStore())
+    stats = ingest_points(excel_bytes([['X', 'Y', 'Z'], [1, 2, 3], [4, None, 6]]), 'data.xlsx', PointStore())
+    assert stats == {'rows': 1, 'dropped': 1}
+
+
+def test_invalid_excel_raises_value_error():
+    with pytest.raises(ValueError):
+        ingest_points(io.BytesIO(b"bukan excel"), 'data.xlsx', PointStore())
+
+
+@pytest.mark.parametrize('writer', ['pyarrow', 'savetxt'])
+def test_grid_csv_writes_nan_as_empty_field(writer, monkeypatch):
+    if writer == 'pyarrow' and pa_csv is None:
+        pytest.skip('pyarrow tidak terpasang')
+    if writer == 'savetxt':
+        monkeypatch.setattr(penyimpanan, 'pa_csv', None)
+    grid = SimpleNamespace(x=np.array([0.0, 10.0]), y=np.array([0.0, 5.0]),
+                           z=np.array([[1000.5, np.nan], [np.nan, 1002.25]]))
+    buffer = io.BytesIO()
+    write_grid_csv(buffer, grid)
+    text = buffer.getvalue().decode()
+    assert 'nan' not in text.lower()
+    assert text.splitlines()[2] == '10,0,'
+    frame = pd.read_csv(io.StringIO(text))
+    np.testing.assert_array_equal(frame['Z'].to_numpy(), grid.z.ravel())
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+import interpolasi
+import perbandingan
+from interpolasi import GridSpec, clear_grid_cache
+from perbandingan import contact_volume_change, difference_maps, difference_stats, resample_surveys
+
+SPEC = GridSpec(40, 30, (0.0, 1000.0, 0.0, 800.0))
+
+
+@pytest.fixture(autouse=True)
+def memory_only_cache(monkeypatch):
+    monkeypatch.setattr(interpolasi, '_disk_cache', None)
+    clear_grid_cache()
+    yield
+    clear_grid_cache()
+
+
+def plane(x, y, shift=0.0):
+    # Bidang miring: interpolasi linear tepat di dalam convex hull
+    return 1000.0 + 0.08 * x + 0.05 * y + shift
+
+
+def make_surveys():
+    rng = np.random.default_rng(0)
+    xa, ya = rng.uniform(0, 1000, 200), rng.uniform(0, 800, 200)
+    # Lokasi survey ketiga berbeda & hanya menutup sebagian area
+    xb, yb = rng.uniform(200, 900, 150), rng.uniform(100, 700, 150)
+    xa[:4], ya[:4] = [0, 1000, 0, 1000], [0, 0, 800, 800]
+    return {'Before': (xa, ya, plane(xa, ya)),
+            'After': (xa, ya, plane(xa, ya, 5.0)),
+            'Infill': (xb, yb, plane(xb, yb, -3.0))}
+
+
+def test_difference_maps_for_same_and_other_locations():
+    resampled = resample_surveys(make_surveys(), SPEC)
+    diff = difference_maps(resampled)
+    assert diff.shape == (3, SPEC.ny, SPEC.nx)
+    assert np.all(diff[0][~np.isnan(diff[0])] == 0)
+    np.testing.assert_allclose(diff[1][~np.isnan(diff[1])], 5.0, atol=1e-9)
+    infill = ~np.isnan(diff[2])
+    np.testing.assert_allclose(diff[2][infill], -3.0, atol=1e-9)
+    # Di luar cakupan survey ketiga tidak ada selisih
+    assert infill.sum() < (~np.isnan(diff[1])).sum()
+
+
+def test_difference_stats():
+    resampled = resample_surveys(make_surveys(), SPEC)
+    stats = difference_stats(resampled).set_index('Survey')
+    cell_area = (resampled['x'][1] - resampled['x'][0]) * (resampled['y'][1] - resampled['y'][0])
+    diff = difference_maps(resampled)
+    for name, k, shift in (('After', 1, 5.0), ('Infill', 2, -3.0)):
+        row = stats.loc[name]
+        n_valid = int(np.count_nonzero(~np.isnan(diff[k])))
+        assert row['Node tumpang tindih'] == n_valid
+        assert row['Rata-rata Δ (m)'] == pytest.approx(shift)
+        assert row['RMS Δ (m)'] == pytest.approx(abs(shift))
+        assert row['Std Δ (m)'] == pytest.approx(0.0, abs=1e-6)
+        assert row['P50 Δ (m)'] == pytest.approx(shift)
+        assert row['Volume bersih (m³)'] == pytest.approx(shift * n_valid * cell_area)
+    assert stats.loc['After', 'Volume Δ− (m³)'] == 0
+    assert stats.loc['Infill', 'Volume Δ+ (m³)'] == 0
+    assert 'Before' not in stats.index
+
+
+def test_contact_volume_change_uses_common_nodes():
+    resampled = resample_surveys(make_surveys(), SPEC)
+    goc, woc = 1060.0, 1090.0
+    frame = contact_volume_change(resampled, goc, woc).set_index('Survey')
+    z = resampled['z']
+    common = np.all(~np.isnan(z), axis=0)
+    cell_area = (resampled['x'][1] - resampled['x'][0]) * (resampled['y'][1] - resampled['y'][0])
+    for k, name in enumerate(resampled['names']):
+        top = z[k][common]
+        total = np.clip(woc - top, 0, None).sum() * cell_area
+        gas = np.clip(goc - top, 0, None).sum() * cell_area
+        assert frame.loc[name, 'Total Reservoir (m³)'] == pytest.approx(total)
+        assert frame.loc[name, 'Gas Cap (m³)'] == pytest.approx(gas)
+        assert frame.loc[name, 'Oil Zone (m³)'] == pytest.approx(total - gas)
+    base = frame.loc['Before', 'Total Reservoir (m³)']
+    # Struktur lebih dalam (After +5 m) -> volume di atas kontak berkurang
+    assert frame.loc['After', 'Δ Total vs acuan (m³)'] < 0
+    assert frame.loc['After', 'Δ Total vs acuan (%)'] == pytest.approx(
+        100 * (frame.loc['After', 'Total Reservoir (m³)'] - base) / base)
+
+
+def test_large_spec_goes_through_grid_surface(monkeypatch):
+    surveys = make_surveys()
+    direct = resample_surveys(surveys, SPEC)
+    clear_grid_cache()
+    monkeypatch.setattr(perbandingan, 'TILED_GRID_NODES', 100)
+    calls = []
+    original = perbandingan.grid_surface
+    monkeypatch.setattr(perbandingan, 'grid_surface', lambda *a: calls.append(a) or original(*a))
+    monkeypatch.setattr(perbandingan, 'get_interpolator',
+                        lambda *a: pytest.fail('matriks bobot penuh untuk grid besar'))
+    tiled = resample_surveys(surveys, SPEC)
+    assert len(calls) == 3
+    np.testing.assert_allclose(tiled['z'], direct['z'], equal_nan=True)
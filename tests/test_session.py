@@ -0,0 +1,72 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import interpolasi
+from interpolasi import GridSpec, clear_grid_cache, grid_surface, seed_grid_cache
+from penyimpanan import PointStore, load_session, session_bytes
+
+
+@pytest.fixture(autouse=True)
+def memory_only_cache(monkeypatch):
+    # Tanpa cache disk agar test tidak menulis ke direktori pengguna
+    monkeypatch.setattr(interpolasi, '_disk_cache', None)
+    clear_grid_cache()
+    yield
+    clear_grid_cache()
+
+
+def make_points(n=60, seed=0):
+    rng = np.random.default_rng(seed)
+    x, y = rng.uniform(0, 1000, n), rng.uniform(0, 1000, n)
+    return x, y, 1000 + 0.1 * x + 0.05 * y
+
+
+def saved_session(grid_method='linear'):
+    x, y, z = make_points()
+    store = PointStore()
+    store.extend(x, y, z)
+    surfaces = {'GOC': pd.DataFrame({'X': x[:10], 'Y': y[:10], 'Z': z[:10] + 50})}
+    grid = grid_surface(x, y, z, GridSpec(30, 20), grid_method)
+    data = session_bytes(store, surfaces, contacts={'goc': 1100.0}, petrophysics={'porosity': 0.25},
+                         grid=grid, preprocess={'tolerance': 0.0, 'cell_size': None})
+    return io.BytesIO(data), (x, y, z), grid
+
+
+def test_session_round_trip():
+    buffer, (x, y, z), grid = saved_session()
+    session = load_session(buffer)
+    store = session['points']
+    np.testing.assert_array_equal(store.column('X'), x)
+    np.testing.assert_array_equal(store.column('Z'), z)
+    np.testing.assert_array_equal(session['surfaces']['GOC']['Z'], z[:10] + 50)
+    assert session['contacts'] == {'goc': 1100.0}
+    assert session['petrophysics'] == {'porosity': 0.25}
+    np.testing.assert_array_equal(session['grid']['z'], grid.z)
+
+
+def test_seed_accepts_matching_grid():
+    buffer, (x, y, z), grid = saved_session()
+    session = load_session(buffer)
+    clear_grid_cache()
+    seeded = seed_grid_cache(session['grid'], x, y, z)
+    assert seeded.key == grid.key
+    np.testing.assert_array_equal(grid_surface(x, y, z, GridSpec(30, 20), 'linear').z, grid.z)
+
+
+def test_seed_rejects_other_points():
+    buffer, (x, y, z), _ = saved_session()
+    session = load_session(buffer)
+    with pytest.raises(ValueError, match='tidak cocok'):
+        seed_grid_cache(session['grid'], x, y, z + 1)
+
+
+def test_seed_rejects_forged_key_and_shape():
+    buffer, (x, y, z), _ = saved_session()
+    grid = load_session(buffer)['grid']
+    with pytest.raises(ValueError):
+        seed_grid_cache(dict(grid, key='palsu'), x, y, z)
+    with pytest.raises(ValueError):
+        seed_grid_cache(dict(grid, z=grid['z'][:-1]), x, y, z)
@@ -0,0 +1,33 @@
+import numpy as np
+
+import validasi
+from interpolasi import make_point_interpolator
+from validasi import cross_validate
+
+
+def _points(n, seed=0):
+    rng = np.random.default_rng(seed)
+    x, y = rng.uniform(0, 1000, (2, n))
+    return x, y, 1500 + 0.05 * x - 0.02 * y + 10 * np.sin(x / 150)
+
+
+def test_cubic_loo_small_matches_full_retriangulation():
+    x, y, z = _points(60)
+    cv = cross_validate(x, y, z, 'cubic', 'loo', seed=1)
+    xy = np.column_stack([x, y])
+    expected = np.full(len(x), np.nan)
+    for i in range(len(x)):
+        keep = np.arange(len(x)) != i
+        expected[i] = make_point_interpolator(xy[keep], z[keep], 'cubic')(xy[i:i + 1])[0]
+    order = np.lexsort((cv['y'], cv['x']))
+    reference = np.lexsort((y, x))
+    np.testing.assert_allclose(cv['predicted'][order], expected[reference], equal_nan=True)
+    assert not cv['approximate']
+
+
+def test_cubic_loo_large_is_flagged_approximate(monkeypatch):
+    monkeypatch.setattr(validasi, 'CV_EXACT_CUBIC_POINTS', 20)
+    x, y, z = _points(60)
+    cv = cross_validate(x, y, z, 'cubic', 'loo', seed=2)
+    assert cv['approximate']
+    assert not cross_validate(x, y, z, 'linear', 'loo', seed=2)['approximate']
@@ -0,0 +1,148 @@
+import numpy as np
+import pytest
+
+import volumetrik
+from volumetrik import (GRVTable, area_depth_grv, area_depth_table, compute_volumetrics, contact_sweep,
+                        grv_above_surface, integrate_area_depth, monte_carlo_volumetrics)
+
+TOP = 1000.0
+
+
+def radial_table(profile, n=801, half=200.0):
+    """GRVTable dari struktur radial z = TOP + profile(r) pada grid n x n"""
+    axis = np.linspace(-half, half, n)
+    gx, gy = np.meshgrid(axis, axis)
+    z = TOP + profile(np.hypot(gx, gy))
+    cell_area = (axis[1] - axis[0]) ** 2
+    return GRVTable(z, cell_area), z, cell_area
+
+
+def rough_surface(seed=0):
+    """Top struktur acak dengan node NaN (di luar convex hull)"""
+    rng = np.random.default_rng(seed)
+    z = TOP + rng.uniform(0, 150, (50, 60))
+    z[rng.random(z.shape) < 0.1] = np.nan
+    return z
+
+
+def brute_grv(z, contact, cell_area):
+    return np.nansum(np.clip(contact - z, 0, None)) * cell_area
+
+
+def test_grv_table_matches_brute_force():
+    z = rough_surface()
+    table = GRVTable(z, 12.5)
+    # Termasuk kontak di atas puncak, tepat di node, dan di bawah node terdalam
+    contacts = np.concatenate([[TOP - 10.0, np.nanmin(z), np.nanmax(z), TOP + 500.0],
+                               np.linspace(TOP, TOP + 150.0, 37)])
+    expected = [brute_grv(z, c, 12.5) for c in contacts]
+    np.testing.assert_allclose(table.grv(contacts), expected, rtol=1e-12, atol=1e-6)
+    assert table.grv(TOP - 10.0) == 0.0
+    np.testing.assert_allclose(table.area(contacts), [np.count_nonzero(z < c) * 12.5 for c in contacts])
+
+
+def test_contact_sweep_matches_brute_force():
+    z = rough_surface(1)
+    table = GRVTable(z, 12.5)
+    goc, woc = TOP + 50.0, TOP + 110.0
+    depths = np.array([TOP - 20.0, TOP + 30.0, TOP + 80.0, TOP + 400.0])
+    params = dict(porosity=0.2, sw=0.3, ntg=0.8, bo=1.2, bg=0.005)
+    for vary in ('GOC', 'WOC'):
+        sweep = contact_sweep(table, depths, vary, goc, woc, **params)
+        for depth, row in zip(depths, sweep.itertuples(index=False)):
+            g, w = (depth, woc) if vary == 'GOC' else (goc, depth)
+            gas, total = brute_grv(z, g, 12.5), brute_grv(z, w, 12.5)
+            assert row[1] == pytest.approx(brute_grv(z, depth, 12.5))
+            assert row[2] == pytest.approx(gas)
+            assert row[3] == pytest.approx(max(total - gas, 0.0))
+            assert row[4] == pytest.approx(total)
+            hc = params['ntg'] * params['porosity'] * (1 - params['sw'])
+            assert row[5] == pytest.approx(max(total - gas, 0.0) * hc / params['bo'])
+            assert row[6] == pytest.approx(gas * hc / params['bg'])
+            assert compute_volumetrics(table, g, w, **params)['total'] == pytest.approx(total)
+    with pytest.raises(ValueError):
+        contact_sweep(table, depths, 'OWC', goc, woc, **params)
+
+
+def test_grv_table_without_valid_nodes():
+    table = GRVTable(np.full((3, 3), np.nan), 1.0)
+    assert table.grv(TOP) == 0.0
+    assert table.area(TOP) == 0.0
+
+
+@pytest.mark.parametrize('rule', ['trapezoid', 'simpson'])
+def test_linear_area_is_integrated_exactly(rule):
+    # Luas ~ kedalaman (paraboloid): trapesium & Simpson tepat
+    h = 2.0
+    depth = np.arange(0, 21) * h
+    grv = integrate_area_depth(5.0 * depth, h, rule)
+    np.testing.assert_allclose(grv, 2.5 * depth ** 2, atol=1e-9)
+
+
+@pytest.mark.parametrize('rule', ['pyramid', 'simpson'])
+def test_quadratic_area_is_integrated_exactly(rule):
+    # Luas ~ kedalaman^2 (kerucut): frustum piramida & Simpson tepat, trapesium tidak
+    h = 1.0
+    depth = np.arange(0, 41) * h
+    np.testing.assert_allclose(integrate_area_depth(3.0 * depth ** 2, h, rule), depth ** 3, rtol=1e-9)
+    assert integrate_area_depth(3.0 * depth ** 2, h, 'trapezoid')[-1] > depth[-1] ** 3
+
+
+def test_unknown_rule_raises():
+    with pytest.raises(ValueError):
+        integrate_area_depth([0.0, 1.0, 2.0], 1.0, 'midpoint')
+
+
+def test_paraboloid_grv_matches_analytic():
+    # z = TOP + k r^2 -> luas pi (d - TOP) / k, GRV pi (c - TOP)^2 / (2k)
+    k, contact = 0.01, TOP + 150.0
+    table, _, _ = radial_table(lambda r: k * r ** 2)
+    expected = np.pi * (contact - TOP) ** 2 / (2 * k)
+    for rule, grv in area_depth_grv(table, contact).items():
+        assert grv == pytest.approx(expected, rel=1e-2), rule
+
+
+def test_cone_grv_matches_analytic():
+    # z = TOP + r -> luas pi (d - TOP)^2, GRV pi (c - TOP)^3 / 3
+    contact = TOP + 150.0
+    table, _, _ = radial_table(lambda r: r)
+    expected = np.pi * (contact - TOP) ** 3 / 3
+    grv = area_depth_grv(table, contact)
+    for rule in ('prism', 'pyramid', 'simpson'):
+        assert grv[rule] == pytest.approx(expected, rel=1e-2), rule
+
+
+def test_prism_column_matches_thickness_sum():
+    table, z, cell_area = radial_table(lambda r: 0.01 * r ** 2, n=201)
+    frame = area_depth_table(table, TOP + 120.0, steps=50)
+    assert frame['GRV Prisma (m³)'].iloc[0] == 0.0
+    assert np.all(np.diff(frame['Luas (m²)']) >= 0)
+    assert frame['GRV Prisma (m³)'].iloc[-1] == pytest.approx(grv_above_surface(z, TOP + 120.0, cell_area))
+    # Semua aturan konvergen ke jumlah prisma pada grid halus
+    for column in ('GRV Trapesium (m³)', 'GRV Piramidal (m³)', 'GRV Simpson (m³)'):
+        assert frame[column].iloc[-1] == pytest.approx(frame['GRV Prisma (m³)'].iloc[-1], rel=2e-2)
+
+
+MC_INPUTS = {
+    'porosity': {'type': 'triangular', 'min': 0.15, 'mode': 0.2, 'max': 0.25},
+    'sw': {'type': 'constant', 'value': 0.3},
+    'ntg': {'type': 'uniform', 'min': 0.7, 'max': 0.9},
+    'bo': {'type': 'constant', 'value': 1.2},
+    'bg': {'type': 'constant', 'value': 0.005},
+    'goc': {'type': 'normal', 'mean': TOP + 60.0, 'sd': 5.0},
+    'woc': {'type': 'normal', 'mean': TOP + 120.0, 'sd': 5.0},
+}
+
+
+def test_monte_carlo_pool_matches_serial_and_is_cached(monkeypatch):
+    monkeypatch.setattr(volumetrik, 'MC_CHUNK_SIZE', 1000)
+    volumetrik._mc_cache.clear()
+    z = TOP + np.random.default_rng(0).uniform(0, 200, (60, 60))
+    serial = monte_carlo_volumetrics(GRVTable(z, 25.0), MC_INPUTS, 5000, seed=7)
+    table = GRVTable(z, 25.0, key='grid-a')
+    pooled = monte_carlo_volumetrics(table, MC_INPUTS, 5000, seed=7, workers=2)
+    for name in serial:
+        np.testing.assert_array_equal(pooled[name], serial[name])
+    # Rerun dengan grid, input, n & seed sama -> hasil dari cache
+    assert monte_carlo_volumetrics(table, MC_INPUTS, 5000, seed=7, workers=2) is pooled
+    assert monte_carlo_volumetrics(table, MC_INPUTS, 5000, seed=8) is not pooled
@@ -0,0 +1,187 @@
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import Delaunay, cKDTree
+
+from geostatistik import (ENGINES, IDW_NEIGHBORS, KRIGING_NEIGHBORS, RBF_NEIGHBORS,
+                          fit_variogram)
+from interpolasi import (GRID_CACHE_MAX_ENTRIES, GRID_CACHE_MAX_MB, GRID_WORKERS, INTERPOLATION_METHODS,
+                         GridSpec, LRUCache, check_grid_spec, grid_tiled, make_point_interpolator,
+                         merge_xy, points_hash)
+
+# Ukuran lingkungan LOO untuk mesin titik-sebar (sama dengan k tetangga mesinnya)
+LOO_NEIGHBORS = {'idw': IDW_NEIGHBORS, 'rbf': RBF_NEIGHBORS, 'kriging': KRIGING_NEIGHBORS}
+
+
+# Di bawah jumlah titik ini CV leave-one-out cukup murah untuk dijalankan otomatis
+CV_AUTO_MAX_POINTS = 5000
+# Jumlah titik per job LOO di process pool
+CV_CHUNK_POINTS = 500
+# Sampai jumlah titik ini LOO cubic men-triangulasi ulang penuh (eksak), di atasnya pendekatan dua ring
+CV_EXACT_CUBIC_POINTS = 500
+
+_cv_cache = LRUCache(GRID_CACHE_MAX_ENTRIES, GRID_CACHE_MAX_MB)
+
+
+def fold_labels(n, folds, seed=0):
+    """Label fold 0..folds-1 untuk n titik (acak, ukuran fold seimbang)"""
+    return np.random.default_rng(seed).permutation(np.arange(n) % folds)
+
+
+def _fold_job(args):
+    xy, values, method, test = args
+    try:
+        return make_point_interpolator(xy[~test], values[~test], method)(xy[test])
+    except Exception:
+        # Fold latih terlalu sedikit / segaris untuk triangulasi -> tidak diprediksi
+        return np.full(int(test.sum()), np.nan)
+
+
+def _loo_neighbourhoods(xy, method):
+    """Titik lokal yang cukup untuk memprediksi ulang tiap titik tanpa dirinya sendiri.
+
+    linear: ring Delaunay pertama (hasil identik dengan triangulasi ulang tanpa titik itu);
+    cubic: semua titik lain sampai CV_EXACT_CUBIC_POINTS (eksak), di atasnya dua ring
+    (gradien Clough-Tocher lokal, pendekatan); mesin lain: k tetangga terdekat sesuai
+    parameter mesin (identik karena estimasinya memang lokal).
+    """
+    n = len(xy)
+    if method == 'cubic' and n <= CV_EXACT_CUBIC_POINTS:
+        everything = np.arange(n)
+        return [np.delete(everything, i) for i in range(n)]
+    if method in ('linear', 'cubic'):
+        indptr, indices = Delaunay(xy).vertex_neighbor_vertices
+        rings = [indices[indptr[i]:indptr[i + 1]] for i in range(n)]
+        if method == 'linear':
+            return rings
+        second = []
+        for i, ring in enumerate(rings):
+            near = np.unique(np.concatenate([ring] + [rings[j] for j in ring]))
+            second.append(near[near != i])
+        return second
+    k = min(LOO_NEIGHBORS[method], n - 1)
+    _, idx = cKDTree(xy).query(xy, k=k + 1, workers=-1)
+    # Kolom pertama = titik itu sendiri (lokasi kembar sudah digabung)
+    return list(idx[:, 1:])
+
+
+def _loo_job(args):
+    xy, values, method, points, neighbourhoods, params = args
+    out = np.full(len(points), np.nan)
+    for j, (i, near) in enumerate(zip(points, neighbourhoods)):
+        try:
+            if method in ENGINES:
+                interp = ENGINES[method](xy[near], values[near], **params)
+            else:
+                interp = make_point_interpolator(xy[near], values[near], method)
+            out[j] = interp(xy[i:i + 1])[0]
+        except Exception:
+            continue
+    return out
+
+
+def cross_validate(x, y, z, method='cubic', folds=5, seed=0, workers=1):
+    """Validasi silang k-fold (folds=int) atau leave-one-out (folds='loo').
+
+    Titik dengan X/Y kembar digabung dulu agar satu lokasi tidak ada di train & test.
+    LOO memakai lingkungan lokal tiap titik (triangulasi/KD-tree penuh dibangun sekali);
+    kriging memakai satu variogram global. Fold/potongan titik dikerjakan di process pool
+    jika workers > 1. Prediksi di luar convex hull (linear/cubic) bernilai NaN.
+    """
+    key = f"{points_hash(x, y, z)}:{method}:{folds}:{seed}"
+    cached = _cv_cache.get(key)
+    if cached is not None:
+        return cached
+
+    xy, inverse, counts = merge_xy(x, y)
+    values = np.bincount(inverse, weights=np.asarray(z, dtype=np.float64)) / counts
+    n = len(values)
+
+    if folds == 'loo':
+        neighbourhoods = _loo_neighbourhoods(xy, method)
+        params = {}
+        if method == 'kriging':
+            params['variogram'] = fit_variogram(xy, values)
+        jobs = [(xy, values, method, np.arange(start, min(start + CV_CHUNK_POINTS, n)),
+                 neighbourhoods[start:start + CV_CHUNK_POINTS], params)
+                for start in range(0, n, CV_CHUNK_POINTS)]
+        job, targets = _loo_job, [j[3] for j in jobs]
+    else:
+        labels = fold_labels(n, folds, seed)
+        jobs = [(xy, values, method, labels == fold) for fold in range(folds)]
+        job, targets = _fold_job, [j[3] for j in jobs]
+
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            results = list(pool.map(job, jobs))
+    else:
+        results = [job(args) for args in jobs]
+
+    predicted = np.full(n, np.nan)
+    for target, result in zip(targets, results):
+        predicted[target] = result
+
+    residual = predicted - values
+    valid = ~np.isnan(residual)
+    cv = {
+        'x': xy[:, 0], 'y': xy[:, 1], 'z': values, 'predicted': predicted, 'residual': residual,
+        'rmse': float(np.sqrt(np.mean(residual[valid] ** 2))) if valid.any() else np.nan,
+        'mae': float(np.mean(np.abs(residual[valid]))) if valid.any() else np.nan,
+        'coverage': float(valid.mean()),
+        'method': method, 'folds': folds,
+        # LOO cubic data besar memakai lingkungan dua ring, bukan triangulasi ulang penuh
+        'approximate': folds == 'loo' and method == 'cubic' and n > CV_EXACT_CUBIC_POINTS,
+    }
+    _cv_cache.put(key, cv)
+    return cv
+
+
+def cv_table(cv):
+    """Hasil CV per titik sebagai DataFrame (untuk tabel & ekspor)"""
+    return pd.DataFrame({'X': cv['x'], 'Y': cv['y'], 'Z': cv['z'],
+                         'Z Prediksi': cv['predicted'], 'Residual': cv['residual']})
+
+
+def benchmark_method(x, y, z, spec=None, method='cubic', folds=5, measure_memory=False):
+    """Waktu, galat CV & (opsional) memori puncak satu metode gridding, tanpa cache.
+
+    Memori diukur dengan tracemalloc pada run kedua karena tracing memperlambat run.
+    """
+    spec = (spec or GridSpec()).resolve(x, y)
+    check_grid_spec(spec)
+    start = time.perf_counter()
+    grid_z = grid_tiled(x, y, z, spec, method, workers=GRID_WORKERS)
+    seconds = time.perf_counter() - start
+
+    peak_mb = np.nan
+    if measure_memory:
+        tracemalloc.start()
+        try:
+            grid_tiled(x, y, z, spec, method, workers=GRID_WORKERS)
+            peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+        finally:
+            tracemalloc.stop()
+
+    cv = cross_validate(x, y, z, method, folds)
+    return {
+        'Metode': method,
+        'Waktu (s)': seconds,
+        'Memori puncak (MB)': peak_mb,
+        'RMSE CV': cv['rmse'],
+        'MAE CV': cv['mae'],
+        'Cakupan grid (%)': 100 * float(np.mean(~np.isnan(grid_z))),
+    }
+
+
+def compare_methods(x, y, z, spec=None, methods=INTERPOLATION_METHODS, folds=5, measure_memory=False):
+    """Tabel perbandingan metode; metode yang gagal dilaporkan tanpa menghentikan yang lain"""
+    rows = []
+    for method in methods:
+        try:
+            rows.append(benchmark_method(x, y, z, spec, method, folds, measure_memory))
+        except Exception as e:
+            rows.append({'Metode': method, 'Error': str(e)})
+    return pd.DataFrame(rows)
@@ -0,0 +1,120 @@
+import numpy as np
+import plotly.graph_objects as go
+
+# Batas default jumlah sumur yang digambar di 3D (level-of-detail)
+WELL_LOD_LIMIT = 2000
+
+
+def lod_indices(n, limit):
+    """Indeks subsampel merata jika n melebihi batas LOD"""
+    if limit is None or n <= limit:
+        return np.arange(n)
+    return np.unique(np.linspace(0, n - 1, limit).round().astype(int))
+
+
+def build_well_traces(x, y, z, well_top, max_wells=WELL_LOD_LIMIT):
+    """Semua jalur sumur sebagai satu trace garis + satu trace marker.
+
+    Segmen antar sumur dipisah NaN (diserialisasi Plotly menjadi null),
+    jadi ukuran figure tidak bertambah dua trace per titik.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    z = np.asarray(z, dtype=np.float64)
+    idx = lod_indices(len(x), max_wells)
+    xs, ys, zs = x[idx], y[idx], z[idx]
+    n = len(idx)
+
+    # Tiap sumur = [atas, bawah, pemisah]
+    line_x = np.full(3 * n, np.nan)
+    line_y = np.full(3 * n, np.nan)
+    line_z = np.full(3 * n, np.nan)
+    line_x[0::3] = line_x[1::3] = xs
+    line_y[0::3] = line_y[1::3] = ys
+    line_z[0::3] = well_top
+    line_z[1::3] = zs
+
+    labels = [f"Well-{i + 1}<br>X: {xi}<br>Y: {yi}<br>Depth: {zi}m"
+              for i, xi, yi, zi in zip(idx, xs, ys, zs)]
+    line_text = np.empty(3 * n, dtype=object)
+    line_text[0::3] = labels
+    line_text[1::3] = labels
+    line_text[2::3] = ""
+
+    wells_line = go.Scatter3d(
+        x=line_x, y=line_y, z=line_z,
+        mode='lines',
+        line=dict(color='grey', width=3),
+        name='Wells',
+        showlegend=False,
+        hoverinfo='text',
+        text=line_text,
+        connectgaps=False
+    )
+    wells_marker = go.Scatter3d(
+        x=xs, y=ys, z=zs,
+        mode='markers',
+        marker=dict(size=5, color='black', symbol='diamond'),
+        name='Well Target',
+        showlegend=False,
+        hoverinfo='text',
+        text=labels
+    )
+    return [wells_line, wells_marker], n
+
+
+# Resolusi render default (node per sumbu) untuk Surface 3D, terpisah dari grid komputasi
+RENDER_MAX_NODES = 150
+
+
+def decimate_grid(axis_x, axis_y, z, max_nodes=RENDER_MAX_NODES):
+    """Kurangi resolusi grid untuk render; tepi grid selalu dipertahankan.
+
+    Langkah pengambilan node dihitung per sumbu dari ukuran grid vs target,
+    jadi grid kecil dikirim utuh dan grid besar diperkecil secukupnya.
+    """
+    ix = lod_indices(len(axis_x), max_nodes)
+    iy = lod_indices(len(axis_y), max_nodes)
+    return axis_x[ix], axis_y[iy], z[np.ix_(iy, ix)]
+
+
+def build_surface_trace(axis_x, axis_y, z, max_nodes=RENDER_MAX_NODES, **kwargs):
+    """Surface struktur dengan sumbu 1D (tanpa salinan meshgrid) pada resolusi render"""
+    rx, ry, rz = decimate_grid(axis_x, axis_y, z, max_nodes)
+    return go.Surface(x=rx, y=ry, z=rz, **kwargs)
+
+
+def contact_plane(z_lvl, bounds, color, name):
+    """Bidang kontak datar sebagai Surface 4 sudut (bukan grid penuh)"""
+    x_min, x_max, y_min, y_max = bounds
+    return go.Surface(
+        z=[[z_lvl, z_lvl], [z_lvl, z_lvl]],
+        x=[x_min, x_max],
+        y=[y_min, y_max],
+        colorscale=[[0, color], [1, color]],
+        opacity=0.4,
+        showscale=False,
+        name=name
+    )
+
+
+def build_residual_map(cv, grid=None):
+    """Peta residual validasi silang: titik diwarnai residual (skala divergen, 0 = putih)"""
+    fig = go.Figure()
+    if grid is not None:
+        fig.add_trace(go.Contour(x=grid.x, y=grid.y, z=grid.z, contours_coloring='lines',
+                                 line_width=1, colorscale='Greys', showscale=False,
+                                 name='Kontur grid', hoverinfo='skip'))
+    residual = cv['residual']
+    limit = float(np.nanmax(np.abs(residual))) if np.isfinite(residual).any() else 1.0
+    hover = [f"X: {xi:g}<br>Y: {yi:g}<br>Z: {zi:g}<br>Prediksi: {pi:.2f}<br>Residual: {ri:+.2f}"
+             for xi, yi, zi, pi, ri in zip(cv['x'], cv['y'], cv['z'], cv['predicted'], residual)]
+    fig.add_trace(go.Scattergl(
+        x=cv['x'], y=cv['y'], mode='markers', name='Residual',
+        marker=dict(color=residual, colorscale='RdBu_r', cmin=-limit, cmax=limit, size=8,
+                    line=dict(width=0.5, color='black'), colorbar=dict(title='Residual (m)')),
+        text=hover, hoverinfo='text'
+    ))
+    fig.update_layout(height=600, xaxis_title="X", yaxis_title="Y",
+                      yaxis=dict(scaleanchor="x", scaleratio=1))
+    return fig
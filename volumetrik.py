@@ -0,0 +1,328 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+# cumulative_simpson butuh scipy>=1.12 (lihat requirements.txt)
+from scipy.integrate import cumulative_simpson
+
+from interpolasi import LRUCache, GRID_CACHE_MAX_ENTRIES, GRID_CACHE_MAX_MB, GridSpec, grid_surface
+
+
+class GRVTable:
+    """Tabel kedalaman terurut + ketebalan kumulatif dari satu grid.
+
+    GRV di atas kontak c = cell_area * sum(c - z) untuk semua sel dengan z < c,
+    sehingga cukup binary search (posisi c di kedalaman terurut) + aritmetika O(1).
+    """
+
+    def __init__(self, grid_z, cell_area, key=None):
+        # key: kunci grid asal (untuk cache hasil turunan, mis. Monte Carlo)
+        self.key = key
+        depths = np.sort(np.asarray(grid_z, dtype=np.float64)[~np.isnan(grid_z)].ravel())
+        self.cell_area = float(cell_area)
+        self.depths = depths
+        # Kedalaman direferensikan ke sel terdangkal agar jumlah kumulatif tetap presisi
+        self.ref = depths[0] if len(depths) else 0.0
+        self.cum = np.concatenate([[0.0], np.cumsum(depths - self.ref)])
+
+    def cells_above(self, contact):
+        """Jumlah sel yang lebih dangkal dari kontak"""
+        return np.searchsorted(self.depths, contact, side='left')
+
+    def area(self, depth):
+        """Luas horizontal struktur yang lebih dangkal dari kedalaman (skalar atau array)"""
+        return self.cells_above(np.asarray(depth, dtype=np.float64)) * self.cell_area
+
+    def grv(self, contact):
+        """Gross Rock Volume di atas kontak (skalar atau array kedalaman)"""
+        contact = np.asarray(contact, dtype=np.float64)
+        k = self.cells_above(contact)
+        thickness = (contact - self.ref) * k - self.cum[k]
+        return np.maximum(thickness, 0.0) * self.cell_area
+
+
+_grv_table_cache = LRUCache(GRID_CACHE_MAX_ENTRIES, GRID_CACHE_MAX_MB)
+
+
+def get_grv_table(grid):
+    """Ambil GRVTable untuk GridResult (di-cache berdasarkan kunci grid)"""
+    table = _grv_table_cache.get(grid.key)
+    if table is None:
+        table = GRVTable(grid.z, grid.cell_area, grid.key)
+        _grv_table_cache.put(grid.key, table)
+    return table
+
+
+def _in_place(vol_gas_cap, vol_oil_zone, porosity, sw, ntg, bo, bg):
+    """STOIIP & GIIP dari volume batuan (skalar atau array)"""
+    stoiip = (vol_oil_zone * ntg * porosity * (1 - sw)) / bo
+    giip = (vol_gas_cap * ntg * porosity * (1 - sw)) / bg
+    return stoiip, giip
+
+
+def compute_volumetrics(table, goc, woc, porosity, sw, ntg, bo, bg):
+    """Hitung volume gas cap, oil zone, total reservoir, STOIIP & GIIP dari GRVTable"""
+    return _volume_summary(float(table.grv(goc)), float(table.grv(woc)),
+                           porosity, sw, ntg, bo, bg)
+
+
+def thickness_map(top_z, contact):
+    """Peta ketebalan gross di atas kontak datar (skalar) atau terpetakan (grid seukuran top_z).
+
+    Node tanpa nilai (NaN) di top maupun kontak bernilai 0.
+    """
+    thickness = np.asarray(contact, dtype=np.float64) - top_z
+    return np.nan_to_num(np.clip(thickness, 0, None), nan=0.0)
+
+
+def grv_above_surface(top_z, contact, cell_area):
+    """GRV di atas kontak datar (skalar) atau terpetakan (grid seukuran top_z)"""
+    return float(thickness_map(top_z, contact).sum()) * cell_area
+
+
+def compute_volumetrics_mapped(grid, goc, woc, porosity, sw, ntg, bo, bg):
+    """Seperti compute_volumetrics, tetapi GOC/WOC boleh berupa grid kontak terpetakan"""
+    return _volume_summary(grv_above_surface(grid.z, goc, grid.cell_area),
+                           grv_above_surface(grid.z, woc, grid.cell_area),
+                           porosity, sw, ntg, bo, bg)
+
+
+def contact_volumes(grid, contact, porosity, sw, ntg):
+    """Luas, bulk, net, pore volume & HCPV di atas satu kontak dari grid yang sama.
+
+    Kontak datar memakai GRVTable yang sudah di-cache (tanpa pass ulang atas grid);
+    kontak terpetakan memakai peta ketebalan. Bulk = GRV pada compute_volumetrics*.
+    """
+    if np.ndim(contact) == 0:
+        table = get_grv_table(grid)
+        area, bulk = float(table.area(contact)), float(table.grv(contact))
+    else:
+        thickness = thickness_map(grid.z, contact)
+        area = float(np.count_nonzero(thickness)) * grid.cell_area
+        bulk = float(thickness.sum()) * grid.cell_area
+    net = bulk * ntg
+    pore = net * porosity
+    return {'area': area, 'bulk': bulk, 'net': net, 'pore': pore, 'hcpv': pore * (1 - sw)}
+
+
+def _volume_summary(vol_gas_cap, vol_total_res, porosity, sw, ntg, bo, bg):
+    vol_oil_zone = max(0, vol_total_res - vol_gas_cap)
+    stoiip, giip = _in_place(vol_gas_cap, vol_oil_zone, porosity, sw, ntg, bo, bg)
+    return {
+        'gas_cap': vol_gas_cap,
+        'oil_zone': vol_oil_zone,
+        'total': vol_total_res,
+        'stoiip': stoiip,
+        'giip': giip,
+    }
+
+
+def contact_sweep(table, depths, vary, goc, woc, porosity, sw, ntg, bo, bg):
+    """Evaluasi GRV, gas cap, oil zone, STOIIP & GIIP untuk vektor kedalaman kontak.
+
+    vary='GOC' menggeser GOC (WOC tetap), vary='WOC' menggeser WOC (GOC tetap).
+    Semua kedalaman dihitung sekaligus dalam satu operasi NumPy.
+    """
+    depths = np.asarray(depths, dtype=np.float64)
+    grv_curve = table.grv(depths)
+    if vary == 'GOC':
+        vol_gas_cap = grv_curve
+        vol_total_res = np.full_like(depths, table.grv(woc))
+    elif vary == 'WOC':
+        vol_gas_cap = np.full_like(depths, table.grv(goc))
+        vol_total_res = grv_curve
+    else:
+        raise ValueError(f"vary harus 'GOC' atau 'WOC', bukan {vary!r}")
+
+    vol_oil_zone = np.maximum(vol_total_res - vol_gas_cap, 0)
+    stoiip, giip = _in_place(vol_gas_cap, vol_oil_zone, porosity, sw, ntg, bo, bg)
+    return pd.DataFrame({
+        f'{vary} (m)': depths,
+        'GRV (m³)': grv_curve,
+        'Gas Cap (m³)': vol_gas_cap,
+        'Oil Zone (m³)': vol_oil_zone,
+        'Total Reservoir (m³)': vol_total_res,
+        'STOIIP (bbl)': stoiip,
+        'GIIP (scf)': giip,
+    })
+
+
+# -------------------------------------------------------------------
+# AREA-DEPTH / AREA-VOLUME (HIPSOMETRIK)
+# -------------------------------------------------------------------
+# Jumlah interval kedalaman antara puncak struktur dan kontak
+AREA_DEPTH_STEPS = 200
+# Resolusi grid (node per sumbu) untuk uji konvergensi
+CONVERGENCE_RESOLUTIONS = (25, 50, 100, 200, 400)
+
+AREA_DEPTH_RULES = {'trapezoid': 'Trapesium', 'pyramid': 'Piramidal', 'simpson': 'Simpson'}
+
+
+def integrate_area_depth(areas, h, rule='trapezoid'):
+    """GRV kumulatif dari luas pada kedalaman berjarak seragam h (mulai 0 di baris pertama)"""
+    areas = np.asarray(areas, dtype=np.float64)
+    if len(areas) < 2:
+        return np.zeros(len(areas))
+    a0, a1 = areas[:-1], areas[1:]
+    if rule == 'trapezoid':
+        slabs = h / 2 * (a0 + a1)
+    elif rule == 'pyramid':
+        # Frustum piramida: tepat bila luas berubah kuadratik terhadap kedalaman (puncak antiklin)
+        slabs = h / 3 * (a0 + a1 + np.sqrt(a0 * a1))
+    elif rule == 'simpson':
+        return cumulative_simpson(areas, dx=h, initial=0.0)
+    else:
+        raise ValueError(f"Aturan integrasi tidak dikenal: {rule}")
+    return np.concatenate([[0.0], np.cumsum(slabs)])
+
+
+def area_depth_table(table, base, steps=AREA_DEPTH_STEPS):
+    """Tabel luas & GRV kumulatif vs kedalaman dari puncak struktur sampai base.
+
+    Luas tiap kedalaman diambil dari kedalaman node terurut GRVTable (satu searchsorted
+    untuk semua kedalaman). Kolom Prisma = jumlah ketebalan per sel (acuan metode grid).
+    """
+    top = table.depths[0] if len(table.depths) else base
+    depths = np.linspace(top, max(base, top), steps + 1)
+    areas = table.area(depths)
+    h = depths[1] - depths[0]
+    frame = pd.DataFrame({'Kedalaman (m)': depths, 'Luas (m²)': areas,
+                          'GRV Prisma (m³)': table.grv(depths)})
+    for rule, label in AREA_DEPTH_RULES.items():
+        frame[f'GRV {label} (m³)'] = integrate_area_depth(areas, h, rule)
+    return frame
+
+
+def area_depth_grv(table, contact, steps=AREA_DEPTH_STEPS):
+    """GRV di atas kontak datar per aturan integrasi (+ 'prism' dari jumlah sel)"""
+    last = area_depth_table(table, contact, steps).iloc[-1]
+    grv = {'prism': float(table.grv(contact))}
+    grv.update({rule: float(last[f'GRV {label} (m³)']) for rule, label in AREA_DEPTH_RULES.items()})
+    return grv
+
+
+def resolution_convergence(x, y, z, contact, bounds=None, method='cubic',
+                           resolutions=CONVERGENCE_RESOLUTIONS, steps=AREA_DEPTH_STEPS):
+    """GRV di atas kontak untuk tiap resolusi grid & aturan integrasi.
+
+    Selisih dilaporkan relatif terhadap resolusi terhalus dengan aturan yang sama.
+    """
+    rows = []
+    for n in resolutions:
+        grid = grid_surface(x, y, z, GridSpec(n, n, bounds), method)
+        for rule, grv in area_depth_grv(get_grv_table(grid), contact, steps).items():
+            rows.append({'Node per sumbu': n, 'Ukuran sel (m)': max(grid.dx, grid.dy),
+                         'Aturan': AREA_DEPTH_RULES.get(rule, 'Prisma'), 'GRV (m³)': grv})
+    frame = pd.DataFrame(rows)
+    finest = frame[frame['Node per sumbu'] == max(resolutions)].set_index('Aturan')['GRV (m³)']
+    reference = frame['Aturan'].map(finest)
+    frame['Selisih vs terhalus (%)'] = np.where(reference > 0,
+                                                100 * (frame['GRV (m³)'] - reference) / reference, np.nan)
+    return frame
+
+
+# -------------------------------------------------------------------
+# VOLUMETRIK PROBABILISTIK (MONTE CARLO)
+# -------------------------------------------------------------------
+# Ukuran chunk tetap agar hasil dengan seed yang sama tidak bergantung jumlah proses
+MC_CHUNK_SIZE = 50_000
+
+# Parameter berupa fraksi dibatasi ke [0, 1]
+_FRACTION_PARAMS = ('porosity', 'sw', 'ntg')
+
+_mc_cache = LRUCache(GRID_CACHE_MAX_ENTRIES, GRID_CACHE_MAX_MB)
+# GRVTable milik proses worker, dikirim sekali lewat initializer pool
+_worker_table = None
+
+
+def sample_distribution(rng, dist, n):
+    """Ambil n sampel dari spesifikasi distribusi (dict dengan kunci 'type')"""
+    kind = dist['type']
+    if kind == 'constant':
+        return np.full(n, float(dist['value']))
+    if kind == 'uniform':
+        return rng.uniform(dist['min'], dist['max'], n)
+    if kind == 'triangular':
+        if dist['min'] == dist['max']:
+            return np.full(n, float(dist['mode']))
+        return rng.triangular(dist['min'], dist['mode'], dist['max'], n)
+    if kind == 'normal':
+        return rng.normal(dist['mean'], dist['sd'], n)
+    if kind == 'lognormal':
+        # mean & sd dalam ruang nilai asli -> parameter mu/sigma distribusi normal
+        mean, sd = float(dist['mean']), float(dist['sd'])
+        if mean <= 0:
+            raise ValueError("Distribusi lognormal membutuhkan mean > 0")
+        sigma2 = np.log1p((sd / mean) ** 2)
+        return rng.lognormal(np.log(mean) - sigma2 / 2, np.sqrt(sigma2), n)
+    raise ValueError(f"Distribusi tidak dikenal: {kind}")
+
+
+def _mc_chunk(table, inputs, n, seed):
+    rng = np.random.default_rng(seed)
+    s = {name: sample_distribution(rng, dist, n) for name, dist in inputs.items()}
+    for name in _FRACTION_PARAMS:
+        s[name] = np.clip(s[name], 0.0, 1.0)
+
+    # GOC tidak boleh lebih dalam dari WOC pada realisasi yang sama
+    woc = s['woc']
+    goc = np.minimum(s['goc'], woc)
+    vol_total_res = table.grv(woc)
+    vol_gas_cap = table.grv(goc)
+    vol_oil_zone = np.maximum(vol_total_res - vol_gas_cap, 0)
+    stoiip, giip = _in_place(vol_gas_cap, vol_oil_zone, s['porosity'], s['sw'], s['ntg'],
+                             s['bo'], s['bg'])
+    return {'gas_cap': vol_gas_cap, 'oil_zone': vol_oil_zone, 'total': vol_total_res,
+            'stoiip': stoiip, 'giip': giip}
+
+
+def _mc_init(table):
+    global _worker_table
+    _worker_table = table
+
+
+def _mc_worker_chunk(inputs, n, seed):
+    return _mc_chunk(_worker_table, inputs, n, seed)
+
+
+def monte_carlo_volumetrics(table, inputs, n=100_000, seed=None, workers=1):
+    """Volumetrik Monte Carlo: semua realisasi diambil sebagai array, GRV dari GRVTable.
+
+    inputs: dict distribusi untuk 'porosity', 'sw', 'ntg', 'bo', 'bg', 'goc', 'woc'.
+    workers > 1 membagi chunk sampel ke process pool; tabel dikirim sekali per worker
+    (initializer), bukan per chunk. Hasil dengan seed tetap di-cache per grid & input
+    (tidak bergantung jumlah worker).
+    """
+    key = None
+    if seed is not None and table.key is not None:
+        key = f"{table.key}:{sorted(inputs.items())!r}:{n}:{seed}"
+        cached = _mc_cache.get(key)
+        if cached is not None:
+            return cached
+
+    sizes = [MC_CHUNK_SIZE] * (n // MC_CHUNK_SIZE)
+    if n % MC_CHUNK_SIZE:
+        sizes.append(n % MC_CHUNK_SIZE)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    if workers > 1 and len(sizes) > 1:
+        workers = min(workers, len(sizes))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_mc_init, initargs=(table,)) as pool:
+            chunks = list(pool.map(_mc_worker_chunk, [inputs] * len(sizes), sizes, seeds,
+                                   chunksize=-(-len(sizes) // workers)))
+    else:
+        chunks = [_mc_chunk(table, inputs, size, sd) for size, sd in zip(sizes, seeds)]
+
+    results = {name: np.concatenate([c[name] for c in chunks]) for name in chunks[0]}
+    if key is not None:
+        _mc_cache.put(key, results)
+    return results
+
+
+def percentile_summary(results):
+    """Ringkasan P90/P50/P10 (konvensi eksedans: P90 = persentil ke-10) & rata-rata"""
+    rows = []
+    for key, values in results.items():
+        p90, p50, p10 = np.percentile(values, [10, 50, 90])
+        rows.append({'Output': key, 'P90': p90, 'P50': p50, 'P10': p10, 'Mean': values.mean()})
+    return pd.DataFrame(rows)